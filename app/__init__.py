@@ -1 +1,6 @@
-from .news import get_news_sentiment
\ No newline at end of file
+def __getattr__(name):
+    # resolved on first access, so `import app.<anything>` stays light
+    if name == "get_news_sentiment":
+        from .news import get_news_sentiment
+        return get_news_sentiment
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+# File: app/backtest_cache.py
+"""
+Content-addressed cache of backtest results.
+
+A result is stored under the hash of everything that determines it: the
+model's fitted state, the exact bars, FEATURE_SET_VERSION and the backtest
+parameters.  Re-running the same backtest on unchanged data and models
+returns the stored P/L array instead of predicting again.
+
+    python -m app.backtest_cache list
+    python -m app.backtest_cache stats
+    python -m app.backtest_cache clear [--older-than-days N]
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.models.feature_builder import FEATURE_SET_VERSION
+
+# ── Cache configuration ───────────────────────────────────────────────────────
+
+CACHE_DIR    = Path.home() / ".nekoai" / "cache" / "backtests"
+CACHE_MAX_MB = 512      # least recently used entries are evicted above this
+
+# ── Fingerprints ─────────────────────────────────────────────────────────────
+
+def _digest(*parts) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for p in parts:
+        h.update(p if isinstance(p, (bytes, memoryview)) else str(p).encode())
+    return h.hexdigest()
+
+def _pipeline_hash(pipeline) -> str:
+    from joblib.hashing import NumpyHasher
+
+    class _Hasher(NumpyHasher):
+        # sklearn tree nodes are a struct array whose padding bytes are
+        # uninitialised, so hash them field by field
+        def save(self, obj):
+            if isinstance(obj, np.ndarray) and obj.dtype.names:
+                obj = tuple(np.ascontiguousarray(obj[f]) for f in obj.dtype.names)
+            super().save(obj)
+
+    return _Hasher(hash_name="md5").hash(pipeline)
+
+def model_fingerprint(model) -> str | None:
+    """
+    Hash of a model's fitted state: the sklearn/XGB pipeline, the Keras
+    architecture + weights, or a loaded bundle's file hashes.  None if the
+    model type is not recognised (such models are never cached).
+    """
+    name = f"{type(model).__module__}.{type(model).__qualname__}:{getattr(model, 'lookback', '')}"
+    if getattr(model, "manifest", None) is not None:
+        return _digest(name, json.dumps(model.manifest["files"], sort_keys=True))
+    if getattr(model, "pipeline", None) is not None:
+        return _digest(name, _pipeline_hash(model.pipeline))
+    if getattr(model, "model", None) is not None and hasattr(model.model, "get_weights"):
+        weights = [np.ascontiguousarray(w).data for w in model.model.get_weights()]
+        return _digest(name, model.model.to_json(), *weights)
+    return None
+
+def data_fingerprint(df: pd.DataFrame) -> str:
+    """Hash of the bar timestamps and OHLCV values."""
+    cols = [c for c in ("open", "high", "low", "close", "volume") if c in df.columns]
+    vals = np.ascontiguousarray(df[cols].to_numpy(dtype=np.float64))
+    idx  = np.ascontiguousarray(df.index.asi8) if isinstance(df.index, pd.DatetimeIndex) \
+           else np.ascontiguousarray(np.arange(len(df)))
+    return _digest(",".join(cols), idx.data, vals.data)
+
+def cache_key(model_fp: str, data_fp: str, fee_per_trade: float, min_confidence: float) -> str:
+    return _digest(json.dumps({
+        "model":          model_fp,
+        "data":           data_fp,
+        "features":       FEATURE_SET_VERSION,
+        "fee_per_trade":  float(fee_per_trade),
+        "min_confidence": float(min_confidence),
+    }, sort_keys=True))
+
+def prediction_key(model_fp: str, data_fp: str) -> str:
+    """Key of a model's per-bar outputs on some bars (see app.sweep)."""
+    return _digest(json.dumps({"model": model_fp, "data": data_fp,
+                               "features": FEATURE_SET_VERSION}, sort_keys=True))
+
+# ── Store ────────────────────────────────────────────────────────────────────
+
+class BacktestCache:
+    """
+    One `<key>.npz` (named arrays — for backtests the P/L and trade
+    columns) + `<key>.json` (stats and labels) per result.
+    A hit touches the entry, so eviction drops the least recently used ones.
+    """
+    def __init__(self, root: Path = CACHE_DIR, max_mb: float = CACHE_MAX_MB):
+        self.root      = Path(root)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _paths(self, key: str):
+        return self.root / f"{key}.npz", self.root / f"{key}.json"
+
+    def load(self, key: str):
+        """({name: array}, meta) stored under `key`, or None."""
+        arr_path, meta_path = self._paths(key)
+        try:
+            with np.load(arr_path) as z:
+                arrays = {k: z[k] for k in z.files}
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            return None
+        now = time.time()
+        for p in (arr_path, meta_path):
+            os.utime(p, (now, now))
+        return arrays, meta
+
+    def store(self, key: str, arrays: dict, meta: dict):
+        arr_path, meta_path = self._paths(key)
+        meta = {**meta, "key": key, "created": time.time()}
+        # write-then-rename, so concurrent workers never read half a file
+        tmp = arr_path.with_name(f"{key}.{os.getpid()}.tmp.npz")
+        np.savez(tmp, **arrays)
+        os.replace(tmp, arr_path)
+        tmp = meta_path.with_name(f"{key}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, meta_path)
+        self.evict()
+
+    def get(self, key: str):
+        """(pl, meta, trade columns) for `key`, or None."""
+        hit = self.load(key)
+        if hit is None or "pl" not in hit[0]:
+            return None
+        arrays, meta = hit
+        pl = arrays.pop("pl")
+        return pl, meta, arrays
+
+    def put(self, key: str, pl, meta: dict, trades: dict | None = None):
+        self.store(key, {"pl": np.asarray(pl, dtype=np.float64), **(trades or {})}, meta)
+
+    def entries(self) -> list[dict]:
+        """Metadata of every entry, most recently used first."""
+        out = []
+        for meta_path in self.root.glob("*.json"):
+            arr_path = meta_path.with_suffix(".npz")
+            try:
+                meta = json.loads(meta_path.read_text())
+                st   = arr_path.stat()
+            except (OSError, ValueError):
+                continue
+            meta["bytes"]     = st.st_size + meta_path.stat().st_size
+            meta["last_used"] = st.st_mtime
+            out.append(meta)
+        return sorted(out, key=lambda m: m["last_used"], reverse=True)
+
+    def total_bytes(self) -> int:
+        return sum(m["bytes"] for m in self.entries())
+
+    def remove(self, key: str):
+        for p in self._paths(key):
+            p.unlink(missing_ok=True)
+
+    def evict(self) -> int:
+        """Drop least recently used entries until under max_bytes; returns count."""
+        entries = self.entries()
+        total   = sum(m["bytes"] for m in entries)
+        dropped = 0
+        while entries and total > self.max_bytes:
+            m = entries.pop()
+            self.remove(m["key"])
+            total   -= m["bytes"]
+            dropped += 1
+        return dropped
+
+    def clear(self, older_than: float | None = None) -> int:
+        """Remove all entries (or those unused for `older_than` seconds)."""
+        cutoff  = None if older_than is None else time.time() - older_than
+        dropped = 0
+        for m in self.entries():
+            if cutoff is None or m["last_used"] < cutoff:
+                self.remove(m["key"])
+                dropped += 1
+        for tmp in self.root.glob("*.tmp*"):
+            tmp.unlink(missing_ok=True)
+        return dropped
+
+# ── Cached backtest ──────────────────────────────────────────────────────────
+
+def cached_backtest(symbol: str,
+                    model,
+                    fee_per_trade: float = 0.0,
+                    min_confidence: float = 0.0,
+                    df=None,
+                    cache: BacktestCache | None = None,
+                    model_fp: str | None = None,
+                    data_fp: str | None = None,
+                    vectorized: bool = True,
+                    trades=None):
+    """
+    backtest_symbol through the cache.  Returns (pl, hit); the trades go to
+    the `trades` TradeBuffer either way.  Pass `model_fp` / `data_fp` when
+    they are already known to skip re-hashing.
+    """
+    from app.backtester import backtest_symbol
+    from app.market_data import fetch_market_data
+    from app.trade_logger import TradeBuffer
+
+    df       = fetch_market_data(symbol) if df is None else df
+    cache    = cache or BacktestCache()
+    model_fp = model_fp or model_fingerprint(model)
+    if model_fp is None:
+        return backtest_symbol(symbol, model, fee_per_trade, min_confidence,
+                               df=df, vectorized=vectorized, trades=trades), False
+
+    key = cache_key(model_fp, data_fp or data_fingerprint(df), fee_per_trade, min_confidence)
+    hit = cache.get(key)
+    if hit is not None:
+        pl, _, cols = hit
+        if trades is not None and "signal" in cols:
+            trades.append(symbol, cols["signal"], cols["volume"], cols["entry_price"],
+                          cols["exit_price"], pl, timestamp=cols["timestamp"])
+        return pl, True
+
+    buf = TradeBuffer()
+    pl  = backtest_symbol(symbol, model, fee_per_trade, min_confidence,
+                          df=df, vectorized=vectorized, trades=buf)
+    pl  = np.asarray(pl, dtype=np.float64)
+    cols = buf.columns()
+    if trades is not None:
+        trades.extend(cols)
+    cache.put(key, pl, {
+        "symbol":         symbol,
+        "model":          type(model).__name__,
+        "bars":           len(df),
+        "fee_per_trade":  fee_per_trade,
+        "min_confidence": min_confidence,
+        "trades":         int(len(pl)),
+        "total":          float(pl.sum()),
+    }, trades={
+        "timestamp":   cols["timestamp"].astype("datetime64[ns]"),
+        "signal":      cols["signal"].astype("U4"),
+        "volume":      cols["volume"].astype(np.float64),
+        "entry_price": cols["entry_price"].astype(np.float64),
+        "exit_price":  cols["exit_price"].astype(np.float64),
+    } if len(buf) else None)
+    return pl, False
+
+# ── CLI ──────────────────────────────────────────────────────────────────────
+
+def main(argv=None):
+    ap  = argparse.ArgumentParser(description="Inspect or clear the backtest result cache")
+    ap.add_argument("--dir", default=str(CACHE_DIR))
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list",  help="one line per cached result")
+    sub.add_parser("stats", help="entry count and size")
+    clr = sub.add_parser("clear", help="delete cached results")
+    clr.add_argument("--older-than-days", type=float, default=None)
+    args = ap.parse_args(argv)
+
+    cache = BacktestCache(args.dir)
+    if args.cmd == "list":
+        for m in cache.entries():
+            used = time.strftime("%Y-%m-%d %H:%M", time.localtime(m["last_used"]))
+            print(f"{m['key'][:12]}  {m.get('model', '?'):<14} {m.get('symbol', '?'):<8} "
+                  f"bars={m.get('bars', 0):<7} trades={m.get('trades', 0):<6} "
+                  f"total={m.get('total', 0.0):+.5f}  used {used}")
+    elif args.cmd == "stats":
+        entries = cache.entries()
+        size    = sum(m["bytes"] for m in entries) / 1024 / 1024
+        print(f"📦 {len(entries)} cached backtests, {size:.1f} MB "
+              f"(limit {cache.max_bytes / 1024 / 1024:.0f} MB) in {cache.root}")
+    else:
+        secs = None if args.older_than_days is None else args.older_than_days * 86400
+        print(f"🧹 Removed {cache.clear(secs)} cached backtests")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
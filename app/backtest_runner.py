@@ -0,0 +1,177 @@
+# app/backtest_runner.py
+"""
+Fan (model, symbol) backtests out over a process pool.
+
+Bars are fetched once in the parent and handed to the workers at start-up
+(pickled once per worker), each worker builds a model the first
+time it needs it and keeps it for the rest of its jobs, and every job
+reports its own wall/CPU time.  With cache=True results come from / go to
+the backtest cache (see app.backtest_cache).  Simulated trades are
+buffered per job and written once per run to a results file.
+"""
+import os
+import time
+import importlib
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from app.market_data import fetch_market_data
+from app.backtester  import backtest_symbol
+from app.trade_logger import TradeBuffer, write_results
+from app.backtest_cache import BacktestCache, cached_backtest, model_fingerprint, data_fingerprint
+
+# name → "module:Class" (or any picklable zero-argument factory)
+MODEL_SPECS = {
+    "RF":   "app.models.rf_model:RFModel",
+    "XGB":  "app.models.xgb_model:MomentumModel",
+    "LSTM": "app.models.lstm_model:LSTMModel",
+    "CNN":  "app.models.cnn_model:CNNModel",
+}
+
+# per-process state, filled by _init_worker
+_WORKER = {"specs": {}, "data": {}, "models": {}, "cache": None, "fp": {}}
+
+def _build(spec):
+    if isinstance(spec, str):
+        module, cls = spec.split(":")
+        return getattr(importlib.import_module(module), cls)()
+    return spec()
+
+def _init_worker(specs: dict, data: dict, cache_dir=None):
+    _WORKER["specs"]  = specs
+    _WORKER["data"]   = data
+    _WORKER["models"] = {}
+    _WORKER["cache"]  = BacktestCache(cache_dir) if cache_dir else None
+    _WORKER["fp"]     = {}
+
+def _fingerprint(kind: str, name: str, obj) -> str | None:
+    # hashed once per worker per model / symbol
+    key = (kind, name)
+    if key not in _WORKER["fp"]:
+        _WORKER["fp"][key] = model_fingerprint(obj) if kind == "model" else data_fingerprint(obj)
+    return _WORKER["fp"][key]
+
+def _run_job(name: str, symbol: str, fee_per_trade: float,
+             min_confidence: float, vectorized: bool) -> dict:
+    t0, c0 = time.perf_counter(), time.process_time()
+    model  = _WORKER["models"].get(name)
+    if model is None:
+        model = _WORKER["models"][name] = _build(_WORKER["specs"][name])
+    load_s = time.perf_counter() - t0
+
+    df, cache = _WORKER["data"][symbol], _WORKER["cache"]
+    trades    = TradeBuffer()
+    hit       = False
+    if cache is not None:
+        pl, hit = cached_backtest(symbol, model, fee_per_trade, min_confidence,
+                                  df         = df,
+                                  cache      = cache,
+                                  model_fp   = _fingerprint("model", name, model),
+                                  data_fp    = _fingerprint("data", symbol, df),
+                                  vectorized = vectorized,
+                                  trades     = trades)
+    else:
+        pl = backtest_symbol(symbol, model,
+                             fee_per_trade  = fee_per_trade,
+                             min_confidence = min_confidence,
+                             df             = df,
+                             vectorized     = vectorized,
+                             trades         = trades)
+    return {
+        "model":       name,
+        "symbol":      symbol,
+        "pl":          np.asarray(pl, dtype=float),
+        "cached":      hit,
+        "trades":      trades.columns(),
+        "load_s":      load_s,
+        "seconds":     time.perf_counter() - t0,
+        "cpu_seconds": time.process_time() - c0,
+        "pid":         os.getpid(),
+    }
+
+def load_bars(symbols) -> dict:
+    """Fetch each symbol's bars once, in this process."""
+    return {s: fetch_market_data(s) for s in symbols}
+
+def compute_stats(pl) -> dict:
+    pl   = np.asarray(pl, dtype=float)
+    n    = len(pl)
+    return {
+        "n":        n,
+        "win_rate": float((pl > 0).mean() * 100) if n else 0.0,
+        "total":    float(pl.sum()),
+        "avg":      float(pl.mean()) if n else 0.0,
+    }
+
+def run_backtests(models: dict,
+                  symbols,
+                  fee_per_trade: float = 0.0,
+                  min_confidence: float = 0.0,
+                  data: dict | None = None,
+                  max_workers: int | None = None,
+                  vectorized: bool = True,
+                  cache: bool = True,
+                  save_trades: bool = False):
+    """
+    Backtest every (model, symbol) pair.  `models` maps a name to a spec
+    (see MODEL_SPECS).  Returns (summary, jobs, pl):
+      summary — one row per model: trades, win rate, total/avg P/L, time
+      jobs    — one row per (model, symbol) with its P/L stats and timing
+      pl      — {model: concatenated per-trade P/L array, in symbol order}
+    max_workers=1 runs everything in this process; cache=False always
+    re-runs the backtests.  With save_trades (opt-in) every simulated trade
+    (plus a model column) is written to one results file, whose path is
+    left in summary.attrs["trades_file"].
+    """
+    symbols = list(symbols)
+    data    = load_bars(symbols) if data is None else data
+    jobs    = [(name, s) for name in models for s in symbols]
+    workers = max_workers or min(len(jobs), os.cpu_count() or 1)
+    args    = (fee_per_trade, min_confidence, vectorized)
+    init    = (models, data, BacktestCache().root if cache else None)
+
+    results = []
+    if workers <= 1:
+        _init_worker(*init)
+        results = [_run_job(name, s, *args) for name, s in jobs]
+    else:
+        # spawn: callers often fit TF / XGBoost first, and their thread
+        # pools don't survive fork
+        ctx = mp.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_worker, initargs=init) as pool:
+            futures = [pool.submit(_run_job, name, s, *args) for name, s in jobs]
+            for fut in as_completed(futures):
+                results.append(fut.result())
+
+    order = {job: i for i, job in enumerate(jobs)}
+    results.sort(key=lambda r: order[(r["model"], r["symbol"])])
+
+    jobs_df = pd.DataFrame([
+        {"model": r["model"], "symbol": r["symbol"], **compute_stats(r["pl"]),
+         "cached": r["cached"], "load_s": r["load_s"], "seconds": r["seconds"],
+         "cpu_seconds": r["cpu_seconds"], "pid": r["pid"]}
+        for r in results
+    ])
+    pl = {name: np.concatenate([r["pl"] for r in results if r["model"] == name] or [np.empty(0)])
+          for name in models}
+    summary = pd.DataFrame([
+        {"model": name, **compute_stats(pl[name]),
+         "job_seconds": float(jobs_df.loc[jobs_df["model"] == name, "seconds"].sum())}
+        for name in models
+    ]).set_index("model")
+
+    if save_trades:
+        merged = TradeBuffer()
+        for r in results:
+            merged.extend(r["trades"])
+        frame = merged.to_frame()
+        frame.insert(0, "model", np.repeat([r["model"] for r in results],
+                                           [len(r["trades"]["profit"]) for r in results]))
+        summary.attrs["trades_file"] = str(write_results(frame))
+    return summary, jobs_df, pl
+
+__all__ = ["MODEL_SPECS", "load_bars", "compute_stats", "run_backtests"]
@@ -1,20 +1,32 @@
 #!/usr/bin/env python3
 import numpy as np
+import pandas as pd
 from app.market_data import fetch_market_data
-from app.trade_logger import log_trade
+from app.trade_logger import TradeBuffer
+from app.models.signals import BUY, SELL
 
 def backtest_symbol(symbol: str,
                     model,
                     fee_per_trade: float = 0.0,
-                    min_confidence: float = 0.0):
+                    min_confidence: float = 0.0,
+                    df=None,
+                    vectorized: bool = False,
+                    trades: TradeBuffer | None = None):
     """
     Runs a next-bar backtest on 1-min data for `symbol`.
     For each bar t, predict on bars[:t], enter at open(t+1), exit at open(t+2).
     Only trades if model.confidence >= min_confidence.
+    Pass `df` to backtest given bars instead of fetching them, and
+    `vectorized=True` to use backtest_vectorized (same trades, one pass).
+    Trades are recorded in `trades` if given (nothing touches the live log).
     """
-    df      = fetch_market_data(symbol)
+    if vectorized:
+        return backtest_vectorized(symbol, model, fee_per_trade, min_confidence,
+                                   df=df, trades=trades)
+
+    df      = fetch_market_data(symbol) if df is None else df
     opens   = df["open"].values
-    profits = []
+    profits, taken = [], []
 
     # t runs from lookback .. len(df)-3 so that open[t+2] exists
     for t in range(model.lookback, len(df) - 2):
@@ -31,19 +43,69 @@ def backtest_symbol(symbol: str,
         direction = 1 if sig == "BUY" else -1
         raw_pl    = direction * (exit_ - entry)
         profit    = raw_pl - fee_per_trade
-        is_win    = profit > 0
-
-        # log each trade
-        log_trade(
-            symbol      = symbol,
-            signal      = sig,
-            volume      = 1.0,
-            entry_price = entry,
-            exit_price  = exit_,
-            profit      = profit,
-            win         = is_win,
-        )
 
         profits.append(profit)
+        taken.append((t, direction))
+
+    profits = np.array(profits)
+    if trades is not None and taken:
+        t, direction = map(np.array, zip(*taken))
+        _record(trades, symbol, df, t, direction, opens[t + 1], opens[t + 2], profits)
+    return profits
+
+def _record(trades: TradeBuffer, symbol, df, t, direction, entry, exit_, profits):
+    # one columnar append per backtest; timestamps are the entry bars
+    stamp = df.index[t + 1] if isinstance(df.index, pd.DatetimeIndex) else None
+    trades.append(symbol, np.where(direction > 0, "BUY", "SELL"), 1.0,
+                  entry, exit_, profits, timestamp=stamp)
+
+def predict_signals(model, df, news: float = 0.0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Per-bar (signal, confidence) arrays for the whole of `df`: signal is
+    +1/0/-1 for BUY/HOLD/SELL and confidence is in [0, 1].  Entry t is what
+    model.predict(df.iloc[:t+1]) returns.  Uses the model's predict_batch
+    (features built once, one batched inference) when it has one, otherwise
+    falls back to calling predict on each growing window.
+    """
+    if hasattr(model, "predict_batch"):
+        out = model.predict_batch(df, news)
+        return np.asarray(out["signal"], dtype=np.int8), np.asarray(out["confidence"]) / 100.0
+
+    n    = len(df)
+    sig  = np.zeros(n, dtype=np.int8)
+    conf = np.zeros(n)
+    codes = {"BUY": BUY, "SELL": SELL}
+    for t in range(model.lookback, n - 2):
+        out     = model.predict(df.iloc[: t + 1], news=news)
+        sig[t]  = codes.get(out["signal"], 0)
+        conf[t] = out["confidence"] / 100.0
+    return sig, conf
+
+def backtest_vectorized(symbol: str,
+                        model,
+                        fee_per_trade: float = 0.0,
+                        min_confidence: float = 0.0,
+                        df=None,
+                        trades: TradeBuffer | None = None) -> np.ndarray:
+    """
+    Array form of backtest_symbol: predictions for all bars in one batch,
+    then entries at open[t+1], exits at open[t+2], fees and the confidence
+    filter as array operations.  Returns the same per-trade profits and
+    records the same trades in `trades`.
+    """
+    df         = fetch_market_data(symbol) if df is None else df
+    opens      = df["open"].to_numpy(dtype=np.float64)
+    sig, conf  = predict_signals(model, df)
+
+    t          = np.arange(model.lookback, max(model.lookback, len(df) - 2))
+    take       = (sig[t] != 0) & (conf[t] >= min_confidence)
+    t          = t[take]
+    direction  = sig[t].astype(np.float64)
+    entry      = opens[t + 1]
+    exit_      = opens[t + 2]
+    profits    = direction * (exit_ - entry) - fee_per_trade
+
+    if trades is not None:
+        _record(trades, symbol, df, t, direction, entry, exit_, profits)
 
-    return np.array(profits)
+    return profits
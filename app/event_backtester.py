@@ -0,0 +1,263 @@
+# app/event_backtester.py
+"""
+Event-driven backtest with broker-style fills.
+
+Unlike backtester.py (enter at the next open, exit one bar later), every
+signal opens a position the way open_trade() does — volume through
+normalize_volume, SL/TP from the same rules as compute_trade_levels — and
+the position lives until its SL or TP is touched inside a later bar's
+high/low range (or an optional time stop, or the end of the data).
+
+Bars are bid prices; BUYs fill at the ask (bid + spread) and are closed at
+the bid, SELLs the other way round.  When one bar touches both SL and TP
+the intrabar path decides: a bullish bar is assumed to go open → low →
+high → close, a bearish one open → high → low → close.  Gaps through a
+level fill at the bar's open.
+
+All state is in NumPy arrays: exits for every candidate entry are found
+at once with a block min/max index over the lows and highs, and only the
+max_positions bookkeeping walks the entries in order.
+"""
+import heapq
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from config import LOT_BASE, FOREX_MAJORS
+from app.mt5_handler import normalize_volume, compute_trade_levels_array
+
+# exit reasons
+EXIT_SL, EXIT_TP, EXIT_TIME, EXIT_END = 0, 1, 2, 3
+EXIT_NAMES = {EXIT_SL: "SL", EXIT_TP: "TP", EXIT_TIME: "TIME", EXIT_END: "END"}
+
+# bars per block of the first-touch index
+BLOCK = 32
+
+@dataclass
+class SymbolSpec:
+    """The symbol_info fields open_trade relies on, plus trading costs."""
+    digits:             int
+    point:              float
+    trade_stops_level:  int   = 0
+    volume_min:         float = 0.01
+    volume_step:        float = 0.01
+    contract_size:      float = 100_000.0
+    spread_points:      float = 10.0      # quoted ask - bid, in points
+    commission_per_lot: float = 0.0       # per side
+    currency_base:      str   = ""
+    currency_profit:    str   = "USD"     # P/L currency, as MT5 names them
+
+    @property
+    def spread(self) -> float:
+        return self.spread_points * self.point
+
+def default_spec(symbol: str) -> SymbolSpec:
+    """Typical retail-broker contract for our FX majors / crypto symbols."""
+    s = symbol.upper()
+    if s in FOREX_MAJORS:
+        jpy = "JPY" in s
+        return SymbolSpec(digits=3 if jpy else 5, point=0.001 if jpy else 0.00001,
+                          currency_base=s[:3], currency_profit=s[3:])
+    quote = next((q for q in ("USDT", "USDC", "USD") if s.endswith(q)), "")
+    return SymbolSpec(digits=2, point=0.01, contract_size=1.0, spread_points=50,
+                      currency_base=s[: len(s) - len(quote)] if quote else "",
+                      currency_profit=quote or "USD")
+
+class _FirstTouch:
+    """
+    "First bar j in [start, last] with x[j] <= threshold" for many queries
+    at once.  The series is cut into BLOCK-bar blocks with a sparse table of
+    block minima on top, so a query scans at most two blocks directly and
+    skips everything in between in O(log n) steps.
+    """
+    def __init__(self, x):
+        self.n  = len(x)
+        self.nb = -(-self.n // BLOCK)
+        self.x  = np.full(self.nb * BLOCK, np.inf)
+        self.x[: self.n] = x
+        # levels[k][b] = min of blocks b .. b+2**k-1 (clipped to the end)
+        self.levels = [self.x.reshape(self.nb, BLOCK).min(axis=1)]
+        while (1 << len(self.levels)) <= self.nb:
+            prev, step = self.levels[-1], 1 << (len(self.levels) - 1)
+            nxt = prev.copy()
+            nxt[: self.nb - step] = np.minimum(prev[: self.nb - step], prev[step:])
+            self.levels.append(nxt)
+
+    def _in_block(self, start, thr):
+        """First hit from `start` to the end of its block, -1 if none."""
+        bars = start[:, None] + np.arange(BLOCK)
+        hit  = (self.x[np.minimum(bars, len(self.x) - 1)] <= thr[:, None]) \
+               & (bars < (start // BLOCK + 1)[:, None] * BLOCK)
+        return np.where(hit.any(axis=1), start + hit.argmax(axis=1), -1)
+
+    def first(self, start, thr, last) -> np.ndarray:
+        j    = self._in_block(start, thr)
+        need = j < 0
+        b    = start // BLOCK + 1
+        for k in reversed(range(len(self.levels))):
+            jump = b + (1 << k)
+            ok   = need & (jump <= self.nb) & (self.levels[k][np.minimum(b, self.nb - 1)] > thr)
+            b    = np.where(ok, jump, b)
+        found = need & (b < self.nb)
+        if found.any():
+            j[found] = self._in_block(b[found] * BLOCK, thr[found])
+        return np.where(j > last, -1, j)
+
+def _scan_exits(o, h, l, c, spread, entry_bar, side, sl, tp, last_bar):
+    """
+    First bar in [entry_bar, last_bar] where each position's SL or TP is
+    touched.  Returns (exit_bar, exit_price, reason); bar -1 = not hit.
+    """
+    is_long = side > 0
+    # shorts are closed at the ask: high + spread >= sl  <=>  high >= sl - spread
+    low_hit  = _FirstTouch(l).first(entry_bar, np.where(is_long, sl, tp - spread), last_bar)
+    high_hit = _FirstTouch(-h).first(entry_bar, -np.where(is_long, tp, sl - spread), last_bar)
+    sl_bar   = np.where(is_long, low_hit, high_hit)
+    tp_bar   = np.where(is_long, high_hit, low_hit)
+
+    never    = np.iinfo(np.int64).max
+    sl_at    = np.where(sl_bar < 0, never, sl_bar)
+    tp_at    = np.where(tp_bar < 0, never, tp_bar)
+    j        = np.minimum(sl_at, tp_at)
+    found    = j != never
+    jj       = np.where(found, j, 0)
+    # same bar: a bullish bar visits its low first — a long's SL, a short's TP
+    sl_first = (c[jj] >= o[jj]) == is_long
+    is_sl    = (sl_at < tp_at) | ((sl_at == tp_at) & sl_first)
+
+    level    = np.where(is_sl, sl, tp)
+    open_q   = o[jj] + np.where(is_long, 0.0, spread)
+    d        = np.where(is_long, 1.0, -1.0)
+    # opening beyond the level (after a gap) fills at the open
+    gapped   = (jj > entry_bar) & np.where(is_sl, d * (open_q - level) <= 0,
+                                                  d * (open_q - level) >= 0)
+    exit_bar = np.where(found, j, -1)
+    exit_px  = np.where(found, np.where(gapped, open_q, level), 0.0)
+    reason   = np.where(found, np.where(is_sl, EXIT_SL, EXIT_TP), EXIT_END).astype(np.int8)
+    return exit_bar, exit_px, reason
+
+def simulate_symbol(symbol: str,
+                    df,
+                    signal,
+                    confidence=None,
+                    spec: SymbolSpec | None = None,
+                    volume: float = LOT_BASE,
+                    min_confidence: float = 0.0,
+                    max_positions: int | None = None,
+                    max_hold_bars: int | None = None) -> dict:
+    """
+    Simulate one symbol.  `signal[t]` (+1/0/-1) and `confidence[t]` (0-1)
+    are what the model said after bar t closed; the order fills at
+    open[t+1].  At most `max_positions` are open at once (None = no cap);
+    `max_hold_bars` closes a position at the open that many bars after
+    entry.  Returns a dict of per-trade arrays (see TRADE_FIELDS).
+    """
+    spec   = spec or default_spec(symbol)
+    o      = df["open"].to_numpy(dtype=np.float64)
+    h      = df["high"].to_numpy(dtype=np.float64)
+    l      = df["low"].to_numpy(dtype=np.float64)
+    c      = df["close"].to_numpy(dtype=np.float64)
+    n      = len(o)
+    signal = np.asarray(signal)
+    conf   = np.ones(n) if confidence is None else np.asarray(confidence, dtype=np.float64)
+
+    t      = np.nonzero((signal[: n - 1] != 0) & (conf[: n - 1] >= min_confidence))[0]
+    entry_bar = t + 1
+    side   = signal[t].astype(np.int8)
+    entry  = o[entry_bar] + np.where(side > 0, spec.spread, 0.0)
+    sl, tp = compute_trade_levels_array(entry, side, spec, symbol)
+    vol    = normalize_volume(volume, spec)
+
+    last_bar = np.full(len(t), n - 1, dtype=np.int64)
+    if max_hold_bars:
+        last_bar = np.minimum(entry_bar + max_hold_bars - 1, n - 1)
+    exit_bar, exit_px, reason = _scan_exits(o, h, l, c, spec.spread,
+                                            entry_bar, side, sl, tp, last_bar)
+
+    # not stopped out: time stop at the next open, else out at the last close
+    open_ = exit_bar < 0
+    timed = open_ & (last_bar + 1 < n)
+    ask   = np.where(side > 0, 0.0, spec.spread)
+    exit_bar[timed]  = last_bar[timed] + 1
+    exit_px[timed]   = o[exit_bar[timed]] + ask[timed]
+    reason[timed]    = EXIT_TIME
+    ended = open_ & ~timed
+    exit_bar[ended]  = n - 1
+    exit_px[ended]   = c[n - 1] + ask[ended]
+
+    keep = _position_cap(entry_bar, exit_bar, max_positions)
+    side, entry_bar, exit_bar = side[keep], entry_bar[keep], exit_bar[keep]
+    entry, exit_px, sl, tp, reason = entry[keep], exit_px[keep], sl[keep], tp[keep], reason[keep]
+
+    commission = 2 * spec.commission_per_lot * vol
+    profit     = side * (exit_px - entry) * vol * spec.contract_size - commission
+    return {
+        "side":        side,
+        "volume":      np.full(len(side), vol),
+        "entry_bar":   entry_bar,
+        "exit_bar":    exit_bar,
+        "entry_price": entry,
+        "exit_price":  exit_px,
+        "sl":          sl,
+        "tp":          tp,
+        "reason":      reason,
+        "commission":  np.full(len(side), commission),
+        "profit":      profit,
+    }
+
+TRADE_FIELDS = ("side", "volume", "entry_bar", "exit_bar", "entry_price", "exit_price",
+                "sl", "tp", "reason", "commission", "profit")
+
+def _position_cap(entry_bar, exit_bar, max_positions) -> np.ndarray:
+    """
+    Mask of entries taken when at most `max_positions` may be open at once.
+    A position closing inside bar t is still open at bar t's open.
+    """
+    if not max_positions:
+        return np.ones(len(entry_bar), dtype=bool)
+    keep, book = np.zeros(len(entry_bar), dtype=bool), []
+    for i, (e, x) in enumerate(zip(entry_bar.tolist(), exit_bar.tolist())):
+        while book and book[0] < e:
+            heapq.heappop(book)
+        if len(book) < max_positions:
+            heapq.heappush(book, x)
+            keep[i] = True
+    return keep
+
+def run_event_backtest(symbols,
+                       model=None,
+                       signals: dict | None = None,
+                       data: dict | None = None,
+                       specs: dict | None = None,
+                       **kwargs) -> pd.DataFrame:
+    """
+    simulate_symbol over many symbols.  Signals come from `signals`
+    ({symbol: (signal, confidence)}) or are predicted with `model`; bars
+    from `data` ({symbol: df}) or fetch_market_data.  Extra keyword
+    arguments go to simulate_symbol.  Returns one row per trade, in exit
+    order, with the running account P/L in "equity".
+    """
+    from app.backtester import predict_signals
+    from app.market_data import fetch_market_data
+
+    specs, frames = specs or {}, []
+    for symbol in symbols:
+        df = data[symbol] if data is not None else fetch_market_data(symbol)
+        sig, conf = signals[symbol] if signals is not None else predict_signals(model, df)
+        res = simulate_symbol(symbol, df, sig, conf, spec=specs.get(symbol), **kwargs)
+
+        trades = pd.DataFrame(res, columns=TRADE_FIELDS)
+        trades.insert(0, "symbol", symbol)
+        trades["entry_time"] = df.index[res["entry_bar"]]
+        trades["exit_time"]  = df.index[res["exit_bar"]]
+        frames.append(trades)
+
+    trades = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=TRADE_FIELDS)
+    trades = trades.sort_values(["exit_time", "entry_time"], kind="stable").reset_index(drop=True)
+    trades["reason"] = trades["reason"].map(EXIT_NAMES)
+    trades["equity"] = trades["profit"].cumsum()
+    return trades
+
+__all__ = ["SymbolSpec", "default_spec", "simulate_symbol", "run_event_backtest",
+           "TRADE_FIELDS", "EXIT_NAMES"]
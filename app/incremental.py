@@ -0,0 +1,242 @@
+# app/incremental.py
+"""
+Incremental model updates: train the current models on the bars that
+arrived since their last update instead of retraining from scratch.
+
+    tree models (ai / xgb / rf)  continue from the fitted ensemble —
+                                 XGB boosts `rounds` more trees, RF grows
+                                 `rounds` more trees — on the new rows only
+                                 (past their MAX_ROUNDS / MAX_TREES, XGB
+                                 refits, RF drops its oldest trees)
+    Keras models (lstm / cnn)    fine-tune for a few epochs at a low
+                                 learning rate on the new windows
+
+Per symbol the newest HOLDOUT_FRACTION of the new bars is held out.  The
+updated model is promoted (saved over MODEL_FILE and re-exported as a
+bundle) only if its P/L on the holdout is at least the current model's;
+otherwise the old state is put back.  Each update costs time proportional to the new bars, plus
+FEATURE_CONTEXT bars of indicator warm-up per symbol.
+"""
+import copy
+import json
+import time
+import importlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.backtester import predict_signals
+from app.profiler import StageProfiler
+from app.models.artifacts import ArtifactError, save_bundle
+
+UPDATE_STATE     = Path(__file__).parent / "update_state.json"
+FEATURE_CONTEXT  = 60     # bars before the first new one, for indicator warm-up
+HOLDOUT_FRACTION = 0.2
+MIN_NEW_BARS     = 30     # symbols with fewer new bars wait for the next update
+TREE_ROUNDS      = {"ai": 50, "xgb": 50, "rf": 20}
+FINE_TUNE_EPOCHS = 3
+HISTORY_LEN      = 200    # update records kept in UPDATE_STATE
+
+# name → (module, class), as in the inference server; ai and xgb share
+# xgb_model.joblib, so update one of them
+MODELS = {
+    "ai":   ("app.models.ai_model",   "MomentumModel"),
+    "xgb":  ("app.models.xgb_model",  "MomentumModel"),
+    "rf":   ("app.models.rf_model",   "RFModel"),
+    "lstm": ("app.models.lstm_model", "LSTMModel"),
+    "cnn":  ("app.models.cnn_model",  "CNNModel"),
+}
+
+# ── State ────────────────────────────────────────────────────────────────────
+
+def load_state(path: Path = UPDATE_STATE) -> dict:
+    """{"models": {name: {symbol: last trained bar (ISO)}}, "history": [...]}"""
+    try:
+        return json.loads(Path(path).read_text())
+    except (OSError, ValueError):
+        return {"models": {}, "history": []}
+
+def save_state(state: dict, path: Path = UPDATE_STATE):
+    path = Path(path)
+    tmp  = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2))
+    tmp.replace(path)
+
+# ── Data ─────────────────────────────────────────────────────────────────────
+
+def split_new(df: pd.DataFrame, since: str | None, holdout: float = HOLDOUT_FRACTION):
+    """
+    (train, train_first, hold, hold_first) frames for the bars after
+    `since`: each frame starts with up to FEATURE_CONTEXT older bars, and
+    *_first is the position of its first bar that may be trained on or
+    traded.  None if there are fewer than MIN_NEW_BARS new bars.
+    """
+    first = 0 if since is None else int(df.index.searchsorted(pd.Timestamp(since), side="right"))
+    n_new = len(df) - first
+    if n_new < MIN_NEW_BARS:
+        return None
+    cut = first + int(n_new * (1 - holdout))
+    tr0 = max(0, first - FEATURE_CONTEXT)
+    ho0 = max(0, cut - FEATURE_CONTEXT)
+    return df.iloc[tr0:cut], first - tr0, df.iloc[ho0:], cut - ho0
+
+def update_data(model, frames: list):
+    """
+    Training input for model.update from [(frame, first, news)]: (X, y)
+    rows for tree models, a WindowBatches for Keras models — only samples
+    whose target bar lies at or after `first`.
+    """
+    if hasattr(model, "training_data"):
+        parts = []
+        for frame, first, news in frames:
+            df2  = frame.reset_index(drop=True)
+            X, y = model.training_data(df2, pd.Series(news, index=df2.index, dtype=float))
+            # the last bar has no next close inside the frame
+            keep = (X.index >= first) & (X.index < len(df2) - 1)
+            parts.append((X[keep], y[keep]))
+        return (pd.concat([p[0] for p in parts]), pd.concat([p[1] for p in parts]))
+
+    from app.models.sequence_data import WindowBatches
+    batches = [model._windows(frame, pd.Series(news, index=frame.index, dtype=float),
+                              batch_size=32, first_bar=first)
+               for frame, first, news in frames]
+    return (WindowBatches.concat(batches),)
+
+def holdout_pl(model, frame: pd.DataFrame, first: int) -> np.ndarray:
+    """Per-trade P/L of backtest_vectorized's rules on the trades entered at or after `first`."""
+    sig, _ = predict_signals(model, frame)
+    opens  = frame["open"].to_numpy(dtype=np.float64)
+    t      = np.arange(max(first - 1, model.lookback), max(first - 1, model.lookback, len(frame) - 2))
+    t      = t[sig[t] != 0]
+    return sig[t] * (opens[t + 2] - opens[t + 1])
+
+def _trained(model) -> bool:
+    if getattr(model, "pipeline", None) is None:
+        return getattr(model, "model", None) is not None
+    from sklearn.exceptions import NotFittedError
+    from sklearn.utils.validation import check_is_fitted
+    try:
+        check_is_fitted(model.pipeline)
+        return True
+    except NotFittedError:
+        return False
+
+def _snapshot(model):
+    if getattr(model, "pipeline", None) is not None:
+        return copy.deepcopy(model.pipeline)
+    return model.model.get_weights()
+
+def _restore(model, snap):
+    if getattr(model, "pipeline", None) is not None:
+        model.pipeline = snap
+        model._compact = None
+    else:
+        model.model.set_weights(snap)
+
+# ── Update ───────────────────────────────────────────────────────────────────
+
+def update_model(name: str,
+                 model,
+                 data: dict,
+                 news: dict | None = None,
+                 state: dict | None = None,
+                 holdout: float = HOLDOUT_FRACTION,
+                 promote: bool = True) -> dict:
+    """
+    Update `model` on the new bars of `data` ({symbol: bars}) since
+    state["models"][name], validate on the holdout and promote or roll
+    back.  Updates `state` in place on promotion; returns a result row.
+    """
+    t0     = time.perf_counter()
+    news   = news or {}
+    state  = state if state is not None else load_state()
+    marks  = state.setdefault("models", {}).setdefault(name, {})
+    train, hold, last = [], [], {}
+    for sym, df in data.items():
+        parts = split_new(df, marks.get(sym), holdout)
+        if parts is None:
+            continue
+        tr, tr_first, ho, ho_first = parts
+        train.append((tr, tr_first, news.get(sym, 0.0)))
+        hold.append((ho, ho_first))
+        last[sym] = df.index[-1].isoformat()
+
+    row = {"model": name, "symbols": len(train), "samples": 0, "holdout_trades": 0,
+           "before": 0.0, "after": 0.0, "promoted": False, "status": "no new bars"}
+    if not train or not _trained(model):
+        # an untrained model needs a full fit first (scripts/train_models.py)
+        status = "no new bars" if not train else "not trained"
+        return {**row, "status": status, "seconds": time.perf_counter() - t0}
+
+    before = np.concatenate([holdout_pl(model, f, i) for f, i in hold])
+    snap   = _snapshot(model)
+    kwargs = {"rounds": TREE_ROUNDS[name]} if name in TREE_ROUNDS else {"epochs": FINE_TUNE_EPOCHS}
+    n      = model.update(*update_data(model, train), **kwargs)
+    after  = np.concatenate([holdout_pl(model, f, i) for f, i in hold])
+
+    better = n > 0 and after.sum() >= before.sum()
+    row.update(samples=n, holdout_trades=len(after), before=float(before.sum()),
+               after=float(after.sum()), promoted=bool(better and promote),
+               status="promoted" if better and promote else
+                      "validated" if better else "rejected")
+    if row["promoted"]:
+        model.save()
+        try:
+            save_bundle(model, training={"updated_on": last, "samples": n},
+                        metrics={"holdout_before": row["before"], "holdout_after": row["after"],
+                                 "holdout_trades": row["holdout_trades"]})
+        except ArtifactError as e:
+            # the live side falls back to MODEL_FILE
+            print(f"⚠️ No bundle for {name}: {e}")
+        marks.update(last)
+    else:
+        _restore(model, snap)
+
+    row["seconds"] = time.perf_counter() - t0
+    state.setdefault("history", []).append({**row, "time": time.strftime("%Y-%m-%dT%H:%M:%S")})
+    state["history"] = state["history"][-HISTORY_LEN:]
+    return row
+
+def run_updates(names,
+                symbols,
+                data: dict | None = None,
+                news: dict | None = None,
+                holdout: float = HOLDOUT_FRACTION,
+                promote: bool = True,
+                state_path: Path = UPDATE_STATE,
+                profiler: StageProfiler | None = None) -> pd.DataFrame:
+    """
+    update_model for each model name in `names` over `symbols` (bars from
+    `data` or fetch_market_data, sentiment from `news` or
+    get_news_sentiment).  Returns one row per model.  Stage timings go
+    to `profiler`, if given.
+    """
+    prof = profiler or StageProfiler("run_updates")
+    if data is None:
+        from app.market_data import fetch_market_data
+        with prof.stage("fetch", symbols=len(symbols)):
+            data = {s: fetch_market_data(s) for s in symbols}
+    if news is None:
+        from app.news import get_news_sentiment
+        news = {}
+        with prof.stage("news", symbols=len(symbols)):
+            for s in symbols:
+                try:
+                    news[s] = get_news_sentiment(s)
+                except Exception:
+                    news[s] = 0.0
+
+    state, rows = load_state(state_path), []
+    for name in names:
+        module, cls = MODELS[name]
+        with prof.stage("load", model=name):
+            model = getattr(importlib.import_module(module), cls)()
+        with prof.stage("update", model=name):
+            rows.append(update_model(name, model, data, news, state, holdout, promote))
+    if promote:
+        save_state(state, state_path)
+    return pd.DataFrame(rows)
+
+__all__ = ["MODELS", "UPDATE_STATE", "load_state", "split_new", "update_data",
+           "holdout_pl", "update_model", "run_updates"]
@@ -0,0 +1,167 @@
+# app/inference_client.py
+
+import os
+import stat
+import time
+import inspect
+import secrets
+from collections import deque
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client
+
+from config import INFERENCE_ADDRESS, INFERENCE_AUTHKEY, INFERENCE_KEY_FILE, INFERENCE_TIMEOUT
+
+class InferenceError(RuntimeError):
+    """Raised when the inference server is unreachable or a request fails."""
+
+def load_authkey(key: str | None = INFERENCE_AUTHKEY, path: str = INFERENCE_KEY_FILE) -> bytes:
+    """
+    The connection secret: `key` if given, else the per-install key file,
+    created with a random key (mode 0600) the first time.  Connections
+    exchange pickles, so a key file anyone else can read is refused.
+    """
+    if key:
+        return key.encode()
+    os.makedirs(os.path.dirname(path) or ".", mode=0o700, exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    else:
+        with os.fdopen(fd, "w") as f:
+            f.write(secrets.token_hex(32))
+    if os.name == "posix" and os.stat(path).st_mode & (stat.S_IRWXG | stat.S_IRWXO):
+        raise InferenceError(f"{path} is accessible to other users; chmod 600 it")
+    with open(path) as f:
+        secret = f.read().strip()
+    if not secret:
+        raise InferenceError(f"{path} is empty; delete it to generate a new key")
+    return secret.encode()
+
+def call_predict(model, df, news, symbol: str | None = None) -> dict:
+    """model.predict(df, news), passing `symbol` to models that keep per-symbol state (RLAgent)."""
+    if symbol is not None and "symbol" in inspect.signature(model.predict).parameters:
+        return model.predict(df, news, symbol=symbol)
+    return model.predict(df, news)
+
+def parse_address(address: str):
+    """
+    "/path/to.sock"  → Unix socket path
+    "host:port"      → (host, port) TCP tuple on localhost
+    """
+    if ":" in address and not address.startswith("/"):
+        host, port = address.rsplit(":", 1)
+        return (host or "127.0.0.1", int(port))
+    return address
+
+class InferenceClient:
+    """
+    Thin client for app.inference_server.  Deliberately imports nothing
+    heavier than the stdlib, so the scheduler process starts instantly.
+    Keeps the last `history` round-trip latencies for reporting.
+    """
+    def __init__(self,
+                 address: str = INFERENCE_ADDRESS,
+                 authkey: str | None = INFERENCE_AUTHKEY,
+                 timeout: float = INFERENCE_TIMEOUT,
+                 history: int = 1_000):
+        if not address:
+            raise InferenceError("INFERENCE_ADDRESS is not set")
+        self.address   = parse_address(address)
+        self.authkey   = load_authkey(authkey)
+        self.timeout   = timeout
+        self.conn      = None
+        self.latencies = deque(maxlen=history)
+        self.errors    = 0
+
+    # ── transport ────────────────────────────────────────────────────────────
+
+    def _connect(self):
+        if self.conn is None:
+            try:
+                self.conn = Client(self.address, authkey=self.authkey)
+            except AuthenticationError as e:
+                raise InferenceError(f"inference server at {self.address} rejected the key: {e}")
+            except (OSError, EOFError) as e:
+                raise InferenceError(f"cannot reach inference server at {self.address}: {e}")
+        return self.conn
+
+    def close(self):
+        if self.conn is not None:
+            try:
+                self.conn.close()
+            except OSError:
+                pass
+            self.conn = None
+
+    def _call(self, op: str, **payload):
+        t0 = time.perf_counter()
+        try:
+            conn = self._connect()
+            conn.send({"op": op, **payload})
+            if not conn.poll(self.timeout):
+                raise InferenceError(f"{op}: no reply within {self.timeout:.0f}s")
+            resp = conn.recv()
+        except InferenceError:
+            self.errors += 1
+            self.close()
+            raise
+        except (OSError, EOFError) as e:
+            self.errors += 1
+            self.close()
+            raise InferenceError(f"{op}: connection lost: {e}")
+
+        self.latencies.append(time.perf_counter() - t0)
+        if not resp.get("ok"):
+            self.errors += 1
+            raise InferenceError(f"{op}: {resp.get('error')}")
+        return resp.get("result")
+
+    # ── API ──────────────────────────────────────────────────────────────────
+
+    def ping(self) -> dict:
+        return self._call("ping")
+
+    def predict(self, model: str, df, news, symbol: str | None = None) -> dict:
+        """
+        Same return shape as the in-process model's .predict(df, news).
+        Pass `symbol` so models with per-symbol state (RLAgent) keep it apart.
+        """
+        return self._call("predict", model=model, df=df, news=news, symbol=symbol)
+
+    def predict_batch(self, model: str, items: list) -> list:
+        """
+        One round trip for many predictions: `items` is a list of (df, news)
+        pairs or (df, news, symbol) triples; returns a list of result dicts
+        in the same order.
+        """
+        if not items:
+            return []
+        return self._call("predict_batch", model=model, items=list(items))
+
+    def warm(self, *models: str) -> dict:
+        return self._call("warm", models=list(models))
+
+    def reload(self, model: str) -> dict:
+        """Ask the server to load a fresh copy of `model` and swap it in."""
+        return self._call("reload", model=model)
+
+    def stats(self) -> dict:
+        return self._call("stats")
+
+    def latency_summary(self) -> dict:
+        """Client-side round-trip latency over the recent history, in ms."""
+        lat = sorted(self.latencies)
+        if not lat:
+            return {"count": 0, "errors": self.errors}
+        pick = lambda q: lat[min(len(lat) - 1, int(q * len(lat)))] * 1e3
+        return {
+            "count":   len(lat),
+            "errors":  self.errors,
+            "mean_ms": sum(lat) / len(lat) * 1e3,
+            "p50_ms":  pick(0.50),
+            "p95_ms":  pick(0.95),
+            "max_ms":  lat[-1] * 1e3,
+        }
+
+__all__ = ["InferenceClient", "InferenceError", "call_predict", "load_authkey", "parse_address"]
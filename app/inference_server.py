@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+# File: app/inference_server.py
+"""
+Local inference service: owns the loaded models so the scheduler never
+imports TensorFlow / XGBoost / stable-baselines3 itself, and a crash in
+model code only takes down this process.
+
+    python -m app.inference_server --warm ai,xgb
+
+Requests are pickled dicts sent over multiprocessing.connection, so the
+server listens on a Unix socket only its user can open (default
+~/.nekoai/inference.sock; localhost TCP on request) and every connection
+must prove the shared key: $INFERENCE_AUTHKEY, or the per-install key
+file (see app.inference_client.load_authkey).
+"""
+import os
+import sys
+import time
+import argparse
+import threading
+import traceback
+from collections import defaultdict, deque
+from multiprocessing.connection import Listener
+
+# allow `python app/inference_server.py` as well as `-m`
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import INFERENCE_ADDRESS, INFERENCE_AUTHKEY, INFERENCE_SOCKET
+from app.inference_client import call_predict, load_authkey, parse_address
+from app import model_registry
+
+# name → (module, class); instantiated lazily on first use
+MODEL_REGISTRY = {
+    "ai":   ("app.models.ai_model",   "MomentumModel"),
+    "xgb":  ("app.models.xgb_model",  "MomentumModel"),
+    "rf":   ("app.models.rf_model",   "RFModel"),
+    "lstm": ("app.models.lstm_model", "LSTMModel"),
+    "cnn":  ("app.models.cnn_model",  "CNNModel"),
+    "rl":   ("app.models.rl_agent",   "RLAgent"),
+}
+
+def _load_model(name: str):
+    """(model, version): built from the published CURRENT version, if any."""
+    if name not in MODEL_REGISTRY:
+        raise KeyError(f"unknown model '{name}' (known: {', '.join(MODEL_REGISTRY)})")
+    module, cls = MODEL_REGISTRY[name]
+    version     = model_registry.current_version()
+    return model_registry.load(module, cls, version), version
+
+class InferenceServer:
+    def __init__(self, address: str, authkey: str | None = INFERENCE_AUTHKEY, history: int = 1_000):
+        self.address   = parse_address(address)
+        self.authkey   = load_authkey(authkey)
+        self.models    = {}                      # name → model instance
+        self.loaded_at = {}                      # name → unix time
+        self.versions  = {}                      # name → published version (None: working file)
+        self.locks     = defaultdict(threading.Lock)
+        self.registry  = threading.Lock()
+        self.latencies = defaultdict(lambda: deque(maxlen=history))
+        self.counts    = defaultdict(int)
+        self.errors    = defaultdict(int)
+        self.started   = time.time()
+
+    # ── model lifecycle ──────────────────────────────────────────────────────
+
+    def get_model(self, name: str):
+        with self.registry:
+            model = self.models.get(name)
+        if model is None:
+            with self.locks[name]:
+                model = self.models.get(name)
+                if model is None:
+                    model, version = _load_model(name)
+                    with self.registry:
+                        self.models[name]    = model
+                        self.versions[name]  = version
+                        self.loaded_at[name] = time.time()
+        return model
+
+    def reload(self, name: str) -> dict:
+        # build the replacement first, so predictions keep flowing on the
+        # old instance until the swap
+        t0             = time.perf_counter()
+        model, version = _load_model(name)
+        with self.locks[name]:
+            with self.registry:
+                self.models[name]    = model
+                self.versions[name]  = version
+                self.loaded_at[name] = time.time()
+        return {"model": name, "version": version, "load_s": time.perf_counter() - t0}
+
+    # ── request handling ─────────────────────────────────────────────────────
+
+    def _predict(self, name: str, items: list) -> list:
+        model = self.get_model(name)
+        t0    = time.perf_counter()
+        with self.locks[name]:
+            out = [call_predict(model, *item) for item in items]
+        dt = time.perf_counter() - t0
+        self.latencies[name].append(dt / len(items))
+        self.counts[name] += len(items)
+        return out
+
+    def handle(self, req: dict) -> dict:
+        op = req.get("op")
+        if op == "ping":
+            return {"pid": os.getpid(), "uptime_s": time.time() - self.started}
+        if op == "predict":
+            return self._predict(req["model"], [(req["df"], req["news"], req.get("symbol"))])[0]
+        if op == "predict_batch":
+            return self._predict(req["model"], req["items"])
+        if op == "warm":
+            loaded = {}
+            for name in req.get("models", []):
+                t0 = time.perf_counter()
+                self.get_model(name)
+                loaded[name] = time.perf_counter() - t0
+            return loaded
+        if op == "reload":
+            return self.reload(req["model"])
+        if op == "stats":
+            return self.stats()
+        raise ValueError(f"unknown op '{op}'")
+
+    def stats(self) -> dict:
+        out = {}
+        for name in set(self.counts) | set(self.models):
+            lat = sorted(self.latencies[name])
+            out[name] = {
+                "loaded":      name in self.models,
+                "loaded_at":   self.loaded_at.get(name),
+                "version":     self.versions.get(name),
+                "predictions": self.counts[name],
+                "errors":      self.errors[name],
+                "mean_ms":     sum(lat) / len(lat) * 1e3 if lat else None,
+                "p95_ms":      lat[min(len(lat) - 1, int(0.95 * len(lat)))] * 1e3 if lat else None,
+            }
+        return out
+
+    def _serve_connection(self, conn):
+        with conn:
+            while True:
+                try:
+                    req = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    resp = {"ok": True, "result": self.handle(req)}
+                except Exception as e:
+                    if isinstance(req, dict) and "model" in req:
+                        self.errors[req["model"]] += 1
+                    traceback.print_exc()
+                    resp = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                try:
+                    conn.send(resp)
+                except (EOFError, OSError):
+                    return
+
+    def serve_forever(self):
+        unix = isinstance(self.address, str)
+        if unix:
+            os.makedirs(os.path.dirname(self.address) or ".", mode=0o700, exist_ok=True)
+            if os.path.exists(self.address):
+                os.unlink(self.address)  # stale socket from a previous run
+        # the socket file is created owner-only, no window with looser modes
+        umask = os.umask(0o177) if unix else None
+        try:
+            listener = Listener(self.address, authkey=self.authkey)
+        finally:
+            if umask is not None:
+                os.umask(umask)
+        with listener:
+            print(f"🧠 Inference server listening on {self.address} (pid {os.getpid()})")
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    # failed handshake (bad authkey, port scan, …)
+                    print(f"⚠️ Rejected connection: {e}")
+                    continue
+                threading.Thread(target=self._serve_connection, args=(conn,), daemon=True).start()
+
+def main():
+    ap = argparse.ArgumentParser(description="NekoAI local inference server")
+    ap.add_argument("--address", default=INFERENCE_ADDRESS or INFERENCE_SOCKET,
+                    help=f"Unix socket path or host:port (default: $INFERENCE_ADDRESS or {INFERENCE_SOCKET})")
+    ap.add_argument("--warm", default="",
+                    help="comma-separated models to load before accepting requests")
+    args = ap.parse_args()
+
+    server = InferenceServer(args.address)
+    for name in filter(None, args.warm.split(",")):
+        t0 = time.perf_counter()
+        server.get_model(name.strip())
+        print(f"🔥 Warmed {name} in {time.perf_counter() - t0:.2f}s")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,6 @@ from pathlib import Path
 
 import requests
 import pandas as pd
-import yfinance as yf
 from config import TWELVEDATA_API_KEY, ALPHAVANTAGE_API_KEY
 
 # ── Cache configuration ───────────────────────────────────────────────────────
@@ -54,6 +53,7 @@ def _normalize_symbol_for_api(symbol: str) -> str:
 # ── yfinance primary ─────────────────────────────────────────────────────────
 
 def fetch_yfinance(symbol: str) -> pd.DataFrame:
+    import yfinance as yf  # heavy; only needed on a cache miss
     yf_sym = _normalize_for_yf(symbol)
     ticker = yf.Ticker(yf_sym)
     hist   = ticker.history(period="7d", interval="1m", actions=False)
@@ -156,7 +156,7 @@ def fetch_market_data(symbol: str) -> pd.DataFrame:
                 print(f"⚠️ AlphaVantage failed for {symbol}: {e3}")
                 # dummy fallback
                 import numpy as np
-                idx = pd.date_range(end=pd.Timestamp.utcnow(), periods=100, freq="T")
+                idx = pd.date_range(end=pd.Timestamp.utcnow(), periods=100, freq="min")
                 df = pd.DataFrame({
                     "open":   np.random.rand(100),
                     "high":   np.random.rand(100),
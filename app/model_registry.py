@@ -0,0 +1,198 @@
+# app/model_registry.py
+"""
+Published model versions.
+
+Training writes to the working files in app/models/models (each model's
+MODEL_FILE).  publish() copies them into a new, never-modified directory
+
+    app/models/models/releases/<version>/   artifacts + manifest.json
+
+and then points releases/CURRENT at it with one atomic rename, so a reader
+sees either the old version or the new one, never a half-written file.
+Live code loads models through load() / LiveModel, which read the
+CURRENT version and fall back to the working files until something has
+been published.  Bundles (app/models/artifacts.py) in
+app/models/models/bundles are published alongside and preferred when
+they were exported from the same artifact.
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import importlib
+import threading
+from pathlib import Path
+
+MODEL_DIR     = Path(__file__).parent / "models" / "models"
+RELEASE_DIR   = MODEL_DIR / "releases"
+POINTER       = RELEASE_DIR / "CURRENT"
+KEEP_RELEASES = 5
+ARTIFACTS     = ("*.joblib", "*.keras", "*.h5", "*.zip", "bundles/*/*")
+
+# loading swaps module-level MODEL_FILEs, so one load at a time
+_load_lock = threading.Lock()
+
+# ── Versions ─────────────────────────────────────────────────────────────────
+
+def current_version(release_dir: Path = RELEASE_DIR) -> str | None:
+    try:
+        version = (Path(release_dir) / POINTER.name).read_text().strip()
+    except OSError:
+        return None
+    return version if version and (Path(release_dir) / version).is_dir() else None
+
+def manifest(version: str, release_dir: Path = RELEASE_DIR) -> dict:
+    return json.loads((Path(release_dir) / version / "manifest.json").read_text())
+
+def versions(release_dir: Path = RELEASE_DIR) -> list:
+    """Published versions, oldest first."""
+    root = Path(release_dir)
+    if not root.is_dir():
+        return []
+    return sorted(p.name for p in root.iterdir() if (p / "manifest.json").exists())
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _swap_pointer(version: str, release_dir: Path):
+    tmp = Path(release_dir) / f"{POINTER.name}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, Path(release_dir) / POINTER.name)
+
+# ── Publishing ───────────────────────────────────────────────────────────────
+
+def publish(model_dir: Path = MODEL_DIR,
+            release_dir: Path = RELEASE_DIR,
+            meta: dict | None = None,
+            keep: int = KEEP_RELEASES) -> str | None:
+    """
+    Snapshot the working artifacts of `model_dir` as a new version and make
+    it CURRENT.  Returns the version, or None if nothing changed since the
+    current one.
+    """
+    model_dir, release_dir = Path(model_dir), Path(release_dir)
+    # dot-prefixed entries are bundles still being written
+    files = sorted({p for pat in ARTIFACTS for p in model_dir.glob(pat) if p.is_file()
+                    and not any(part.startswith(".") for part in p.relative_to(model_dir).parts)})
+    if not files:
+        return None
+    hashes = {p.relative_to(model_dir).as_posix(): _sha256(p) for p in files}
+
+    cur = current_version(release_dir)
+    if cur and manifest(cur, release_dir).get("files") == hashes:
+        return None
+
+    version = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}-{os.getpid()}"
+    staging = release_dir / f".{version}.tmp"
+    staging.mkdir(parents=True)
+    for p in files:
+        dst = staging / p.relative_to(model_dir)
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(p, dst)
+    (staging / "manifest.json").write_text(json.dumps({
+        "version": version,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "previous": cur,
+        "files":   hashes,
+        **(meta or {}),
+    }, indent=2))
+    # the directory only appears under its final name once complete
+    os.replace(staging, release_dir / version)
+    _swap_pointer(version, release_dir)
+    prune(keep, release_dir)
+    return version
+
+def rollback(release_dir: Path = RELEASE_DIR) -> str | None:
+    """Point CURRENT back at the version before it; returns that version."""
+    cur = current_version(release_dir)
+    if cur is None:
+        return None
+    prev = manifest(cur, release_dir).get("previous")
+    if prev is None or not (Path(release_dir) / prev).is_dir():
+        return None
+    _swap_pointer(prev, release_dir)
+    return prev
+
+def prune(keep: int = KEEP_RELEASES, release_dir: Path = RELEASE_DIR):
+    """Delete all but the newest `keep` versions (never the current one)."""
+    cur = current_version(release_dir)
+    for v in versions(release_dir)[:-keep] if keep > 0 else []:
+        if v != cur:
+            shutil.rmtree(Path(release_dir) / v, ignore_errors=True)
+
+# ── Loading ──────────────────────────────────────────────────────────────────
+
+def _bundle(module: str, version: str, release_dir: Path) -> Path | None:
+    """
+    `version`'s bundle of `module`, if it was exported from that version's
+    MODEL_FILE in the current bundle format (else the file copy is used).
+    """
+    from app.models.artifacts import ArtifactError, bundle_path, read_manifest
+    path = bundle_path(module, Path(release_dir) / version / "bundles")
+    if not (path / "manifest.json").exists():
+        return None
+    try:
+        src = read_manifest(path).get("source") or {}
+    except ArtifactError:
+        return None
+    return path if manifest(version, release_dir)["files"].get(src.get("file")) == src.get("sha256") else None
+
+def load(module: str, cls: str, version: str | None = None,
+         release_dir: Path = RELEASE_DIR):
+    """
+    Instance of module.cls built from `version` (default CURRENT): its
+    bundle when current (feature-validated, ArtifactError otherwise), else
+    its copy of MODEL_FILE; from the working file if none is published.
+    """
+    mod     = importlib.import_module(module)
+    version = version or current_version(release_dir)
+    bundle  = _bundle(module, version, release_dir) if version else None
+    if bundle is not None:
+        from app.models.artifacts import load_bundle
+        return load_bundle(bundle)
+    path    = Path(release_dir) / version / Path(mod.MODEL_FILE).name if version else None
+    if path is None or not path.exists():
+        return getattr(mod, cls)()
+    with _load_lock:
+        working, mod.MODEL_FILE = mod.MODEL_FILE, path
+        try:
+            return getattr(mod, cls)()
+        finally:
+            mod.MODEL_FILE = working
+
+class LiveModel:
+    """
+    A model that follows CURRENT: get() rebuilds it only when a new
+    version has been published since the last call, so a running process
+    picks up retrained models between cycles without restarting.
+    """
+    def __init__(self, module: str, cls: str, release_dir: Path = RELEASE_DIR):
+        self.module, self.cls = module, cls
+        self.release_dir      = Path(release_dir)
+        self.version          = None
+        self.model            = None
+
+    def get(self):
+        version = current_version(self.release_dir)
+        if self.model is None or version != self.version:
+            # build first, so a failed load keeps the previous model serving
+            try:
+                model = load(self.module, self.cls, version, self.release_dir)
+            except Exception as e:
+                if self.model is None:
+                    raise
+                print(f"⚠️ Could not load model version {version}, keeping {self.version}: {e}")
+                return self.model
+            self.model, self.version = model, version
+        return self.model
+
+__all__ = ["RELEASE_DIR", "current_version", "manifest", "versions", "publish",
+           "rollback", "prune", "load", "LiveModel"]
@@ -1 +1,7 @@
-from .momentum_model import MomentumModel
+def __getattr__(name):
+    # resolved on first access, so importing one model module never drags
+    # in the frameworks the others need
+    if name == "MomentumModel":
+        from .momentum_model import MomentumModel
+        return MomentumModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
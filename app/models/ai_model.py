@@ -5,13 +5,12 @@ import numpy as np
 from pathlib import Path
 import joblib
 
-# xgboost may need installing: pip install xgboost
-from xgboost import XGBClassifier
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import Pipeline
+from .tree_eval import compile_pipeline
+from .signals import proba_outputs
 
 MODEL_DIR  = Path(__file__).parent / "models"
 MODEL_FILE = MODEL_DIR / "xgb_model.joblib"
+MAX_ROUNDS = 600   # update() refits from scratch instead of boosting past this
 
 class MomentumModel:
     """
@@ -21,11 +20,16 @@ class MomentumModel:
     def __init__(self):
         # need at least 20 bars for all indicators
         self.lookback = 20
+        self._compact = None
 
         MODEL_DIR.mkdir(parents=True, exist_ok=True)
         if MODEL_FILE.exists():
             self.pipeline = joblib.load(MODEL_FILE)
         else:
+            # the training frameworks are only needed for a fresh pipeline
+            from xgboost import XGBClassifier
+            from sklearn.preprocessing import StandardScaler
+            from sklearn.pipeline import Pipeline
             self.pipeline = Pipeline([
                 ("scaler", StandardScaler()),
                 ("clf",    XGBClassifier(
@@ -103,17 +107,61 @@ class MomentumModel:
         ]
         return X[feats]
 
-    def fit(self, df: pd.DataFrame, news: pd.Series):
+    @classmethod
+    def training_data(cls, df: pd.DataFrame, news: pd.Series):
+        """(features, next-bar-up target) exactly as fit() trains on them."""
         df2 = df.copy()
         df2["target"] = np.where(df2["close"].shift(-1) > df2["close"], 1, 0)
         df2 = df2.dropna()
 
-        X = self.featurize(df2, news)
-        y = df2.loc[X.index, "target"]
+        X = cls.featurize(df2, news)
+        return X, df2.loc[X.index, "target"]
 
+    def fit(self, df: pd.DataFrame, news: pd.Series):
+        X, y = self.training_data(df, news)
         self.pipeline.fit(X, y)
+        self._compact = None
+        joblib.dump(self.pipeline, MODEL_FILE)
+
+    def update(self, X: pd.DataFrame, y: pd.Series, rounds: int = 50) -> int:
+        """
+        Continue boosting: add `rounds` trees fitted on (X, y) — rows as
+        from training_data — to the current booster, keeping the scaler.
+        Once that would pass MAX_ROUNDS the pipeline is refit from scratch
+        on (X, y) instead, so repeated updates don't grow the booster (and
+        its inference cost) without bound.
+        Not saved; call save() to keep the result.  Returns the row count.
+        """
+        if X.empty:
+            return 0
+        scaler, clf = self.pipeline.named_steps["scaler"], self.pipeline.named_steps["clf"]
+        booster = clf.get_booster()
+        if booster.num_boosted_rounds() + rounds > MAX_ROUNDS:
+            self.pipeline.fit(X, y)
+            self._compact = None
+            return len(X)
+        # n_estimators is the round count of this fit; put the configured one
+        # back so it is what save() persists and a full fit() trains
+        n_estimators = clf.n_estimators
+        clf.set_params(n_estimators=rounds)
+        try:
+            clf.fit(scaler.transform(X), y, xgb_model=booster)
+        finally:
+            clf.set_params(n_estimators=n_estimators)
+        self._compact = None
+        return len(X)
+
+    def save(self):
         joblib.dump(self.pipeline, MODEL_FILE)
 
+    def _predict_proba(self, X: pd.DataFrame):
+        # flatten the fitted ensemble once; fall back to sklearn if unsupported
+        if self._compact is None:
+            self._compact = compile_pipeline(self.pipeline) or False
+        if self._compact:
+            return self._compact.predict_proba(X.values)
+        return self.pipeline.predict_proba(X)
+
     def predict(self, df: pd.DataFrame, news: float):
         # build features
         feat = self.featurize(df, news)
@@ -122,7 +170,7 @@ class MomentumModel:
             return {"signal": "HOLD", "confidence": 0.0, "predicted_change": 0.0}
 
         row    = feat.iloc[[-1]]
-        proba  = self.pipeline.predict_proba(row)[0]
+        proba  = self._predict_proba(row)[0]
         up, dn = proba[1], proba[0]
         sig    = "BUY" if up > dn else "SELL"
 
@@ -132,4 +180,16 @@ class MomentumModel:
             "predicted_change": (up - dn) * 100,
         }
 
+    def predict_batch(self, df: pd.DataFrame, news: float = 0.0) -> dict:
+        """
+        Vectorized predict() over every bar: entry t of each array equals
+        predict(df.iloc[:t+1], news), since all features are causal.
+        """
+        feat = self.featurize(df, news)
+        if feat.empty:
+            return proba_outputs(len(df), [], [], [])
+        proba = self.pipeline.predict_proba(feat) if self.pipeline is not None \
+                else self._predict_proba(feat)
+        return proba_outputs(len(df), df.index.get_indexer(feat.index), proba[:, 1], proba[:, 0])
+
 __all__ = ["MomentumModel"]
@@ -0,0 +1,294 @@
+# app/models/artifacts.py
+"""
+Versioned model bundles: one directory per model,
+
+    manifest.json      format, class, lookback, feature names + hash,
+                       feature probe, the columns / input shape the model
+                       was fitted on, training range, metrics, load
+                       benchmark, the MODEL_FILE it was exported from,
+                       sha256 of every file
+    tree models        feature / threshold / thr32 / default_left / value
+                       (+ mean / scale) .npy — the CompactEnsemble arrays;
+                       XGBoost ones also booster.ubj, its native model file
+    Keras models       config.json (architecture) + weights_NNN.npy
+
+Every array is a plain .npy file loaded with mmap_mode="r", so loading a
+tree bundle is a few page mappings instead of unpickling a sklearn
+pipeline, and a bundled model predicts through the compact evaluator.
+
+load_bundle() re-runs the model's feature code on a fixed synthetic frame
+and checks the column names, FEATURE_SET_VERSION and feature values
+against the manifest, and the columns the model was fitted on against
+what the code computes, raising ArtifactError on any mismatch — so a
+model trained on other features never gets to trade.
+"""
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import importlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .feature_builder import FEATURE_SET_VERSION, build_features
+from .tree_eval import CompactEnsemble, compile_pipeline
+
+FORMAT_VERSION = 2
+BUNDLE_DIR     = Path(__file__).parent / "models" / "bundles"
+PROBE_BARS     = 200     # synthetic bars the feature probe runs on
+PROBE_RTOL     = 1e-6
+
+class ArtifactError(ValueError):
+    """A bundle that is malformed, corrupt or built for other features."""
+
+def bundle_path(module: str, root: Path = BUNDLE_DIR) -> Path:
+    """Default bundle directory of a model module, e.g. …/bundles/xgb_model."""
+    return Path(root) / module.rsplit(".", 1)[-1]
+
+# ── Features ─────────────────────────────────────────────────────────────────
+
+_SPECS = {}
+
+def _featurize(cls, df: pd.DataFrame) -> pd.DataFrame:
+    # MomentumModel (ai_model) has its own feature set; the rest share build_features
+    if hasattr(cls, "featurize"):
+        return cls.featurize(df, 0.0)
+    df2 = df.reset_index(drop=True)
+    return build_features(df2, pd.Series(0.0, index=df2.index))
+
+def feature_spec(cls) -> dict:
+    """
+    The feature set `cls` computes today: column names, a hash of them and
+    FEATURE_SET_VERSION, and the per-column mean on a fixed synthetic frame.
+    """
+    key = f"{cls.__module__}.{cls.__qualname__}"
+    if key not in _SPECS:
+        from app.synthetic import make_ohlcv
+        feats = _featurize(cls, make_ohlcv(PROBE_BARS, seed=0))
+        names = [str(c) for c in feats.columns]
+        _SPECS[key] = {
+            "names":   names,
+            "hash":    hashlib.sha256(json.dumps([FEATURE_SET_VERSION, names]).encode()).hexdigest()[:16],
+            "version": FEATURE_SET_VERSION,
+            "probe":   feats.to_numpy(dtype=np.float64).mean(axis=0).tolist(),
+        }
+    return _SPECS[key]
+
+def fitted_features(model) -> dict:
+    """
+    What `model` was fitted on: the scaler's column names (if it saw a
+    DataFrame) and count for tree pipelines, the input shape for Keras.
+    """
+    if getattr(model, "pipeline", None) is not None:
+        scaler = model.pipeline.named_steps.get("scaler", model.pipeline.steps[0][1])
+        names  = getattr(scaler, "feature_names_in_", None)
+        return {"names":      None if names is None else [str(n) for n in names],
+                "n_features": int(scaler.n_features_in_)}
+    shape = [None if d is None else int(d) for d in model.model.input_shape[1:]]
+    return {"input_shape": shape, "n_features": shape[-1]}
+
+def _check_fitted(fitted: dict, names: list, lookback, label: str):
+    if fitted.get("names") is not None and fitted["names"] != names:
+        missing = [n for n in fitted["names"] if n not in names]
+        extra   = [n for n in names if n not in fitted["names"]]
+        raise ArtifactError(f"{label}: fitted on other columns than the code computes "
+                            f"(missing {missing}, unexpected {extra}, or reordered)")
+    if fitted["n_features"] != len(names):
+        raise ArtifactError(f"{label}: fitted on {fitted['n_features']} features, "
+                            f"code computes {len(names)}")
+    shape = fitted.get("input_shape")
+    if shape and len(shape) == 2 and None not in (shape[0], lookback) and shape[0] != lookback:
+        raise ArtifactError(f"{label}: fitted on {shape[0]}-bar windows, lookback is {lookback}")
+
+def validate_features(manifest: dict, cls):
+    """Raise ArtifactError unless `cls` computes the features the bundle was trained on."""
+    saved, now = manifest["features"], feature_spec(cls)
+    if "fitted" not in manifest:
+        raise ArtifactError(f"{manifest['class']}: no record of the fitted features; re-export it")
+    _check_fitted(manifest["fitted"], now["names"], manifest["lookback"], manifest["class"])
+    if saved["names"] != now["names"]:
+        missing = [n for n in saved["names"] if n not in now["names"]]
+        extra   = [n for n in now["names"] if n not in saved["names"]]
+        raise ArtifactError(f"{manifest['class']}: feature columns differ "
+                            f"(missing {missing}, unexpected {extra}, or reordered)")
+    if saved["version"] != now["version"]:
+        raise ArtifactError(f"{manifest['class']}: trained on feature set v{saved['version']}, "
+                            f"code computes v{now['version']}")
+    if not np.allclose(saved["probe"], now["probe"], rtol=PROBE_RTOL, atol=0.0, equal_nan=True):
+        raise ArtifactError(f"{manifest['class']}: feature values changed since training")
+
+# ── Saving ───────────────────────────────────────────────────────────────────
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _write_tree(model, out: Path) -> dict:
+    compact = compile_pipeline(model.pipeline)
+    if not compact:
+        raise ArtifactError("pipeline cannot be flattened (unfitted, unsupported or too deep)")
+    arrays = {"feature": compact.feature, "threshold": compact.threshold, "thr32": compact._thr32,
+              "default_left": compact.default_left, "value": compact.value}
+    if compact.mean is not None:
+        arrays["mean"] = compact.mean
+    if compact.scale is not None:
+        arrays["scale"] = compact.scale
+    for name, arr in arrays.items():
+        np.save(out / f"{name}.npy", np.ascontiguousarray(arr))
+    layout = {"kind": "tree", "ensemble": compact.kind, "depth": compact.depth,
+              "base_margin": compact.base_margin, "n_trees": compact.n_trees}
+    # large batches predict through xgboost itself when it is installed
+    clf = model.pipeline.steps[-1][1]
+    if hasattr(clf, "get_booster"):
+        clf.get_booster().save_model(out / "booster.ubj")
+        layout["native"] = "booster.ubj"
+    return layout
+
+def _write_keras(model, out: Path) -> dict:
+    (out / "config.json").write_text(model.model.to_json())
+    weights = model.model.get_weights()
+    for i, w in enumerate(weights):
+        np.save(out / f"weights_{i:03d}.npy", np.ascontiguousarray(w))
+    return {"kind": "keras", "n_weights": len(weights)}
+
+def _legacy_load_s(model) -> float | None:
+    """Seconds to load the model the old way (joblib pipeline / .keras file)."""
+    with tempfile.TemporaryDirectory(prefix="nekoai-bundle-") as tmp:
+        if getattr(model, "pipeline", None) is not None:
+            import joblib
+            path = Path(tmp) / "pipeline.joblib"
+            joblib.dump(model.pipeline, path)
+            t0 = time.perf_counter()
+            joblib.load(path)
+        else:
+            from tensorflow.keras.models import load_model
+            path = Path(tmp) / "model.keras"
+            model.model.save(path)
+            t0 = time.perf_counter()
+            load_model(path, compile=False)
+        return time.perf_counter() - t0
+
+def save_bundle(model, path: Path | None = None, training: dict | None = None,
+                metrics: dict | None = None, benchmark: bool = True) -> dict:
+    """
+    Write `model` as a bundle at `path` (default bundle_path of its module),
+    replacing any earlier one in a single rename.  `training` describes the
+    data (start, end, rows, symbols, …), `metrics` its evaluation.  Call
+    it right after the model was saved: the module's MODEL_FILE is
+    recorded as the bundle's source.  Returns the manifest.
+    """
+    cls  = type(model)
+    src  = Path(getattr(importlib.import_module(cls.__module__), "MODEL_FILE", ""))
+    path = Path(path) if path else bundle_path(cls.__module__)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    staging = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    shutil.rmtree(staging, ignore_errors=True)
+    staging.mkdir()
+
+    layout = _write_tree(model, staging) if getattr(model, "pipeline", None) is not None \
+             else _write_keras(model, staging)
+    spec   = feature_spec(cls)
+    fitted = fitted_features(model)
+    try:
+        _check_fitted(fitted, spec["names"], getattr(model, "lookback", None), cls.__qualname__)
+    except ArtifactError:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    manifest = {
+        "format":    FORMAT_VERSION,
+        "class":     f"{cls.__module__}:{cls.__qualname__}",
+        "created":   time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "lookback":  getattr(model, "lookback", None),
+        "features":  {"names": spec["names"], "hash": spec["hash"],
+                      "version": spec["version"], "probe": spec["probe"]},
+        "fitted":    fitted,
+        "training":  training or {},
+        "metrics":   metrics or {},
+        "source":    {"file": src.name, "sha256": _sha256(src)} if src.is_file() else None,
+        **layout,
+        "files":     {p.name: _sha256(p) for p in sorted(staging.iterdir())},
+    }
+    (staging / "manifest.json").write_text(json.dumps(manifest, indent=2, default=str))
+
+    if benchmark:
+        t0 = time.perf_counter()
+        load_bundle(staging)
+        manifest["load_benchmark"] = {"bundle_s": time.perf_counter() - t0,
+                                      "legacy_s": _legacy_load_s(model)}
+        (staging / "manifest.json").write_text(json.dumps(manifest, indent=2, default=str))
+
+    old = path.with_name(f".{path.name}.{os.getpid()}.old")
+    if path.exists():
+        os.replace(path, old)
+    os.replace(staging, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return manifest
+
+# ── Loading ──────────────────────────────────────────────────────────────────
+
+def read_manifest(path: Path) -> dict:
+    try:
+        manifest = json.loads((Path(path) / "manifest.json").read_text())
+    except (OSError, ValueError) as e:
+        raise ArtifactError(f"{path}: unreadable manifest ({e})") from e
+    if manifest.get("format") != FORMAT_VERSION:
+        raise ArtifactError(f"{path}: bundle format {manifest.get('format')}, "
+                            f"expected {FORMAT_VERSION}")
+    return manifest
+
+def verify_files(path: Path, manifest: dict | None = None):
+    """Raise ArtifactError if a bundle file is missing or its sha256 differs."""
+    path     = Path(path)
+    manifest = manifest or read_manifest(path)
+    for name, digest in manifest["files"].items():
+        if not (path / name).exists() or _sha256(path / name) != digest:
+            raise ArtifactError(f"{path}: {name} is missing or corrupt")
+
+def load_bundle(path: Path, validate: bool = True, verify: bool = False):
+    """
+    The model saved at `path`, built without its constructor: tree models
+    predict through a memory-mapped CompactEnsemble (pipeline is None),
+    Keras models get their architecture and weights.  `validate` checks
+    the feature set (ArtifactError on mismatch); `verify` also hashes
+    every file.  The manifest is left on model.manifest.
+    """
+    path     = Path(path)
+    manifest = read_manifest(path)
+    if verify:
+        verify_files(path, manifest)
+    module, name = manifest["class"].split(":")
+    cls = getattr(importlib.import_module(module), name)
+    if validate:
+        validate_features(manifest, cls)
+
+    model = cls.__new__(cls)
+    model.lookback = manifest["lookback"]
+    if manifest["kind"] == "tree":
+        arr = lambda n: np.load(path / f"{n}.npy", mmap_mode="r") if (path / f"{n}.npy").exists() else None
+        feature = arr("feature")
+        if validate and feature.size and int(feature.max()) >= manifest["fitted"]["n_features"]:
+            raise ArtifactError(f"{path}: trees split on features the model was not fitted on")
+        native = manifest.get("native")
+        model.pipeline = None
+        model._compact = CompactEnsemble(manifest["ensemble"], feature, arr("threshold"),
+                                         arr("default_left"), arr("value"), manifest["depth"],
+                                         base_margin=manifest["base_margin"], mean=arr("mean"),
+                                         scale=arr("scale"), thr32=arr("thr32"),
+                                         native=path / native if native else None)
+    else:
+        from tensorflow.keras.models import model_from_json
+        model.model = model_from_json((path / "config.json").read_text())
+        model.model.set_weights([np.load(path / f"weights_{i:03d}.npy", mmap_mode="r")
+                                 for i in range(manifest["n_weights"])])
+    model.manifest = manifest
+    return model
+
+__all__ = ["FORMAT_VERSION", "BUNDLE_DIR", "ArtifactError", "bundle_path", "feature_spec",
+           "fitted_features", "validate_features", "save_bundle", "read_manifest", "verify_files", "load_bundle"]
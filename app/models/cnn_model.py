@@ -1,10 +1,9 @@
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import Input, Conv1D, MaxPool1D, Flatten, Dense, Dropout
-from tensorflow.keras.callbacks import EarlyStopping
 from .feature_builder import build_features
+from .signals import sigmoid_outputs, predict_windows
+from .sequence_data import WindowBatches, next_bar_windows
 
 MODEL_DIR  = Path(__file__).parent / "models"
 MODEL_DIR.mkdir(exist_ok=True)
@@ -16,6 +15,9 @@ class CNNModel:
         self.dropout1 = dropout1
         self.dropout2 = dropout2
 
+        # TensorFlow is only imported once a Keras model is actually needed
+        from tensorflow.keras.models import Sequential, load_model
+        from tensorflow.keras.layers import Input, Conv1D, MaxPool1D, Flatten, Dense, Dropout
         if MODEL_FILE.exists():
             self.model = load_model(MODEL_FILE, compile=False)
         else:
@@ -32,33 +34,53 @@ class CNNModel:
                 Dense(1, activation="sigmoid"),
             ])
 
-    def _prepare(self, df: pd.DataFrame, news: pd.Series):
+    def _windows(self, df: pd.DataFrame, news: pd.Series, batch_size: int,
+                 first_bar: int = 0) -> WindowBatches:
         news_s = news.reindex(df.index).fillna(0.0)
         df2 = df.reset_index(drop=True)
         n2  = news_s.reset_index(drop=True)
         feat = build_features(df2, n2)
-        Xs, ys = [], []
-        closes = df2["close"].values
-        arr     = feat.values
-        for i in range(self.lookback, len(arr)-1):
-            Xs.append(arr[i-self.lookback:i])
-            ys.append(int(closes[i+1] > closes[i]))
-        return np.array(Xs), np.array(ys)
+        # windows are cut per batch while training, never all at once
+        first = int(np.searchsorted(feat.index.values, first_bar))
+        return next_bar_windows(feat.values, df2["close"].values, self.lookback,
+                                first=first, batch_size=batch_size)
 
-    def fit(self, df: pd.DataFrame, news: pd.Series):
-        X, y = self._prepare(df, news)
+    def fit(self, df: pd.DataFrame, news: pd.Series, callbacks=None):
+        """Train on `df`; extra Keras `callbacks` run after early stopping."""
+        from tensorflow.keras.callbacks import EarlyStopping
+        train, val = self._windows(df, news, getattr(self, "batch_size", 32)).split(0.1)
+        if not len(train.starts):
+            raise ValueError(f"too few bars to train on ({len(df)} for lookback {self.lookback})")
+        # fewer than 10 windows leave no validation split
+        val_kw = {"validation_data": iter(val), "validation_steps": len(val)} if len(val.starts) else {}
         self.model.compile("adam", "binary_crossentropy", metrics=["accuracy"], run_eagerly=True)
         es = EarlyStopping(patience=5, restore_best_weights=True)
         self.model.fit(
-            X, y,
-            validation_split=0.1,
+            iter(train),
+            steps_per_epoch=len(train),
+            **val_kw,
             epochs=20,
-            batch_size=getattr(self, "batch_size", 32),
-            callbacks=[es],
+            callbacks=[es, *(callbacks or [])],
             verbose=1
         )
         self.model.save(MODEL_FILE)
 
+    def update(self, batches: WindowBatches, epochs: int = 3, learning_rate: float = 1e-4) -> int:
+        """
+        Fine-tune the current weights on new windows (see _windows'
+        first_bar) for a few epochs at a low learning rate.  Not saved;
+        call save() to keep the result.  Returns the number of windows.
+        """
+        from tensorflow.keras.optimizers import Adam
+        if not len(batches.starts):
+            return 0
+        self.model.compile(Adam(learning_rate), "binary_crossentropy", metrics=["accuracy"])
+        self.model.fit(iter(batches), steps_per_epoch=len(batches), epochs=epochs, verbose=0)
+        return len(batches.starts)
+
+    def save(self):
+        self.model.save(MODEL_FILE)
+
     def predict(self, df: pd.DataFrame, news: float):
         idx = df.index[-self.lookback:]
         news_s = pd.Series(news, index=idx).reindex(df.index).fillna(0.0)
@@ -71,3 +93,17 @@ class CNNModel:
         p  = float(self.model.predict(Xp)[0,0])
         sig = "BUY" if p>0.5 else "SELL"
         return {"signal": sig, "confidence": p*100, "predicted_change": (p-0.5)*200}
+
+    def predict_batch(self, df: pd.DataFrame, news: float = 0.0) -> dict:
+        """
+        Vectorized predict() over every bar: entry t of each array equals
+        predict(df.iloc[:t+1], news) — the window of the last `lookback`
+        feature rows at or before t.  (predict() only sets sentiment on the
+        last `lookback` bars; identical for the news=0.0 backtests use.)
+        """
+        df2  = df.reset_index(drop=True)
+        feat = build_features(df2, pd.Series(float(news), index=df2.index))
+        if len(feat) < self.lookback:
+            return sigmoid_outputs(len(df2), [], [])
+        p = predict_windows(self.model.predict_on_batch, feat.values, self.lookback)
+        return sigmoid_outputs(len(df2), feat.index.values[self.lookback - 1:], p)
@@ -1,7 +1,5 @@
 import numpy as np, pandas as pd
 from pathlib import Path
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import Flatten, Dense, Dropout
 
 MODEL_DIR  = Path(__file__).parent/"models"
 MODEL_FILE = MODEL_DIR/"dense_model.h5"
@@ -14,6 +12,9 @@ def build_features(df):
 class DenseNNModel:
     def __init__(self, lookback=20):
         self.lookback = lookback
+        # TensorFlow is only imported once a Keras model is actually needed
+        from tensorflow.keras.models import Sequential, load_model
+        from tensorflow.keras.layers import Flatten, Dense, Dropout
         MODEL_DIR.mkdir(exist_ok=True)
         if MODEL_FILE.exists():
             self.model = load_model(MODEL_FILE)
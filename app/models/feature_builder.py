@@ -3,6 +3,10 @@
 import pandas as pd
 import numpy as np
 
+# bump whenever build_features changes what it computes, so cached
+# backtest results built on the old features are not reused
+FEATURE_SET_VERSION = 1
+
 def build_features(df: pd.DataFrame, news) -> pd.DataFrame:
     """
     Compute:
@@ -73,7 +77,7 @@ def build_features(df: pd.DataFrame, news) -> pd.DataFrame:
         # e.g. 15-minute EMA of close
         X["ema15m"] = (
             X["close"]
-            .resample("15T")
+            .resample("15min")
             .last()
             .ewm(span=15, adjust=False)
             .mean()
@@ -3,10 +3,9 @@
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from tensorflow.keras.models import Sequential, load_model
-from tensorflow.keras.layers import Input, LSTM, Dropout, Dense
-from tensorflow.keras.callbacks import EarlyStopping
 from .feature_builder import build_features
+from .signals import sigmoid_outputs, predict_windows
+from .sequence_data import WindowBatches, next_bar_windows
 
 MODEL_DIR  = Path(__file__).parent / "models"
 MODEL_DIR.mkdir(exist_ok=True)
@@ -15,6 +14,9 @@ MODEL_FILE = MODEL_DIR / "lstm_model.keras"
 class LSTMModel:
     def __init__(self, lookback: int = 20):
         self.lookback = lookback
+        # TensorFlow is only imported once a Keras model is actually needed
+        from tensorflow.keras.models import Sequential, load_model
+        from tensorflow.keras.layers import Input, LSTM, Dropout, Dense
         if MODEL_FILE.exists():
             # load without optimizer state
             self.model = load_model(MODEL_FILE, compile=False)
@@ -28,7 +30,8 @@ class LSTMModel:
                 Dense(1, activation="sigmoid"),
             ])
 
-    def _prepare(self, df: pd.DataFrame, news: pd.Series):
+    def _windows(self, df: pd.DataFrame, news: pd.Series, batch_size: int,
+                 first_bar: int = 0) -> WindowBatches:
         # reset to integer index
         df2 = df.reset_index(drop=True).copy()
         n   = len(df2)
@@ -41,20 +44,21 @@ class LSTMModel:
             vals = vals[:n]
         news_s = pd.Series(vals, index=df2.index)
 
-        # build features & targets
+        # build features & targets; windows are cut per batch while training
         feat   = build_features(df2, news_s)
         closes = df2["close"].values
+        first  = int(np.searchsorted(feat.index.values, first_bar))
+        return next_bar_windows(feat.values, closes, self.lookback, first=first,
+                                batch_size=batch_size)
 
-        Xs, ys = [], []
-        arr    = feat.values
-        for i in range(self.lookback, len(arr) - 1):
-            Xs.append(arr[i-self.lookback:i])
-            ys.append(int(closes[i+1] > closes[i]))
-
-        return np.array(Xs), np.array(ys)
-
-    def fit(self, df: pd.DataFrame, news: pd.Series):
-        X, y = self._prepare(df, news)
+    def fit(self, df: pd.DataFrame, news: pd.Series, callbacks=None):
+        """Train on `df`; extra Keras `callbacks` run after early stopping."""
+        from tensorflow.keras.callbacks import EarlyStopping
+        train, val = self._windows(df, news, batch_size=32).split(0.1)
+        if not len(train.starts):
+            raise ValueError(f"too few bars to train on ({len(df)} for lookback {self.lookback})")
+        # fewer than 10 windows leave no validation split
+        val_kw = {"validation_data": iter(val), "validation_steps": len(val)} if len(val.starts) else {}
         self.model.compile(
             optimizer="adam",
             loss="binary_crossentropy",
@@ -63,15 +67,31 @@ class LSTMModel:
         )
         es = EarlyStopping(patience=5, restore_best_weights=True)
         self.model.fit(
-            X, y,
-            validation_split=0.1,
+            iter(train),
+            steps_per_epoch=len(train),
+            **val_kw,
             epochs=20,
-            batch_size=32,
-            callbacks=[es],
+            callbacks=[es, *(callbacks or [])],
             verbose=1
         )
         self.model.save(MODEL_FILE)
 
+    def update(self, batches: WindowBatches, epochs: int = 3, learning_rate: float = 1e-4) -> int:
+        """
+        Fine-tune the current weights on new windows (see _windows'
+        first_bar) for a few epochs at a low learning rate.  Not saved;
+        call save() to keep the result.  Returns the number of windows.
+        """
+        from tensorflow.keras.optimizers import Adam
+        if not len(batches.starts):
+            return 0
+        self.model.compile(Adam(learning_rate), "binary_crossentropy", metrics=["accuracy"])
+        self.model.fit(iter(batches), steps_per_epoch=len(batches), epochs=epochs, verbose=0)
+        return len(batches.starts)
+
+    def save(self):
+        self.model.save(MODEL_FILE)
+
     def predict(self, df: pd.DataFrame, news: float):
         # prepare a df with integer index
         df2 = df.reset_index(drop=True).copy()
@@ -94,4 +114,17 @@ class LSTMModel:
             "predicted_change": (p - 0.5) * 200
         }
 
+    def predict_batch(self, df: pd.DataFrame, news: float = 0.0) -> dict:
+        """
+        Vectorized predict() over every bar: entry t of each array equals
+        predict(df.iloc[:t+1], news) — the window of the last `lookback`
+        feature rows at or before t.
+        """
+        df2  = df.reset_index(drop=True)
+        feat = build_features(df2, pd.Series(float(news), index=df2.index))
+        if len(feat) < self.lookback:
+            return sigmoid_outputs(len(df2), [], [])
+        p = predict_windows(self.model.predict_on_batch, feat.values, self.lookback)
+        return sigmoid_outputs(len(df2), feat.index.values[self.lookback - 1:], p)
+
 __all__ = ["LSTMModel"]
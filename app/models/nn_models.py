@@ -3,12 +3,6 @@
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import (
-    Input, Conv1D, MaxPooling1D, Flatten, Dense, LSTM, Dropout
-)
-from tensorflow.keras.callbacks import EarlyStopping
-
 from .feature_builder import build_features
 
 MODEL_DIR = Path(__file__).parent / "models"
@@ -36,6 +30,7 @@ class BaseNN:
         return np.array(Xs), np.array(ys)
 
     def fit(self, df: pd.DataFrame, news_s: pd.Series):
+        from tensorflow.keras.callbacks import EarlyStopping
         X, y = self._windowed_data(df, news_s)
         m    = self.build_fn(input_shape=X.shape[1:])
         es   = EarlyStopping(patience=5, restore_best_weights=True)
@@ -66,6 +61,8 @@ class BaseNN:
         }
 
 def build_cnn(input_shape):
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Input, Conv1D, MaxPooling1D, Flatten, Dense
     m = Sequential([
         Input(shape=input_shape),
         Conv1D(32, 3, activation="relu"),
@@ -83,6 +80,8 @@ def build_cnn(input_shape):
     return m
 
 def build_lstm(input_shape):
+    from tensorflow.keras.models import Sequential
+    from tensorflow.keras.layers import Input, LSTM, Dense, Dropout
     m = Sequential([
         Input(shape=input_shape),
         LSTM(64),
@@ -0,0 +1,165 @@
+# app/models/out_of_core.py
+"""
+Out-of-core training for the tree models.
+
+write_chunks() turns a stream of per-symbol bars into an on-disk archive
+of feature/target chunks (X_00000.npy, y_00000.npy, …) of at most
+`chunk_rows` rows, holding one symbol's bars and one chunk in memory at a
+time.  train_booster() then feeds those chunks one by one through an
+xgboost.DataIter into an ExtMemQuantileDMatrix: XGBoost sketches the
+quantiles chunk by chunk, keeps the binned pages in a disk cache and
+trains with tree_method="hist", so peak memory follows the chunk size,
+not the length of the archive.  With external_memory=False the binned
+pages stay in RAM instead (QuantileDMatrix) — still about a quarter of
+the float features, and faster.
+"""
+import os
+import json
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+CHUNK_ROWS = 250_000
+MAX_BIN    = 256
+
+# ── Archive ──────────────────────────────────────────────────────────────────
+
+def chunk_paths(chunk_dir) -> list:
+    """Feature chunks of `chunk_dir`, in order (each has its y_ twin)."""
+    return sorted(Path(chunk_dir).glob("X_*.npy"))
+
+def write_chunks(frames, chunk_dir, training_data, chunk_rows: int = CHUNK_ROWS) -> list:
+    """
+    Write the (features, target) rows of `frames` — an iterable of
+    (bars, news series) per symbol, ideally a generator — as float32
+    chunks under `chunk_dir`, using `training_data` (e.g.
+    MomentumModel.training_data).  Returns the chunk paths.
+    """
+    chunk_dir = Path(chunk_dir)
+    chunk_dir.mkdir(parents=True, exist_ok=True)
+    for old in chunk_dir.glob("[Xy]_*.npy"):
+        old.unlink()
+
+    paths, xs, ys, held = [], [], [], 0
+
+    def flush(rows: int):
+        nonlocal xs, ys, held
+        X, y = np.concatenate(xs), np.concatenate(ys)
+        i    = len(paths)
+        np.save(chunk_dir / f"X_{i:05d}.npy", X[:rows])
+        np.save(chunk_dir / f"y_{i:05d}.npy", y[:rows])
+        paths.append(chunk_dir / f"X_{i:05d}.npy")
+        xs, ys, held = [X[rows:]], [y[rows:]], len(X) - rows
+
+    for df, news in frames:
+        X, y = training_data(df, news)
+        if not paths and not xs:
+            # the scaler keeps the names, as if fitted on a DataFrame
+            (chunk_dir / "columns.json").write_text(json.dumps([str(c) for c in X.columns]))
+        xs.append(X.to_numpy(dtype=np.float32))
+        ys.append(y.to_numpy(dtype=np.float32))
+        held += len(X)
+        while held >= chunk_rows:
+            flush(chunk_rows)
+    if held:
+        flush(held)
+    return paths
+
+def _load(path: Path, mmap: bool = True):
+    y_path = path.with_name("y_" + path.name[2:])
+    mode   = "r" if mmap else None
+    return np.load(path, mmap_mode=mode), np.load(y_path, mmap_mode=mode)
+
+def fit_scaler(scaler, paths):
+    """StandardScaler.partial_fit over the chunks; returns the scaler."""
+    for p in paths:
+        X, _ = _load(p)
+        scaler.partial_fit(X)
+    columns = Path(paths[0]).with_name("columns.json")
+    if columns.exists():
+        scaler.feature_names_in_ = np.asarray(json.loads(columns.read_text()), dtype=object)
+    return scaler
+
+# ── Training ─────────────────────────────────────────────────────────────────
+
+def _chunk_iter(paths, scaler, cache_prefix: str | None):
+    import xgboost as xgb
+
+    # StandardScaler.transform on bare arrays, without its name checks
+    mean  = scaler.mean_  if scaler is not None and scaler.with_mean else 0.0
+    scale = scaler.scale_ if scaler is not None and scaler.with_std  else 1.0
+
+    class ChunkIter(xgb.DataIter):
+        """Yields one (optionally scaled) chunk per next() call."""
+        def __init__(self):
+            self.i = 0
+            super().__init__(cache_prefix=cache_prefix)
+
+        def next(self, input_data) -> bool:
+            if self.i == len(paths):
+                return False
+            X, y = _load(paths[self.i])
+            X    = ((X - mean) / scale).astype(np.float32)
+            input_data(data=X, label=np.asarray(y))
+            self.i += 1
+            return True
+
+        def reset(self):
+            self.i = 0
+
+    return ChunkIter()
+
+def xgb_params(clf) -> dict:
+    """The native training parameters of a sklearn XGB estimator."""
+    params = {k: v for k, v in clf.get_xgb_params().items() if v is not None}
+    params.pop("use_label_encoder", None)
+    return {**params, "tree_method": "hist"}
+
+def train_booster(paths, params: dict, num_boost_round: int, scaler=None,
+                  external_memory: bool = True, max_bin: int = MAX_BIN,
+                  cache_dir=None):
+    """
+    xgboost.train on the chunks in `paths` (scaled by a fitted `scaler`,
+    if given) without ever concatenating them.  The external-memory cache
+    lives in `cache_dir` (default a temporary directory) and is removed
+    afterwards.
+    """
+    import xgboost as xgb
+
+    own_cache = cache_dir is None
+    cache_dir = Path(cache_dir or tempfile.mkdtemp(prefix="nekoai-xgb-"))
+    try:
+        if external_memory:
+            it = _chunk_iter(paths, scaler, os.path.join(cache_dir, "cache"))
+            dtrain = xgb.ExtMemQuantileDMatrix(it, max_bin=max_bin)
+        else:
+            it = _chunk_iter(paths, scaler, None)
+            dtrain = xgb.QuantileDMatrix(it, max_bin=max_bin)
+        booster = xgb.train({**params, "max_bin": max_bin}, dtrain, num_boost_round=num_boost_round)
+        # release the cache pages before their directory goes
+        del dtrain, it
+        return booster
+    finally:
+        if own_cache:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+def fit_pipeline_chunked(pipeline, paths, **kwargs):
+    """
+    Fit a (scaler → XGB estimator) pipeline on the chunks: the scaler by
+    partial_fit, then the estimator's booster via train_booster, loaded
+    back into the estimator so the pipeline predicts as if fit() had run.
+    """
+    from sklearn.base import clone
+
+    scaler = fit_scaler(clone(pipeline.named_steps["scaler"]), paths)
+    clf    = pipeline.named_steps["clf"]
+    booster = train_booster(paths, xgb_params(clf), clf.get_num_boosting_rounds(),
+                            scaler=scaler, **kwargs)
+    clf.load_model(bytearray(booster.save_raw("ubj")))
+    pipeline.steps[0] = ("scaler", scaler)
+    return pipeline
+
+__all__ = ["CHUNK_ROWS", "MAX_BIN", "chunk_paths", "write_chunks", "fit_scaler",
+           "xgb_params", "train_booster", "fit_pipeline_chunked"]
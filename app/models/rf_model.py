@@ -2,21 +2,26 @@ import joblib
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import Pipeline
-from sklearn.ensemble import RandomForestClassifier
 from .feature_builder import build_features
+from .tree_eval import compile_pipeline
+from .signals import proba_outputs
 
 MODEL_DIR  = Path(__file__).parent / "models"
 MODEL_DIR.mkdir(exist_ok=True)
 MODEL_FILE = MODEL_DIR / "rf_model.joblib"
+MAX_TREES  = 300   # update() replaces the oldest trees beyond this
 
 class RFModel:
     def __init__(self):
         self.lookback = 20
+        self._compact = None
         if MODEL_FILE.exists():
             self.pipeline = joblib.load(MODEL_FILE)
         else:
+            # the training frameworks are only needed for a fresh pipeline
+            from sklearn.preprocessing import StandardScaler
+            from sklearn.pipeline import Pipeline
+            from sklearn.ensemble import RandomForestClassifier
             self.pipeline = Pipeline([
                 ("scaler", StandardScaler()),
                 ("clf", RandomForestClassifier(
@@ -27,7 +32,9 @@ class RFModel:
                 )),
             ])
 
-    def fit(self, df: pd.DataFrame, news: pd.Series):
+    @staticmethod
+    def training_data(df: pd.DataFrame, news: pd.Series):
+        """(features, next-bar-up target) exactly as fit() trains on them."""
         # reset to integer index
         df2 = df.reset_index(drop=True).copy()
         n = len(df2)
@@ -44,11 +51,69 @@ class RFModel:
         df2.dropna(inplace=True)
 
         X = build_features(df2, news_s)
-        y = df2.loc[X.index, "target"]
+        return X, df2.loc[X.index, "target"]
 
+    def fit(self, df: pd.DataFrame, news: pd.Series):
+        X, y = self.training_data(df, news)
         self.pipeline.fit(X, y)
+        self._compact = None
+        joblib.dump(self.pipeline, MODEL_FILE)
+
+    def fit_chunked(self, paths, **kwargs):
+        """
+        fit() on a chunk archive (see out_of_core.write_chunks).  sklearn
+        forests need all rows in memory, so the forest is grown by
+        XGBoost's random-forest mode instead: one round of n_estimators
+        parallel trees on bootstrap-like row and per-split feature
+        subsamples, trained on streamed chunks.  kwargs go to train_booster.
+        """
+        from xgboost import XGBRFClassifier
+        from .out_of_core import fit_pipeline_chunked
+        clf = self.pipeline.named_steps["clf"]
+        n_features = np.load(paths[0], mmap_mode="r").shape[1]
+        self.pipeline.steps[-1] = ("clf", XGBRFClassifier(
+            n_estimators=getattr(clf, "n_estimators", 200),
+            max_depth=getattr(clf, "max_depth", 5),
+            subsample=0.632,
+            # sklearn's max_features="sqrt"
+            colsample_bynode=max(1, int(np.sqrt(n_features))) / n_features,
+            random_state=42,
+            n_jobs=getattr(clf, "n_jobs", None),
+        ))
+        fit_pipeline_chunked(self.pipeline, paths, **kwargs)
+        self._compact = None
+        joblib.dump(self.pipeline, MODEL_FILE)
+
+    def update(self, X: pd.DataFrame, y: pd.Series, rounds: int = 20) -> int:
+        """
+        Grow the forest: `rounds` more trees fitted on (X, y) — rows as
+        from training_data — next to the existing ones, keeping the scaler.
+        Past MAX_TREES the oldest trees are dropped, so repeated updates
+        don't grow the forest (and its inference cost) without bound.
+        Not saved; call save() to keep the result.  Returns the row count.
+        """
+        scaler, clf = self.pipeline.named_steps["scaler"], self.pipeline.named_steps["clf"]
+        if X.empty or not hasattr(clf, "warm_start"):
+            # an XGBoost forest (fit_chunked) can only be refit in full
+            return 0
+        clf.set_params(warm_start=True, n_estimators=clf.n_estimators + rounds)
+        clf.fit(scaler.transform(X), y)
+        clf.estimators_ = clf.estimators_[-MAX_TREES:]
+        clf.set_params(warm_start=False, n_estimators=len(clf.estimators_))
+        self._compact = None
+        return len(X)
+
+    def save(self):
         joblib.dump(self.pipeline, MODEL_FILE)
 
+    def _predict_proba(self, X: pd.DataFrame):
+        # flatten the fitted ensemble once; fall back to sklearn if unsupported
+        if self._compact is None:
+            self._compact = compile_pipeline(self.pipeline) or False
+        if self._compact:
+            return self._compact.predict_proba(X.values)
+        return self.pipeline.predict_proba(X)
+
     def predict(self, df: pd.DataFrame, news: float):
         df2 = df.reset_index(drop=True).copy()
         n = len(df2)
@@ -58,7 +123,7 @@ class RFModel:
         if feats.empty:
             return {"signal": "HOLD", "confidence": 0.0, "predicted_change": 0.0}
 
-        proba = self.pipeline.predict_proba(feats.iloc[[-1]])[0]
+        proba = self._predict_proba(feats.iloc[[-1]])[0]
         up, dn = proba[1], proba[0]
         sig = "BUY" if up > dn else "SELL"
         return {
@@ -67,4 +132,18 @@ class RFModel:
             "predicted_change": (up - dn) * 100
         }
 
+    def predict_batch(self, df: pd.DataFrame, news: float = 0.0) -> dict:
+        """
+        Vectorized predict() over every bar: entry t of each array equals
+        predict(df.iloc[:t+1], news), since all features are causal.
+        """
+        df2   = df.reset_index(drop=True)
+        feats = build_features(df2, pd.Series(news, index=df2.index, dtype=float))
+        if feats.empty:
+            return proba_outputs(len(df2), [], [], [])
+        # large batches: the native estimator beats the NumPy tree walk
+        proba = self.pipeline.predict_proba(feats) if self.pipeline is not None \
+                else self._predict_proba(feats)
+        return proba_outputs(len(df2), feats.index.values, proba[:, 1], proba[:, 0])
+
 __all__ = ["RFModel"]
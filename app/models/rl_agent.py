@@ -1,7 +1,5 @@
 import os
 from pathlib import Path
-from stable_baselines3 import PPO
-from app.models.rl_env import TradingEnv
 
 MODEL_DIR  = Path(__file__).parent / "models"
 MODEL_FILE = MODEL_DIR / "rl_agent.zip"
@@ -11,17 +9,65 @@ class RLAgent:
     A real PPO‐based trading agent.
     """
     def __init__(self):
+        # stable-baselines3 (and torch under it) only load with the agent
+        from stable_baselines3 import PPO
         MODEL_DIR.mkdir(parents=True, exist_ok=True)
         self.model = PPO.load(str(MODEL_FILE)) if MODEL_FILE.exists() else None
+        self.live  = {}   # symbol → LiveObservationBuilder
+
+    def train(self, df, total_timesteps=50_000, n_envs=1):
+        """
+        `df` is one bar history or a list of them (e.g. one per symbol).
+        With n_envs > 1 the histories (or a single history cut into n_envs
+        date ranges) are rolled out in parallel worker processes.
+        """
+        from stable_baselines3 import PPO
+        from app.models.rl_env import TradingEnv, split_frame, make_env_fns
+
+        frames = list(df) if isinstance(df, (list, tuple)) else [df]
+        if len(frames) == 1 and n_envs > 1:
+            frames = split_frame(frames[0], n_envs)
+
+        if len(frames) == 1:
+            env = TradingEnv(frames[0])
+        else:
+            from stable_baselines3.common.vec_env import SubprocVecEnv
+            env = SubprocVecEnv(make_env_fns(frames))
 
-    def train(self, df, total_timesteps=50_000):
-        env = TradingEnv(df)
         self.model = PPO("MlpPolicy", env, verbose=1)
-        self.model.learn(total_timesteps=total_timesteps)
+        try:
+            self.model.learn(total_timesteps=total_timesteps)
+        finally:
+            env.close()
         self.model.save(str(MODEL_FILE))
 
-    def predict(self, df, news=None):
-        env = TradingEnv(df)
-        obs = env.reset()
-        action, _ = self.model.predict(obs, deterministic=True)
+    def predict(self, df, news=None, symbol=None):
+        """
+        Act on the latest bar of `df`.  Each symbol keeps a rolling
+        observation (including the position the agent last chose), so only
+        bars new since the previous call are processed.  Without a symbol
+        the observation is built from `df` alone, flat, and not kept —
+        symbols share bar timestamps, so one shared window would mix them.
+        """
+        from app.models.rl_env import POSITIONS
+        from app.models.rl_live import LiveObservationBuilder
+
+        if symbol is None:
+            live = LiveObservationBuilder()
+        else:
+            live = self.live.get(symbol)
+            if live is None:
+                live = self.live[symbol] = LiveObservationBuilder()
+        live.sync(df)
+        if not live.ready or self.model is None:
+            return {"signal": "HOLD", "confidence": 0.0, "predicted_change": 0.0}
+
+        action, _ = self.model.predict(live.observation(), deterministic=True)
+        action = int(action)
+        live.position = POSITIONS[action]
         return {"signal": ["HOLD","BUY","SELL"][action], "confidence": 0.0, "predicted_change": 0.0}
+
+    def set_position(self, symbol, position: int):
+        """Override the tracked position (-1/0/+1), e.g. after a broker fill or close."""
+        from app.models.rl_live import LiveObservationBuilder
+        self.live.setdefault(symbol, LiveObservationBuilder()).position = position
@@ -1,6 +1,11 @@
 import gym
 from gym import spaces
 import numpy as np
+from functools import partial
+from numpy.lib.stride_tricks import sliding_window_view
+
+PRICE_FIELDS = ["open", "high", "low", "close", "volume"]
+POSITIONS    = (0, 1, -1)   # action → position
 
 class TradingEnv(gym.Env):
     """
@@ -8,12 +13,19 @@ class TradingEnv(gym.Env):
       - Discrete actions: 0 = flat, 1 = long, 2 = short
       - Observation: lookback bars × [open, high, low, close, volume, position]
       - Reward: unrealized PnL change minus slippage/commission
+    Bars are loaded once into a contiguous float32 array; each observation is
+    a zero-copy sliding-window view of it plus the position column, so
+    stepping never touches pandas.
     """
     metadata = {"render.modes": ["human"]}
 
     def __init__(self, df, lookback=20, commission=0.0002):
         super().__init__()
-        self.df = df.reset_index(drop=True)
+        self.prices = np.ascontiguousarray(df[PRICE_FIELDS].to_numpy(dtype=np.float32))
+        self.closes = df["close"].to_numpy(dtype=np.float64)
+        # windows[i] == prices[i : i+lookback]
+        self.windows = sliding_window_view(self.prices, lookback, axis=0).transpose(0, 2, 1)
+        self.n_bars = len(self.prices)
         self.lookback = lookback
         self.commission = commission
         self.position = 0  # -1 short, 0 flat, +1 long
@@ -35,10 +47,10 @@ class TradingEnv(gym.Env):
         return self._obs()
 
     def _obs(self):
-        window = self.df.iloc[self.step_idx-self.lookback:self.step_idx]
-        arr = window[["open","high","low","close","volume"]].values
-        pos_col = np.full((self.lookback,1), self.position, dtype=np.float32)
-        return np.hstack([arr, pos_col])
+        obs = np.empty((self.lookback, 6), dtype=np.float32)
+        obs[:, :5] = self.windows[self.step_idx - self.lookback]
+        obs[:, 5]  = self.position
+        return obs
 
     def step(self, action):
         """
@@ -46,28 +58,46 @@ class TradingEnv(gym.Env):
           - if changing position, pay commission on notional
         Reward is PnL difference since last step.
         """
-        price = float(self.df.at[self.step_idx, "close"])
+        price = self.closes[self.step_idx]
         prev_position = self.position
 
         # map action → position
-        self.position = {0:0, 1:1, 2:-1}[action]
+        self.position = POSITIONS[int(action)]
 
         # if we opened/closed, pay commission
         reward = 0.0
         if self.position != prev_position:
             reward -= abs(price) * self.commission
 
-        # step forward price movement
-        next_price = float(self.df.at[self.step_idx+1, "close"])
-        # unrealized PnL change
-        reward += (next_price - price) * self.position
+        # step forward price movement → unrealized PnL change
+        reward += (self.closes[self.step_idx + 1] - price) * self.position
 
         self.step_idx += 1
-        done = self.step_idx >= len(self.df)-1
-        return (self._obs() if not done else None, reward, done, {})
+        done = self.step_idx >= self.n_bars - 1
+        # the terminal observation is the last full window, not None, so
+        # vectorized wrappers can store it
+        return self._obs(), float(reward), done, {}
 
     def render(self, mode="human"):
         print(f"Step {self.step_idx}: position={self.position}")
 
     def close(self):
         pass
+
+def split_frame(df, n_parts: int, lookback: int = 20) -> list:
+    """
+    Cut one bar history into `n_parts` contiguous date ranges, each long
+    enough for at least one step after the lookback window.
+    """
+    size = len(df) // n_parts
+    if size < lookback + 2:
+        raise ValueError(f"{len(df)} bars cannot be split into {n_parts} envs of lookback {lookback}")
+    return [df.iloc[i * size : (i + 1) * size if i < n_parts - 1 else len(df)]
+            for i in range(n_parts)]
+
+def make_env_fns(frames, lookback: int = 20, commission: float = 0.0002) -> list:
+    """
+    One picklable env factory per frame (symbol or date range), as expected
+    by stable-baselines3's DummyVecEnv / SubprocVecEnv.
+    """
+    return [partial(TradingEnv, f, lookback=lookback, commission=commission) for f in frames]
@@ -0,0 +1,67 @@
+# app/models/rl_live.py
+
+import numpy as np
+from .rl_env import PRICE_FIELDS
+
+class LiveObservationBuilder:
+    """
+    Rolling TradingEnv-shaped observation (lookback × [ohlcv, position]) for
+    one symbol, fed bar by bar.
+
+    Bars are written twice into a buffer of 2×lookback rows, so the current
+    window is always the contiguous slice buf[head : head+lookback] (oldest
+    first) — each new bar is an O(1) write, with no shifting or DataFrame copy.
+    """
+    def __init__(self, lookback: int = 20):
+        self.lookback = lookback
+        self.buf      = np.zeros((2 * lookback, len(PRICE_FIELDS)), dtype=np.float32)
+        self.head     = 0        # slot of the oldest bar in the window
+        self.count    = 0
+        self.last_ts  = None
+        self.position = 0        # -1 short, 0 flat, +1 long
+
+    @property
+    def ready(self) -> bool:
+        return self.count >= self.lookback
+
+    def reset(self):
+        self.head, self.count, self.last_ts = 0, 0, None
+
+    def push(self, bar, ts=None):
+        """Append one [open, high, low, close, volume] bar."""
+        i = self.head
+        self.buf[i] = bar
+        self.buf[i + self.lookback] = bar
+        self.head    = (i + 1) % self.lookback
+        self.count  += 1
+        self.last_ts = ts
+
+    def sync(self, df) -> int:
+        """
+        Push only the bars of `df` newer than the last one seen (at most
+        `lookback` of them); returns how many were pushed.  A frame ending on
+        the last seen bar pushes nothing; one that does not contain it (gap,
+        restart) rebuilds the window from its tail.
+        """
+        start = 0
+        if self.last_ts is not None:
+            start = int(df.index.searchsorted(self.last_ts, side="right"))
+            if start == 0 or df.index[start - 1] != self.last_ts:
+                self.reset()
+                start = 0
+        start = max(start, len(df) - self.lookback)
+        if start >= len(df):
+            return 0
+
+        new = df.iloc[start:]
+        for bar, ts in zip(new[PRICE_FIELDS].to_numpy(dtype=np.float32), new.index):
+            self.push(bar, ts)
+        return len(new)
+
+    def observation(self) -> np.ndarray:
+        obs = np.empty((self.lookback, len(PRICE_FIELDS) + 1), dtype=np.float32)
+        obs[:, :-1] = self.buf[self.head : self.head + self.lookback]
+        obs[:, -1]  = self.position
+        return obs
+
+__all__ = ["LiveObservationBuilder"]
@@ -0,0 +1,117 @@
+# app/models/sequence_data.py
+
+import queue
+import threading
+
+import numpy as np
+
+class WindowBatches:
+    """
+    Shuffled mini-batches of `lookback`-row windows of one contiguous
+    feature array, gathered on the fly: sample k is
+    arr[starts[k] : starts[k] + lookback] with label targets[k].
+
+    Only the feature array is kept; a batch is copied out when it is
+    produced, so memory grows with batch_size × lookback, not with the
+    number of windows.  Iterating runs endless epochs (reshuffled each
+    time) with `prefetch` batches assembled ahead on a background thread —
+    pass it to Keras fit with steps_per_epoch=len(batches).
+    """
+    def __init__(self, arr, targets, lookback: int, batch_size: int = 32,
+                 starts=None, shuffle: bool = True, seed: int | None = None,
+                 prefetch: int = 4):
+        self.arr        = np.ascontiguousarray(arr, dtype=np.float32)
+        self.targets    = np.asarray(targets, dtype=np.float32)
+        self.starts     = np.arange(len(self.targets)) if starts is None else np.asarray(starts)
+        self.lookback   = lookback
+        self.batch_size = batch_size
+        self.shuffle    = shuffle
+        self.prefetch   = prefetch
+        self._rng       = np.random.default_rng(seed)
+        self._offsets   = np.arange(lookback)
+
+    def __len__(self):
+        return -(-len(self.starts) // self.batch_size)
+
+    @classmethod
+    def concat(cls, parts: list, **kwargs) -> "WindowBatches":
+        """One loader over the samples of several (e.g. one per symbol)."""
+        offsets = np.cumsum([0] + [len(p.arr) for p in parts[:-1]])
+        return cls(np.concatenate([p.arr for p in parts]),
+                   np.concatenate([p.targets for p in parts]),
+                   parts[0].lookback,
+                   starts=np.concatenate([p.starts + o for p, o in zip(parts, offsets)]),
+                   **{"batch_size": parts[0].batch_size, **kwargs})
+
+    def split(self, fraction: float):
+        """
+        (train, validation): the last `fraction` of the samples, unshuffled,
+        become the validation set — what Keras' validation_split does.
+        """
+        n_val = int(len(self.starts) * fraction)
+        cut   = len(self.starts) - n_val
+        make  = lambda sl, shuffle: WindowBatches(
+            self.arr, self.targets[sl], self.lookback, self.batch_size,
+            starts=self.starts[sl], shuffle=shuffle, seed=self._rng.integers(1 << 31),
+            prefetch=self.prefetch)
+        return make(slice(0, cut), self.shuffle), make(slice(cut, None), False)
+
+    def batch(self, idx) -> tuple[np.ndarray, np.ndarray]:
+        """(windows, labels) of the samples at `idx`."""
+        s = self.starts[idx]
+        return self.arr[s[:, None] + self._offsets], self.targets[idx]
+
+    def epoch(self):
+        """One pass over the samples, in a fresh random order if shuffling."""
+        order = self._rng.permutation(len(self.starts)) if self.shuffle \
+                else np.arange(len(self.starts))
+        for i in range(0, len(order), self.batch_size):
+            yield self.batch(order[i:i + self.batch_size])
+
+    def __iter__(self):
+        # an empty epoch would make the producer spin and the consumer wait forever
+        if not len(self.starts):
+            raise ValueError("WindowBatches has no samples to iterate")
+        q, stop = queue.Queue(maxsize=max(1, self.prefetch)), threading.Event()
+
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def produce():
+            try:
+                while True:
+                    for b in self.epoch():
+                        if not put(b):
+                            return
+            except BaseException as e:
+                put(e)
+
+        threading.Thread(target=produce, daemon=True, name="window-prefetch").start()
+        try:
+            while True:
+                item = q.get()
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            # the consumer is done (or gone): let the producer exit
+            stop.set()
+
+def next_bar_windows(arr: np.ndarray, closes: np.ndarray, lookback: int,
+                     first: int = 0, **kwargs) -> WindowBatches:
+    """
+    The LSTM/CNN training set as a WindowBatches: for i in
+    max(lookback, first) .. len(arr)-2, window arr[i-lookback : i]
+    labelled closes[i+1] > closes[i].
+    """
+    i = np.arange(max(lookback, first), max(lookback, first, len(arr) - 1))
+    return WindowBatches(arr, closes[i + 1] > closes[i], lookback,
+                         starts=i - lookback, **kwargs)
+
+__all__ = ["WindowBatches", "next_bar_windows"]
@@ -0,0 +1,62 @@
+# app/models/signals.py
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# vectorized signal codes (predict() returns the names)
+BUY, HOLD, SELL = 1, 0, -1
+SIGNAL_NAMES    = {BUY: "BUY", HOLD: "HOLD", SELL: "SELL"}
+
+def latest_row(n: int, positions) -> np.ndarray:
+    """
+    For each bar t in range(n), the index into `positions` of the latest
+    prediction made at or before t (-1 if none yet).  `positions` are the
+    sorted bar positions that have a prediction, e.g. the non-NaN feature rows.
+    """
+    idx = np.full(n, -1, dtype=np.int64)
+    idx[np.asarray(positions, dtype=np.int64)] = np.arange(len(positions))
+    return np.maximum.accumulate(idx)
+
+def proba_outputs(n: int, positions, up, dn) -> dict:
+    """
+    Batch form of the classifier models' predict(): BUY if p(up) > p(down),
+    confidence = max(p)*100, predicted_change = (up-dn)*100, HOLD before the
+    first prediction.  Arrays are aligned to bar positions 0..n-1.
+    """
+    row   = latest_row(n, positions)
+    ok    = row >= 0
+    # a trailing 0 makes row == -1 (no prediction yet) index safely
+    up    = np.append(np.asarray(up, dtype=np.float64), 0.0)[row]
+    dn    = np.append(np.asarray(dn, dtype=np.float64), 0.0)[row]
+    return {
+        "signal":           np.where(ok, np.where(up > dn, BUY, SELL), HOLD).astype(np.int8),
+        "confidence":       np.where(ok, np.maximum(up, dn) * 100, 0.0),
+        "predicted_change": np.where(ok, (up - dn) * 100, 0.0),
+    }
+
+def sigmoid_outputs(n: int, positions, p) -> dict:
+    """
+    Batch form of the Keras models' predict(): BUY if p > 0.5,
+    confidence = p*100, predicted_change = (p-0.5)*200.
+    """
+    row = latest_row(n, positions)
+    ok  = row >= 0
+    p   = np.append(np.asarray(p, dtype=np.float64), 0.0)[row]
+    return {
+        "signal":           np.where(ok, np.where(p > 0.5, BUY, SELL), HOLD).astype(np.int8),
+        "confidence":       np.where(ok, p * 100, 0.0),
+        "predicted_change": np.where(ok, (p - 0.5) * 200, 0.0),
+    }
+
+def predict_windows(predict_fn, arr: np.ndarray, lookback: int, chunk: int = 8_192) -> np.ndarray:
+    """
+    Apply a sequence model to every `lookback`-row window of `arr`
+    (window k = arr[k : k+lookback]).  Windows are zero-copy views,
+    materialized `chunk` at a time so memory stays bounded.
+    """
+    windows = sliding_window_view(arr, lookback, axis=0).transpose(0, 2, 1)
+    out     = np.empty(len(windows), dtype=np.float64)
+    for start in range(0, len(windows), chunk):
+        batch = np.ascontiguousarray(windows[start:start + chunk], dtype=np.float32)
+        out[start:start + len(batch)] = np.asarray(predict_fn(batch)).reshape(-1)
+    return out
@@ -0,0 +1,298 @@
+# app/models/tree_eval.py
+
+import json
+import numpy as np
+
+# trees deeper than this would need 2**depth slots per tree — fall back to sklearn/xgboost
+MAX_DEPTH = 12
+BATCH_ROWS   = 64     # batches from this size use the batch evaluators below
+QS_MAX_DEPTH = 6      # a tree's leaves must fit one uint64 bitvector
+QS_MAX_MB    = 64     # cap on the bitvector tables
+
+class CompactEnsemble:
+    """
+    A trained RF or XGB ensemble flattened into complete binary trees stored
+    as NumPy arrays, (n_trees × 2**depth-1) for splits and (n_trees × 2**depth)
+    for leaves:
+      feature, threshold, default_left  → internal nodes
+      value                             → leaves
+    Shallow leaves are padded out, so every row walks exactly `depth` levels
+    of all trees at once with `node = 2*node + 1 + went_right` — no child
+    pointers, no per-tree Python, no thread pool.
+
+    That walk gathers one value per (row, tree, level), which is what one
+    row needs but slow for batches.  Batches of up to depth-6 trees are
+    scored with QuickScorer-style bitvectors instead: each tree's leaves
+    are the bits of a uint64, and every split a row goes right on clears
+    the leaves of its left subtree, so the exit leaf is the lowest bit
+    left.  Per feature, the splits sorted by threshold and the running AND
+    of their masks make that one searchsorted and one contiguous row
+    gather per (row, feature).  Given `native` (an XGBoost model file),
+    batches go through xgboost itself when it is installed.
+    """
+    def __init__(self, kind, feature, threshold, default_left, value, depth,
+                 base_margin=0.0, mean=None, scale=None, thr32=None, native=None):
+        self.kind         = kind          # "rf" → mean of leaf probas, "xgb" → sigmoid(sum of margins)
+        self.feature      = np.ascontiguousarray(feature,      dtype=np.int32)
+        self.threshold    = np.ascontiguousarray(threshold,    dtype=np.float64)
+        self.default_left = np.ascontiguousarray(default_left, dtype=bool)
+        self.value        = np.ascontiguousarray(value,        dtype=np.float64)
+        self.depth        = int(depth)
+        self.base_margin  = float(base_margin)
+        self.mean         = None if mean  is None else np.asarray(mean,  dtype=np.float64)
+        self.scale        = None if scale is None else np.asarray(scale, dtype=np.float64)
+        # float32 copy of the split thresholds, rounded down so `x > thr`
+        # gives the same answer for float32 x as the float64 threshold
+        # (passed in when loading a saved ensemble)
+        if thr32 is None:
+            thr32 = self.threshold.astype(np.float32)
+            above = thr32.astype(np.float64) > self.threshold
+            thr32[above] = np.nextafter(thr32[above], np.float32(-np.inf))
+        self._thr32 = np.asarray(thr32, dtype=np.float32).ravel()
+        self.native   = native
+        self._booster = None
+        self._tables  = None
+
+    @property
+    def n_trees(self) -> int:
+        return self.feature.shape[0]
+
+    def _leaf_values(self, X: np.ndarray) -> np.ndarray:
+        """Return the (rows × trees) leaf values reached by each row."""
+        n, n_feat = X.shape
+        n_int     = (1 << self.depth) - 1
+        feature   = self.feature.ravel()
+        x_flat    = X.ravel()
+        row_base  = (np.arange(n, dtype=np.int32) * n_feat)[:, None]
+        tree_base = np.arange(self.n_trees, dtype=np.int32) * n_int
+        has_nan   = np.isnan(x_flat).any()
+
+        local = np.zeros((n, self.n_trees), dtype=np.int32)
+        for _ in range(self.depth):
+            node = tree_base + local
+            x    = x_flat[row_base + feature[node]]
+            thr  = self._thr32[node]
+            # sklearn goes left on x <= thr, xgboost on x < thr
+            right = (x >= thr) if self.kind == "xgb" else (x > thr)
+            if has_nan:
+                right = np.where(np.isnan(x), ~self.default_left.ravel()[node], right)
+            local *= 2
+            local += 1
+            local += right
+
+        leaf = local - n_int
+        leaf += np.arange(self.n_trees, dtype=np.int32) * (n_int + 1)
+        return self.value.ravel()[leaf]
+
+    def _bitvector_tables(self, n_feat: int):
+        """Per feature: (sorted split thresholds, running AND of their leaf masks), or False."""
+        if self._tables is None:
+            tables   = False
+            n_int, T = (1 << self.depth) - 1, self.n_trees
+            size_mb  = (np.isfinite(self.threshold).sum() + n_feat) * T * 8 / 1024 / 1024
+            if self.depth <= QS_MAX_DEPTH and size_mb <= QS_MAX_MB:
+                pos   = np.arange(n_int)
+                level = np.floor(np.log2(pos + 1)).astype(np.int64)
+                span  = (1 << (self.depth - level)).astype(np.uint64)
+                first = (pos - ((1 << level) - 1)).astype(np.uint64) * span
+                # going right drops the leaves of the left subtree
+                left  = ((np.uint64(1) << (span // np.uint64(2))) - np.uint64(1)) << first
+                thr   = self._thr32.reshape(T, n_int)
+                # padded splits (threshold inf) never go right
+                split = np.isfinite(self.threshold)
+                tables = []
+                for f in range(n_feat):
+                    t, p  = np.nonzero(split & (self.feature == f))
+                    order = np.argsort(thr[t, p], kind="stable")
+                    t, p  = t[order], p[order]
+                    masks = np.full((len(t) + 1, T), np.uint64(0xFFFFFFFFFFFFFFFF))
+                    masks[np.arange(1, len(t) + 1), t] = ~left[p]
+                    tables.append((thr[t, p], np.bitwise_and.accumulate(masks, axis=0)))
+            self._tables = tables
+        return self._tables
+
+    def _leaf_values_batch(self, X: np.ndarray, tables) -> np.ndarray:
+        """_leaf_values by bitvectors (see the class docstring); X without NaNs."""
+        # sklearn goes left on x <= thr, xgboost on x < thr
+        side = "right" if self.kind == "xgb" else "left"
+        acc  = None
+        for f, (thr, masks) in enumerate(tables):
+            m = masks[np.searchsorted(thr, X[:, f], side=side)]
+            if acc is None:
+                acc = m
+            else:
+                acc &= m
+        lowest = acc & (~acc + np.uint64(1))
+        leaf   = np.frexp(lowest.astype(np.float64))[1] - 1
+        leaf  += np.arange(self.n_trees) * (1 << self.depth)
+        return self.value.ravel()[leaf]
+
+    def _native_proba(self, X: np.ndarray):
+        """p(up) from the native XGBoost model, or None without one."""
+        if self.native is None:
+            return None
+        if self._booster is None:
+            try:
+                import xgboost as xgb
+            except ImportError:
+                self.native = None
+                return None
+            self._booster = xgb.Booster(model_file=str(self.native))
+        return np.asarray(self._booster.inplace_predict(X), dtype=np.float64)
+
+    def predict_proba(self, X, chunk_rows: int | None = None) -> np.ndarray:
+        """
+        Same contract as sklearn's predict_proba for a binary classifier:
+        returns an (n, 2) array of [p(down), p(up)].
+        Accepts a single 1-D row or a 2-D batch; batches of BATCH_ROWS or
+        more go through the native model or the bitvectors when they can,
+        in chunks so the (rows × trees) matrices stay cache-sized.
+        """
+        X = np.asarray(X, dtype=np.float64)
+        if X.ndim == 1:
+            X = X[None, :]
+        if self.mean is not None:
+            X = X - self.mean
+        if self.scale is not None:
+            X = X / self.scale
+        # both sklearn and xgboost compare features as float32
+        X = np.ascontiguousarray(X.astype(np.float32))
+
+        batch  = X.shape[0] >= BATCH_ROWS
+        p_up   = self._native_proba(X) if batch else None
+        if p_up is not None:
+            return np.column_stack([1.0 - p_up, p_up])
+        tables = self._bitvector_tables(X.shape[1]) if batch and not np.isnan(X).any() else False
+        leaves = (lambda x: self._leaf_values_batch(x, tables)) if tables else self._leaf_values
+        if chunk_rows is None:
+            chunk_rows = max(1, (1 << (15 if tables else 16)) // max(1, self.n_trees))
+
+        p_up = np.empty(X.shape[0], dtype=np.float64)
+        for start in range(0, X.shape[0], chunk_rows):
+            stop = start + chunk_rows
+            vals = leaves(X[start:stop])
+            if self.kind == "xgb":
+                margin = vals.sum(axis=1) + self.base_margin
+                p_up[start:stop] = 1.0 / (1.0 + np.exp(-margin))
+            else:
+                p_up[start:stop] = vals.mean(axis=1)
+
+        return np.column_stack([1.0 - p_up, p_up])
+
+# ── Converters ────────────────────────────────────────────────────────────────
+
+def _densify(trees: list, depth: int):
+    """
+    Lay out sparse trees — (feature, threshold, left, right, default_left, value)
+    per tree, children < 0 marking leaves — as complete binary trees of `depth`.
+    A leaf above the bottom level fills every bottom slot under it, so padded
+    splits can route either way.
+    """
+    n_int, n_leaf = (1 << depth) - 1, 1 << depth
+    T            = len(trees)
+    feature      = np.zeros((T, n_int), dtype=np.int32)
+    threshold    = np.full((T, n_int), np.inf)
+    default_left = np.ones((T, n_int), dtype=bool)
+    value        = np.zeros((T, n_leaf))
+
+    for t, (feat, thr, lc, rc, dl, val) in enumerate(trees):
+        stack = [(0, 0, 0)]           # (source node, dense slot, level)
+        while stack:
+            src, pos, d = stack.pop()
+            if lc[src] < 0:
+                span  = 1 << (depth - d)
+                first = ((pos + 1) << (depth - d)) - 1 - n_int
+                value[t, first:first + span] = val[src]
+                continue
+            feature[t, pos]      = feat[src]
+            threshold[t, pos]    = thr[src]
+            default_left[t, pos] = dl[src]
+            stack.append((lc[src], 2 * pos + 1, d + 1))
+            stack.append((rc[src], 2 * pos + 2, d + 1))
+
+    return feature, threshold, default_left, value
+
+def _from_sklearn_forest(clf, mean, scale) -> CompactEnsemble | None:
+    depth = max(est.tree_.max_depth for est in clf.estimators_)
+    if depth > MAX_DEPTH:
+        return None
+
+    trees = []
+    for est in clf.estimators_:
+        t  = est.tree_
+        v  = t.value[:, 0, :]
+        # normalise leaf counts/fractions to p(class 1), as predict_proba does
+        p1 = v[:, 1] / v.sum(axis=1)
+        dl = getattr(t, "missing_go_to_left", np.zeros(t.node_count, dtype=np.uint8))
+        trees.append((t.feature, t.threshold, t.children_left, t.children_right, dl, p1))
+
+    depth = max(depth, 1)
+    return CompactEnsemble("rf", *_densify(trees, depth), depth, mean=mean, scale=scale)
+
+def _parse_base_score(raw) -> float:
+    # xgboost >= 2 stores it as a vector string, e.g. "[5.05E-1]"
+    return float(str(raw).strip("[]").split(",")[0])
+
+def _tree_depth(parents: np.ndarray) -> int:
+    # parents[0] is a sentinel; nodes are numbered parent-before-child
+    d = np.zeros(len(parents), dtype=np.int64)
+    for i in range(1, len(parents)):
+        d[i] = d[parents[i]] + 1
+    return int(d.max())
+
+def _from_xgb_booster(booster, mean, scale) -> CompactEnsemble | None:
+    model   = json.loads(booster.save_raw("json"))
+    learner = model["learner"]
+    obj     = learner["objective"]["name"]
+    if obj != "binary:logistic":
+        raise ValueError(f"Unsupported xgboost objective: {obj}")
+
+    base_score  = _parse_base_score(learner["learner_model_param"]["base_score"])
+    base_margin = float(np.log(base_score / (1.0 - base_score)))
+
+    trees, depth = [], 0
+    for tree in learner["gradient_booster"]["model"]["trees"]:
+        lc   = np.asarray(tree["left_children"], dtype=np.int64)
+        cond = np.asarray(tree["split_conditions"], dtype=np.float32).astype(np.float64)
+        # leaf weights live in split_conditions (learning rate already applied)
+        trees.append((
+            np.asarray(tree["split_indices"], dtype=np.int64), cond,
+            lc, np.asarray(tree["right_children"], dtype=np.int64),
+            np.asarray(tree["default_left"], dtype=bool), cond,
+        ))
+        depth = max(depth, _tree_depth(np.asarray(tree["parents"], dtype=np.int64)))
+
+    if depth > MAX_DEPTH:
+        return None
+    depth = max(depth, 1)
+    return CompactEnsemble("xgb", *_densify(trees, depth), depth,
+                           base_margin=base_margin, mean=mean, scale=scale)
+
+def compile_pipeline(pipeline) -> CompactEnsemble | None:
+    """
+    Flatten a fitted (scaler →) RandomForestClassifier / XGBClassifier /
+    XGBRFClassifier pipeline into a CompactEnsemble.  Returns None when the pipeline is
+    unfitted, too deep, or not a supported shape, so callers can fall back
+    to the original estimator.
+    """
+    steps = getattr(pipeline, "steps", None) or [("clf", pipeline)]
+    mean = scale = None
+    for _, step in steps[:-1]:
+        if type(step).__name__ != "StandardScaler" or not hasattr(step, "scale_"):
+            return None
+        mean, scale = step.mean_, step.scale_
+    clf = steps[-1][1]
+
+    try:
+        if type(clf).__name__ == "RandomForestClassifier":
+            if not hasattr(clf, "estimators_") or clf.n_classes_ != 2:
+                return None
+            return _from_sklearn_forest(clf, mean, scale)
+        if type(clf).__name__ in ("XGBClassifier", "XGBRFClassifier"):
+            return _from_xgb_booster(clf.get_booster(), mean, scale)
+    except Exception:
+        # unfitted booster, multi-class objective, …
+        return None
+    return None
+
+__all__ = ["CompactEnsemble", "compile_pipeline"]
@@ -2,21 +2,26 @@ import joblib
 import pandas as pd
 import numpy as np
 from pathlib import Path
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import Pipeline
-from xgboost import XGBClassifier
 from .feature_builder import build_features
+from .tree_eval import compile_pipeline
+from .signals import proba_outputs
 
 MODEL_DIR  = Path(__file__).parent / "models"
 MODEL_DIR.mkdir(exist_ok=True)
 MODEL_FILE = MODEL_DIR / "xgb_model.joblib"
+MAX_ROUNDS = 600   # update() refits from scratch instead of boosting past this
 
 class MomentumModel:
     def __init__(self):
         self.lookback = 20
+        self._compact = None
         if MODEL_FILE.exists():
             self.pipeline = joblib.load(MODEL_FILE)
         else:
+            # the training frameworks are only needed for a fresh pipeline
+            from sklearn.preprocessing import StandardScaler
+            from sklearn.pipeline import Pipeline
+            from xgboost import XGBClassifier
             self.pipeline = Pipeline([
                 ("scaler", StandardScaler()),
                 ("clf", XGBClassifier(
@@ -31,7 +36,9 @@ class MomentumModel:
                 )),
             ])
 
-    def fit(self, df: pd.DataFrame, news: pd.Series):
+    @staticmethod
+    def training_data(df: pd.DataFrame, news: pd.Series):
+        """(features, next-bar-up target) exactly as fit() trains on them."""
         # reset to integer index
         df2 = df.reset_index(drop=True).copy()
         n = len(df2)
@@ -48,11 +55,64 @@ class MomentumModel:
         df2.dropna(inplace=True)
 
         X = build_features(df2, news_s)
-        y = df2.loc[X.index, "target"]
+        return X, df2.loc[X.index, "target"]
 
+    def fit(self, df: pd.DataFrame, news: pd.Series):
+        X, y = self.training_data(df, news)
         self.pipeline.fit(X, y)
+        self._compact = None
+        joblib.dump(self.pipeline, MODEL_FILE)
+
+    def fit_chunked(self, paths, **kwargs):
+        """
+        fit() on a chunk archive (see out_of_core.write_chunks) instead of
+        one in-memory frame: histogram boosting on streamed chunks, with
+        memory bounded by the chunk size.  kwargs go to train_booster.
+        """
+        from .out_of_core import fit_pipeline_chunked
+        fit_pipeline_chunked(self.pipeline, paths, **kwargs)
+        self._compact = None
+        joblib.dump(self.pipeline, MODEL_FILE)
+
+    def update(self, X: pd.DataFrame, y: pd.Series, rounds: int = 50) -> int:
+        """
+        Continue boosting: add `rounds` trees fitted on (X, y) — rows as
+        from training_data — to the current booster, keeping the scaler.
+        Once that would pass MAX_ROUNDS the pipeline is refit from scratch
+        on (X, y) instead, so repeated updates don't grow the booster (and
+        its inference cost) without bound.
+        Not saved; call save() to keep the result.  Returns the row count.
+        """
+        if X.empty:
+            return 0
+        scaler, clf = self.pipeline.named_steps["scaler"], self.pipeline.named_steps["clf"]
+        booster = clf.get_booster()
+        if booster.num_boosted_rounds() + rounds > MAX_ROUNDS:
+            self.pipeline.fit(X, y)
+            self._compact = None
+            return len(X)
+        # n_estimators is the round count of this fit; put the configured one
+        # back so it is what save() persists and a full fit() trains
+        n_estimators = clf.n_estimators
+        clf.set_params(n_estimators=rounds)
+        try:
+            clf.fit(scaler.transform(X), y, xgb_model=booster)
+        finally:
+            clf.set_params(n_estimators=n_estimators)
+        self._compact = None
+        return len(X)
+
+    def save(self):
         joblib.dump(self.pipeline, MODEL_FILE)
 
+    def _predict_proba(self, X: pd.DataFrame):
+        # flatten the fitted ensemble once; fall back to sklearn if unsupported
+        if self._compact is None:
+            self._compact = compile_pipeline(self.pipeline) or False
+        if self._compact:
+            return self._compact.predict_proba(X.values)
+        return self.pipeline.predict_proba(X)
+
     def predict(self, df: pd.DataFrame, news: float):
         df2 = df.reset_index(drop=True).copy()
         n = len(df2)
@@ -64,7 +124,7 @@ class MomentumModel:
         if feats.empty:
             return {"signal": "HOLD", "confidence": 0.0, "predicted_change": 0.0}
 
-        proba = self.pipeline.predict_proba(feats.iloc[[-1]])[0]
+        proba = self._predict_proba(feats.iloc[[-1]])[0]
         up, dn = proba[1], proba[0]
         sig = "BUY" if up > dn else "SELL"
         return {
@@ -73,4 +133,18 @@ class MomentumModel:
             "predicted_change": (up - dn) * 100
         }
 
+    def predict_batch(self, df: pd.DataFrame, news: float = 0.0) -> dict:
+        """
+        Vectorized predict() over every bar: entry t of each array equals
+        predict(df.iloc[:t+1], news), since all features are causal.
+        """
+        df2   = df.reset_index(drop=True)
+        feats = build_features(df2, pd.Series(news, index=df2.index, dtype=float))
+        if feats.empty:
+            return proba_outputs(len(df2), [], [], [])
+        # large batches: the native estimator beats the NumPy tree walk
+        proba = self.pipeline.predict_proba(feats) if self.pipeline is not None \
+                else self._predict_proba(feats)
+        return proba_outputs(len(df2), feats.index.values, proba[:, 1], proba[:, 0])
+
 __all__ = ["MomentumModel"]
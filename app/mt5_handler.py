@@ -5,6 +5,7 @@ import os
 import time
 import math
 import requests
+import numpy as np
 from config import USE_MOCK_MT5, MT5_LOGIN, MT5_PASSWORD, MT5_SERVER
 from app.market_data import fetch_market_data
 from app.telegram_bot import send_message_channel as _raw_send
@@ -75,18 +76,16 @@ def _get_env_float(name: str, default: float) -> float:
     except ValueError:
         return default
 
-def compute_trade_levels(entry_price: float,
-                         side: str,
-                         info,
-                         symbol: str) -> dict:
+RISK_FRACTION = 0.01   # SL distance as a fraction of the entry price
+TP_RATIO      = 1.5    # TP distance as a multiple of the SL distance
+
+def min_stop_distance(info, symbol: str) -> float:
     """
-    Calculate SL/TP:
+    Smallest SL distance we place:
     - For FX pairs we respect the broker's trade_stops_level.
     - Otherwise we clamp to our pip‐based minimum.
     """
-    digits       = info.digits
-    point        = info.point
-    raw_min_dist = info.trade_stops_level * point
+    raw_min_dist = info.trade_stops_level * info.point
 
     # our pip‐based minimum from SL_AMOUNT (inline-comment safe)
     sl_pips      = _get_env_float('SL_AMOUNT', 2.0)
@@ -94,11 +93,19 @@ def compute_trade_levels(entry_price: float,
     min_dist_by_pip = sl_pips * pip_sz
 
     fx_pairs = {"EURUSD", "USDJPY", "USDCAD", "NZDUSD"}
-    min_dist = raw_min_dist if symbol.upper() in fx_pairs else min(raw_min_dist, min_by_pip)
+    return raw_min_dist if symbol.upper() in fx_pairs else min(raw_min_dist, min_dist_by_pip)
 
-    risk_dist = entry_price * 0.01
+def compute_trade_levels(entry_price: float,
+                         side: str,
+                         info,
+                         symbol: str) -> dict:
+    """Calculate SL/TP around entry_price (see min_stop_distance)."""
+    digits    = info.digits
+    min_dist  = min_stop_distance(info, symbol)
+
+    risk_dist = entry_price * RISK_FRACTION
     sl_dist   = max(risk_dist, min_dist)
-    tp_dist   = sl_dist * 1.5
+    tp_dist   = sl_dist * TP_RATIO
 
     if side == "BUY":
         sl = entry_price - sl_dist
@@ -113,6 +120,18 @@ def compute_trade_levels(entry_price: float,
         'digits': digits
     }
 
+def compute_trade_levels_array(entry_prices, sides, info, symbol: str):
+    """
+    compute_trade_levels for many entries at once: `sides` is +1 (BUY) /
+    -1 (SELL) per entry.  Returns (sl, tp) float arrays.
+    """
+    entry   = np.asarray(entry_prices, dtype=np.float64)
+    sides   = np.asarray(sides, dtype=np.float64)
+    sl_dist = np.maximum(entry * RISK_FRACTION, min_stop_distance(info, symbol))
+    tp_dist = sl_dist * TP_RATIO
+    return (np.round(entry - sides * sl_dist, info.digits),
+            np.round(entry + sides * tp_dist, info.digits))
+
 def normalize_volume(desired: float, info) -> float:
     """Raise volume up to the broker’s minimum/step—never skip."""
     min_vol  = info.volume_min
@@ -6,21 +6,32 @@ import time
 from datetime import datetime, timedelta
 import pandas as pd
 
-import feedparser
-import nltk
-from nltk.sentiment.vader import SentimentIntensityAnalyzer
-from newsapi import NewsApiClient, newsapi_exception
+# feedparser / NLTK / NewsAPI are imported on first use, so importing this
+# module (and everything that imports it) stays cheap.
+NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
+_newsapi    = None
+_vader      = None
 
-# ── Ensure VADER lexicon is present ───────────────────────────────────────────
-try:
-    nltk.data.find("sentiment/vader_lexicon/vader_lexicon.txt")
-except LookupError:
-    nltk.download("vader_lexicon", quiet=True)
+def _get_newsapi():
+    """NewsAPI client, or None when no key is configured."""
+    global _newsapi
+    if _newsapi is None and NEWSAPI_KEY:
+        from newsapi import NewsApiClient
+        _newsapi = NewsApiClient(api_key=NEWSAPI_KEY)
+    return _newsapi
 
-# initialize clients
-NEWSAPI_KEY = os.getenv("NEWSAPI_KEY")
-newsapi      = NewsApiClient(api_key=NEWSAPI_KEY) if NEWSAPI_KEY else None
-vader        = SentimentIntensityAnalyzer()
+def _get_vader():
+    """VADER analyzer; downloads the lexicon the first time if missing."""
+    global _vader
+    if _vader is None:
+        import nltk
+        from nltk.sentiment.vader import SentimentIntensityAnalyzer
+        try:
+            nltk.data.find("sentiment/vader_lexicon/vader_lexicon.txt")
+        except LookupError:
+            nltk.download("vader_lexicon", quiet=True)
+        _vader = SentimentIntensityAnalyzer()
+    return _vader
 
 # map symbols to search queries
 QUERY_MAP = {
@@ -30,6 +41,7 @@ QUERY_MAP = {
 
 def _fetch_rss_headlines(symbol: str) -> list[str]:
     """Fetch titles from Google News RSS for a given symbol query."""
+    import feedparser
     q    = QUERY_MAP.get(symbol, symbol)
     url  = f"https://news.google.com/rss/search?q={q}"
     feed = feedparser.parse(url)
@@ -41,8 +53,10 @@ def _fetch_newsapi_headlines(symbol: str,
                             from_dt: datetime,
                             to_dt:   datetime) -> list[str]:
     """Fallback: call NewsAPI everything endpoint for given time window."""
+    newsapi = _get_newsapi()
     if not newsapi:
         return []
+    from newsapi import newsapi_exception
     q = QUERY_MAP.get(symbol, symbol)
     try:
         res = newsapi.get_everything(
@@ -60,6 +74,7 @@ def _score_headlines(headlines: list[str]) -> float:
     """Return average VADER compound score, or 0 if none."""
     if not headlines:
         return 0.0
+    vader  = _get_vader()
     scores = [vader.polarity_scores(t)["compound"] for t in headlines]
     return sum(scores) / len(scores)
 
@@ -0,0 +1,192 @@
+# app/portfolio.py
+"""
+Portfolio backtest: every symbol's trades on one account.
+
+Trades (e.g. from event_backtester.run_event_backtest) are replayed on a
+merged timeline the way the live loop sizes them: each entry takes the
+current RiskManager lot (normalized to the symbol's volume rules), each
+exit moves the lot up/down by LOT_ADJUST_PERCENT within LOT_MIN/LOT_MAX.
+Entries that the free margin cannot cover are skipped.
+
+Margin and P/L are kept in the account currency: pairs quoted in it
+(EURUSD, BTCUSDT — stablecoins count as dollars) need no conversion,
+pairs based on it (USDJPY) need lots × contract size as margin and their
+quote-currency P/L divided by the pair's own price.
+
+Only the lot/margin bookkeeping walks the events; the equity, margin and
+drawdown curves on the bar grid are built from per-symbol difference
+arrays and cumulative sums.
+"""
+import numpy as np
+import pandas as pd
+
+from config import LOT_BASE, LOT_MIN, LOT_MAX, LOT_ADJUST_PERCENT
+from app.risk_manager import adjust_lot
+from app.mt5_handler import normalize_volume
+from app.event_backtester import default_spec
+
+# settle 1:1 with the dollar
+STABLECOINS = {"USDT", "USDC", "BUSD"}
+
+def _currency(code: str) -> str:
+    code = (code or "").upper()
+    return "USD" if code in STABLECOINS else code
+
+def base_priced(symbol: str, spec, account: str) -> bool:
+    """
+    True if `symbol` is based on the account currency (USDJPY on a USD
+    account), False if it is quoted in it (EURUSD, BTCUSDT); ValueError
+    for crosses, which would need a third rate.
+    """
+    account = _currency(account)
+    if _currency(getattr(spec, "currency_profit", "")) == account:
+        return False
+    if _currency(getattr(spec, "currency_base", "")) == account:
+        return True
+    raise ValueError(f"{symbol}: neither its base nor its quote currency is {account}")
+
+def _size_trades(trades: pd.DataFrame, specs: dict, initial_balance: float,
+                 leverage: float, start_lot: float, lot_kw: dict, based: dict):
+    """
+    Replay entries/exits in time order; returns (volume, margin, profit,
+    taken) in the account currency.  `based` maps symbol → base_priced().
+    """
+    n        = len(trades)
+    side     = trades["side"].to_numpy(dtype=np.float64)
+    entry_px = trades["entry_price"].to_numpy(dtype=np.float64)
+    exit_px  = trades["exit_price"].to_numpy(dtype=np.float64)
+    sym      = trades["symbol"].to_numpy()
+    spec     = [specs[s] for s in sym]
+    cs       = np.array([sp.contract_size for sp in spec])
+    fee      = np.array([2 * sp.commission_per_lot for sp in spec])
+    base     = np.array([based[s] for s in sym], dtype=bool)
+
+    # entries before exits at the same timestamp: an order fills at the
+    # bar's open, a stop fires inside the bar
+    t_in   = trades["entry_time"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    t_out  = trades["exit_time"].to_numpy(dtype="datetime64[ns]").astype(np.int64)
+    times  = np.concatenate([t_in, t_out])
+    kinds  = np.concatenate([np.zeros(n, np.int8), np.ones(n, np.int8)])
+    order  = np.lexsort((kinds, times))
+
+    volume = np.zeros(n)
+    margin = np.zeros(n)
+    profit = np.zeros(n)
+    taken  = np.zeros(n, dtype=bool)
+    balance, used, lot = initial_balance, 0.0, start_lot
+    for e in order.tolist():
+        i = e % n
+        if e < n:
+            vol = normalize_volume(lot, spec[i])
+            req = vol * cs[i] * (1.0 if base[i] else entry_px[i]) / leverage
+            if balance - used < req:
+                continue
+            volume[i], margin[i], taken[i] = vol, req, True
+            used += req
+        elif taken[i]:
+            p          = side[i] * (exit_px[i] - entry_px[i]) * volume[i] * cs[i]
+            if base[i]:
+                p     /= exit_px[i]
+            p         -= fee[i] * volume[i]
+            profit[i]  = p
+            balance   += p
+            used      -= margin[i]
+            lot        = adjust_lot(lot, p > 0, **lot_kw)
+    return volume, margin, profit, taken
+
+def _symbol_curves(df: pd.DataFrame, trades: pd.DataFrame, cs: float,
+                   base: bool = False) -> pd.DataFrame:
+    """
+    Unrealized P/L and margin of one symbol's open positions on its own
+    bars; `base`: P/L is converted at the bar's close (see base_priced).
+    """
+    n      = len(df)
+    ein    = df.index.get_indexer(trades["entry_time"])
+    eout   = df.index.get_indexer(trades["exit_time"])
+    units  = (trades["side"] * trades["volume"] * cs).to_numpy()
+    cost   = units * trades["entry_price"].to_numpy()
+    margin = trades["margin"].to_numpy()
+
+    # each position is open on bars [entry, exit): +x at entry, -x at exit
+    def running(x):
+        d = np.zeros(n + 1)
+        np.add.at(d, ein, x)
+        np.add.at(d, eout, -x)
+        return np.cumsum(d[:n])
+
+    close      = df["close"].to_numpy(dtype=np.float64)
+    unrealized = running(units) * close - running(cost)
+    if base:
+        unrealized /= close
+    return pd.DataFrame({
+        "unrealized": unrealized,
+        "margin":     running(margin),
+    }, index=df.index)
+
+def simulate_portfolio(trades: pd.DataFrame,
+                       bars: dict,
+                       specs: dict | None = None,
+                       initial_balance: float = 10_000.0,
+                       leverage: float = 100.0,
+                       start_lot: float = LOT_BASE,
+                       lot_adjust_percent: float = LOT_ADJUST_PERCENT,
+                       lot_min: float = LOT_MIN,
+                       lot_max: float = LOT_MAX,
+                       account_currency: str = "USD"):
+    """
+    Size and account `trades` (columns symbol, side, entry_time, exit_time,
+    entry_price, exit_price) on one balance in `account_currency`.  `bars`
+    maps symbol → the bars the trades came from (for mark-to-market).
+    Every symbol must be based or quoted in the account currency
+    (ValueError otherwise).  Returns (trades, curve,
+    stats): trades gains volume / margin / profit / taken, curve has
+    balance, equity, margin, free_margin and drawdown per bar of the merged
+    timeline.
+    """
+    specs  = {s: (specs or {}).get(s) or default_spec(s) for s in trades["symbol"].unique()}
+    based  = {s: base_priced(s, sp, account_currency) for s, sp in specs.items()}
+    lot_kw = {"percent": lot_adjust_percent, "lot_min": lot_min, "lot_max": lot_max}
+    trades = trades.sort_values(["entry_time", "exit_time"], kind="stable").reset_index(drop=True)
+    volume, margin, profit, taken = _size_trades(trades, specs, initial_balance,
+                                                 leverage, start_lot, lot_kw, based)
+    trades = trades.assign(volume=volume, margin=margin, profit=profit, taken=taken)
+
+    # merged bar timeline; realized P/L lands on the exit bar
+    index  = bars[next(iter(bars))].index
+    for df in bars.values():
+        index = index.union(df.index)
+    live   = trades[trades["taken"]]
+    parts  = [_symbol_curves(bars[s], g, specs[s].contract_size, based[s])
+                  .reindex(index, method="ffill").fillna(0.0)
+              for s, g in live.groupby("symbol")]
+    unreal = sum((p["unrealized"] for p in parts), pd.Series(0.0, index=index))
+    used   = sum((p["margin"] for p in parts), pd.Series(0.0, index=index))
+    realized = (live.groupby("exit_time")["profit"].sum()
+                    .reindex(index, fill_value=0.0).cumsum())
+
+    balance = initial_balance + realized
+    equity  = balance + unreal
+    peak    = equity.cummax()
+    curve   = pd.DataFrame({
+        "balance":     balance,
+        "equity":      equity,
+        "margin":      used,
+        "free_margin": equity - used,
+        "drawdown":    peak - equity,
+        "drawdown_pct": (peak - equity) / peak * 100,
+    })
+
+    stats = {
+        "trades":           int(taken.sum()),
+        "skipped":          int((~taken).sum()),
+        "final_balance":    float(balance.iloc[-1]) if len(balance) else initial_balance,
+        "return_pct":       float((balance.iloc[-1] / initial_balance - 1) * 100) if len(balance) else 0.0,
+        "max_drawdown":     float(curve["drawdown"].max()) if len(curve) else 0.0,
+        "max_drawdown_pct": float(curve["drawdown_pct"].max()) if len(curve) else 0.0,
+        "max_margin":       float(used.max()) if len(used) else 0.0,
+        "min_free_margin":  float(curve["free_margin"].min()) if len(curve) else initial_balance,
+        "win_rate":         float((profit[taken] > 0).mean() * 100) if taken.any() else 0.0,
+    }
+    return trades, curve, stats
+
+__all__ = ["STABLECOINS", "base_priced", "simulate_portfolio"]
@@ -0,0 +1,165 @@
+# app/profiler.py
+"""
+Stage-level profiling for the training scripts.
+
+    prof = StageProfiler("train_models")
+    with prof.stage("fetch"):
+        ...
+    with prof.stage("fit", model="XGB"):
+        ...
+    prof.write()            # PROFILE_DIR/<run>_<time>.json + history.jsonl
+    print(prof.summary())   # compact text for the Telegram channel
+
+Each stage records wall time, CPU time (this process plus any child
+processes reaped during it) and peak RSS, sampled on a background thread
+while the stage runs.  Work done in other processes can be added with
+add() from the numbers they report themselves.  history.jsonl gets one
+line per run, so retrain cost can be followed over time.
+"""
+import os
+import sys
+import json
+import time
+import socket
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+PROFILE_DIR     = Path.home() / ".nekoai" / "profiles"
+SAMPLE_INTERVAL = 0.05               # seconds between RSS samples
+SUMMARY_MARKER  = "⏱️ Profile"       # first line of summary(), for the scheduler
+
+def rss_mb() -> float | None:
+    """Current resident set size of this process in MB."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # no current RSS outside Linux: fall back to the lifetime peak
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+def _cpu_seconds() -> float:
+    """CPU time of this process and its reaped children."""
+    t = time.process_time()
+    try:
+        import resource
+    except ImportError:
+        return t
+    ch = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return t + ch.ru_utime + ch.ru_stime
+
+class _PeakSampler:
+    def __init__(self):
+        self.peak  = rss_mb()
+        self._stop = threading.Event()
+        self._th   = threading.Thread(target=self._run, daemon=True, name="rss-sampler")
+        self._th.start()
+
+    def _run(self):
+        while not self._stop.wait(SAMPLE_INTERVAL):
+            r = rss_mb()
+            if r is not None and (self.peak is None or r > self.peak):
+                self.peak = r
+
+    def stop(self) -> float | None:
+        self._stop.set()
+        self._th.join()
+        r = rss_mb()
+        return max(p for p in (self.peak, r) if p is not None) if (self.peak or r) else None
+
+class StageProfiler:
+    """Wall / CPU / peak-RSS records per stage (and model) of one run."""
+    def __init__(self, run: str, meta: dict | None = None):
+        self.run     = run
+        self.meta    = meta or {}
+        self.records = []
+        self.started = time.time()
+        self._t0     = time.perf_counter()
+        self._c0     = _cpu_seconds()
+
+    @contextmanager
+    def stage(self, name: str, model: str | None = None, **info):
+        sampler = _PeakSampler()
+        t0, c0  = time.perf_counter(), _cpu_seconds()
+        ok      = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.add(name, model,
+                     seconds     = time.perf_counter() - t0,
+                     cpu_seconds = _cpu_seconds() - c0,
+                     peak_rss_mb = sampler.stop(),
+                     ok          = ok,
+                     **info)
+
+    def add(self, name: str, model: str | None = None, **measures):
+        """Record a stage measured elsewhere (e.g. in a worker process)."""
+        self.records.append({"stage": name, "model": model, **measures})
+
+    # ── reporting ─────────────────────────────────────────────────────────────
+
+    def totals(self) -> list:
+        """Records summed per (stage, model), in first-seen order; peaks are maxed."""
+        out = {}
+        for r in self.records:
+            key = (r["stage"], r["model"])
+            t   = out.setdefault(key, {"stage": r["stage"], "model": r["model"], "calls": 0,
+                                       "seconds": 0.0, "cpu_seconds": 0.0, "peak_rss_mb": None})
+            t["calls"]       += 1
+            t["seconds"]     += r.get("seconds") or 0.0
+            t["cpu_seconds"] += r.get("cpu_seconds") or 0.0
+            if r.get("peak_rss_mb") is not None:
+                t["peak_rss_mb"] = max(t["peak_rss_mb"] or 0.0, r["peak_rss_mb"])
+        return list(out.values())
+
+    def report(self) -> dict:
+        peaks = [r["peak_rss_mb"] for r in self.records if r.get("peak_rss_mb") is not None]
+        return {
+            "run":         self.run,
+            "started":     time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "host":        socket.gethostname(),
+            "pid":         os.getpid(),
+            "cpus":        os.cpu_count(),
+            "seconds":     time.perf_counter() - self._t0,
+            "cpu_seconds": _cpu_seconds() - self._c0,
+            "peak_rss_mb": max(peaks) if peaks else rss_mb(),
+            "meta":        self.meta,
+            "totals":      self.totals(),
+            "records":     self.records,
+        }
+
+    def write(self, directory: Path = PROFILE_DIR) -> Path:
+        """Full report to <run>_<time>.json; one summary line to history.jsonl."""
+        rep       = self.report()
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{self.run}_{time.strftime('%Y%m%d_%H%M%S', time.localtime(self.started))}.json"
+        path.write_text(json.dumps(rep, indent=2, default=str))
+        line = {k: rep[k] for k in ("run", "started", "seconds", "cpu_seconds", "peak_rss_mb")}
+        line["stages"] = {f"{t['stage']}:{t['model']}" if t["model"] else t["stage"]: round(t["seconds"], 3)
+                          for t in rep["totals"]}
+        with open(directory / "history.jsonl", "a") as f:
+            f.write(json.dumps(line, default=str) + "\n")
+        return path
+
+    def summary(self, top: int = 8) -> str:
+        """A few lines for the channel: totals, then the slowest stages."""
+        rep   = self.report()
+        peak  = rep["peak_rss_mb"]
+        lines = [f"{SUMMARY_MARKER} {self.run}: {rep['seconds']:.0f}s wall · "
+                 f"{rep['cpu_seconds']:.0f}s CPU · peak {peak or 0:.0f} MB"]
+        for t in sorted(rep["totals"], key=lambda t: -t["seconds"])[:top]:
+            label = f"{t['stage']} {t['model']}" if t["model"] else t["stage"]
+            share = t["seconds"] / rep["seconds"] * 100 if rep["seconds"] else 0.0
+            lines.append(f"  {label:<18} {t['seconds']:7.1f}s {share:4.0f}%  "
+                         f"cpu {t['cpu_seconds']:6.1f}s  rss {t['peak_rss_mb'] or 0:6.0f} MB")
+        return "\n".join(lines)
+
+__all__ = ["PROFILE_DIR", "SUMMARY_MARKER", "StageProfiler", "rss_mb"]
@@ -5,6 +5,14 @@ from config import LOT_BASE, LOT_MIN, LOT_MAX, LOT_ADJUST_PERCENT
 
 STATE_FILE = Path(__file__).parent / "risk_state.json"
 
+def adjust_lot(lot: float, win: bool,
+               percent: float = LOT_ADJUST_PERCENT,
+               lot_min: float = LOT_MIN,
+               lot_max: float = LOT_MAX) -> float:
+    """Next lot after a trade: +percent on a win, -percent on a loss, clamped."""
+    new = lot * (1 + percent/100) if win else lot * (1 - percent/100)
+    return max(lot_min, min(lot_max, new))
+
 class RiskManager:
     def __init__(self):
         self.file = STATE_FILE
@@ -32,9 +40,7 @@ class RiskManager:
         return self.current_lot
 
     def adjust(self, win: bool)->float:
-        new = (self.current_lot * (1 + LOT_ADJUST_PERCENT/100)) if win \
-              else (self.current_lot * (1 - LOT_ADJUST_PERCENT/100))
-        self.current_lot = max(LOT_MIN, min(LOT_MAX, new))
+        self.current_lot = adjust_lot(self.current_lot, win)
         self._save_state()
         print(f"ℹ️ Adjusted lot {self.current_lot:.4f}")
         return self.current_lot
@@ -1,12 +1,21 @@
 # app/scheduler.py
+import sys
 import schedule 
 import time 
 import random
+import shutil
+import threading
 import subprocess
-from config import TESTING_MODE, TRADING_INTERVAL_MINUTES
+from config import (TESTING_MODE, TRADING_INTERVAL_MINUTES, INFERENCE_ADDRESS, INFERENCE_MODEL,
+                    RETRAIN_MODE, RETRAIN_NICE)
 from app.trading            import trading_job
 from app.telegram_bot       import send_message, send_message_channel
 from app.state              import get_bot_status, reset_daily_trades, daily_summary
+from app.inference_client   import InferenceClient, InferenceError
+from app                    import model_registry
+from app.profiler           import SUMMARY_MARKER
+
+_retrain_thread = None
 
 def heartbeat_job():
     up, total_trades, top_syms, wins, losses = get_bot_status()
@@ -24,34 +33,71 @@ def heartbeat_job():
 def daily_summary_job():
     send_message_channel(daily_summary())
 
-def retrain_backtest_job():
+def _run_low_priority(args: list) -> str:
+    """check_output for a training/backtest subprocess, niced below the trading loop."""
+    cmd = [sys.executable, *args]
+    # nice(1) rather than preexec_fn, which is unsafe with the retrain thread running
+    if RETRAIN_NICE and shutil.which("nice"):
+        cmd = ["nice", "-n", str(RETRAIN_NICE), *cmd]
+    return subprocess.check_output(cmd, stderr=subprocess.STDOUT, text=True)
+
+def _reload_inference():
+    if not INFERENCE_ADDRESS:
+        return
+    client = InferenceClient()
+    try:
+        client.reload(INFERENCE_MODEL)
+    except InferenceError as e:
+        print(f"⚠️ Inference reload failed: {e}")
+    finally:
+        client.close()
+
+def retrain_and_publish():
     """
-    Every 6 hours: retrain all models, run backtest, and send summary to your Telegram channel.
+    Refresh the models (incremental update on the new bars, or a full
+    retrain with RETRAIN_MODE=full), publish them as a new version, run
+    backtest, and send summary to your Telegram channel.
     """
-    send_message_channel("🔄 Starting scheduled retrain & backtest…")
+    script = "scripts/train_models.py" if RETRAIN_MODE == "full" else "scripts/update_models.py"
+    send_message_channel(f"🔄 Starting scheduled {RETRAIN_MODE} retrain & backtest…")
     # retrain
     try:
-        out = subprocess.check_output(
-            ["python", "scripts/train_models.py"],
-            stderr=subprocess.STDOUT,
-            text=True
-        )
-        send_message_channel(f"✅ Retrain complete:\n```\n{out}\n```")
+        out = _run_low_priority([script])
+        # the script ends with its stage profile; post that as its own message
+        out, marker, profile = out.partition(SUMMARY_MARKER)
+        send_message_channel(f"✅ Retrain complete:\n```\n{out.rstrip()}\n```")
+        if marker:
+            send_message_channel(f"```\n{marker}{profile.rstrip()}\n```")
     except subprocess.CalledProcessError as e:
         send_message_channel(f"❌ Retrain failed:\n```\n{e.output}\n```")
         return
 
+    # publish the new artifacts; live models switch over on their next cycle
+    version = model_registry.publish(meta={"source": script})
+    if version:
+        send_message_channel(f"📦 Published model version {version}")
+        _reload_inference()
+
     # backtest with the new best model
     try:
-        out = subprocess.check_output(
-            ["python", "scripts/run_backtest.py"],
-            stderr=subprocess.STDOUT,
-            text=True
-        )
+        out = _run_low_priority(["scripts/run_backtest.py"])
         send_message_channel(f"📈 Backtest results:\n```\n{out}\n```")
     except subprocess.CalledProcessError as e:
         send_message_channel(f"❌ Backtest failed:\n```\n{e.output}\n```")
 
+def retrain_backtest_job():
+    """
+    Every 6 hours: start retrain_and_publish on a background thread, so
+    trading cycles keep running while it trains; skipped while the
+    previous one is still going.
+    """
+    global _retrain_thread
+    if _retrain_thread is not None and _retrain_thread.is_alive():
+        print("⏭️ Retrain still running, skipping this slot")
+        return
+    _retrain_thread = threading.Thread(target=retrain_and_publish, daemon=True, name="retrain")
+    _retrain_thread.start()
+
 def run_scheduler():
     # trading job
     if TESTING_MODE:
@@ -68,9 +114,13 @@ def run_scheduler():
     schedule.every().day.at("00:00").do(reset_daily_trades)
     schedule.every().day.at("23:59").do(daily_summary_job)
 
-    # automatic retrain & backtest every 6 hours
+    # live models load the published version; start from the current artifacts
+    version = model_registry.publish(meta={"source": "startup"})
+    print(f"Scheduler: serving model version {version or model_registry.current_version()}")
+
+    # automatic retrain & backtest every 6 hours, in the background
     schedule.every(6).hours.do(retrain_backtest_job)
-    print("Scheduler: retrain & backtest every 6 hours")
+    print(f"Scheduler: {RETRAIN_MODE} retrain & backtest every 6 hours")
 
     # main loop
     while True:
@@ -0,0 +1,126 @@
+# app/sweep.py
+"""
+min_confidence / fee_per_trade sweeps without re-running the model.
+
+The per-bar model outputs (signal, confidence) are computed once per model
+and bar history and kept in a prediction cache next to the backtest cache.
+A backtest for any (threshold, fee) is then a function of those arrays
+alone: the candidate trades sorted by confidence, prefix sums of their
+gross P/L and of its square give trades / total / Sharpe for every grid
+point at once, and one cumulative count per fee gives the win rates.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.backtest_cache import (BacktestCache, CACHE_MAX_MB, prediction_key,
+                                model_fingerprint, data_fingerprint)
+
+PRED_DIR = Path.home() / ".nekoai" / "cache" / "predictions"
+
+DEFAULT_THRESHOLDS = np.round(np.arange(0.0, 1.0, 0.05), 2)
+
+def cached_predictions(symbol: str,
+                       model,
+                       df=None,
+                       cache: BacktestCache | None = None,
+                       model_fp: str | None = None,
+                       data_fp: str | None = None) -> dict:
+    """
+    {"signal", "confidence", "opens"} arrays for every bar of `df` (see
+    backtester.predict_signals), from the prediction cache when possible.
+    """
+    from app.backtester import predict_signals
+    from app.market_data import fetch_market_data
+
+    df       = fetch_market_data(symbol) if df is None else df
+    model_fp = model_fp or model_fingerprint(model)
+    key      = prediction_key(model_fp, data_fp or data_fingerprint(df)) if model_fp else None
+    cache    = cache or BacktestCache(PRED_DIR, CACHE_MAX_MB)
+
+    hit = cache.load(key) if key else None
+    if hit is not None:
+        return hit[0]
+
+    sig, conf = predict_signals(model, df)
+    pred = {
+        "signal":     np.asarray(sig, dtype=np.int8),
+        "confidence": np.asarray(conf, dtype=np.float64),
+        "opens":      df["open"].to_numpy(dtype=np.float64),
+    }
+    if key:
+        cache.store(key, pred, {"symbol": symbol, "model": type(model).__name__,
+                                "bars": len(df), "kind": "predictions"})
+    return pred
+
+def candidates(pred: dict, lookback: int, start: int = 0) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (confidence, gross P/L) of every trade backtest_vectorized could take:
+    bar t's signal entered at open[t+1], exited at open[t+2].  Only bars
+    from `start` on are traded; the ones before are history for the features.
+    """
+    sig, opens = pred["signal"], pred["opens"]
+    first = max(lookback, start)
+    t     = np.arange(first, max(first, len(opens) - 2))
+    t     = t[sig[t] != 0]
+    gross = sig[t] * (opens[t + 2] - opens[t + 1])
+    return pred["confidence"][t], gross
+
+def sweep(conf, gross, thresholds=DEFAULT_THRESHOLDS, fees=(0.0,)) -> pd.DataFrame:
+    """
+    Backtest stats for every (min_confidence, fee_per_trade) pair, indexed
+    by both: trades, total, avg, win_rate (%), sharpe (per trade, as in
+    tune_models).
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    fees       = np.asarray(fees, dtype=np.float64)
+    order      = np.argsort(-np.asarray(conf), kind="stable")
+    c, g       = np.asarray(conf)[order], np.asarray(gross, dtype=np.float64)[order]
+
+    # trades taken at threshold θ are the prefix with confidence >= θ
+    n  = np.searchsorted(-c, -thresholds, side="right")[:, None]
+    G  = np.concatenate([[0.0], np.cumsum(g)])[n]
+    S  = np.concatenate([[0.0], np.cumsum(g * g)])[n]
+    f  = fees[None, :]
+
+    total = G - n * f
+    sq    = S - 2 * f * G + n * f * f
+    with np.errstate(invalid="ignore", divide="ignore"):
+        avg  = np.where(n > 0, total / n, 0.0)
+        var  = np.where(n > 1, (sq - n * avg * avg) / (n - 1), np.nan)
+        wins = np.stack([np.concatenate([[0], np.cumsum(g > fee)])[n[:, 0]] for fee in fees], axis=1)
+        rate = np.where(n > 0, wins / n * 100, 0.0)
+    sharpe = avg / (np.sqrt(np.maximum(var, 0.0)) + 1e-8)
+
+    idx = pd.MultiIndex.from_product([thresholds, fees], names=["min_confidence", "fee_per_trade"])
+    return pd.DataFrame({
+        "trades":   np.broadcast_to(n, total.shape).ravel(),
+        "total":    total.ravel(),
+        "avg":      avg.ravel(),
+        "win_rate": rate.ravel(),
+        "sharpe":   sharpe.ravel(),
+    }, index=idx)
+
+def sweep_backtest(symbols,
+                   model,
+                   thresholds=DEFAULT_THRESHOLDS,
+                   fees=(0.0,),
+                   data: dict | None = None,
+                   cache: BacktestCache | None = None) -> pd.DataFrame:
+    """
+    sweep() over the pooled trades of `symbols` (bars from `data` or
+    fetch_market_data); the model predicts each symbol at most once.
+    """
+    model_fp = model_fingerprint(model)
+    confs, grosses = [], []
+    for s in symbols:
+        df   = None if data is None else data[s]
+        pred = cached_predictions(s, model, df, cache, model_fp=model_fp)
+        c, g = candidates(pred, model.lookback)
+        confs.append(c)
+        grosses.append(g)
+    return sweep(np.concatenate(confs), np.concatenate(grosses), thresholds, fees)
+
+__all__ = ["PRED_DIR", "DEFAULT_THRESHOLDS", "cached_predictions", "candidates",
+           "sweep", "sweep_backtest"]
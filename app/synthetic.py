@@ -0,0 +1,33 @@
+# app/synthetic.py
+
+import numpy as np
+import pandas as pd
+
+def make_ohlcv(n_bars: int = 1_000,
+               seed: int = 42,
+               start: str = "2024-01-01",
+               freq: str = "min",
+               price: float = 1.10,
+               vol: float = 0.0002) -> pd.DataFrame:
+    """
+    Offline OHLCV bars (geometric random walk) with the same columns and
+    DatetimeIndex shape as `fetch_market_data`, for benchmarks and checks
+    that must not touch any data provider.
+    """
+    rng    = np.random.default_rng(seed)
+    rets   = rng.normal(0.0, vol, n_bars)
+    close  = price * np.exp(np.cumsum(rets))
+    open_  = np.concatenate([[price], close[:-1]])
+    wick   = np.abs(rng.normal(0.0, vol / 2, (2, n_bars))) * close
+    high   = np.maximum(open_, close) + wick[0]
+    low    = np.minimum(open_, close) - wick[1]
+    volume = rng.integers(1, 1_000, n_bars).astype(float)
+
+    idx = pd.date_range(start=start, periods=n_bars, freq=freq)
+    return pd.DataFrame({
+        "open":   open_,
+        "high":   high,
+        "low":    low,
+        "close":  close,
+        "volume": volume,
+    }, index=idx)
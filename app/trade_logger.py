@@ -1,9 +1,13 @@
 # app/trade_logger.py
 
+import os
 import csv
 from pathlib import Path
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
+
 # will live next to this file
 LOG_FILE = Path(__file__).parent / "trades.csv"
 HEADERS = [
@@ -47,3 +51,77 @@ def log_trade(
             profit,
             int(win),
         ])
+
+# ── Backtest results ─────────────────────────────────────────────────────────
+
+# simulated trades go here, one file per run — never into LOG_FILE
+RESULTS_DIR  = Path(__file__).parent / "backtests"
+KEEP_RESULTS = 20    # newest results files kept per tag in RESULTS_DIR
+
+def _column(value, dtype, n: int) -> np.ndarray:
+    # scalars are repeated for every trade of the chunk
+    return np.broadcast_to(np.asarray(value, dtype=dtype), (n,))
+
+class TradeBuffer:
+    """
+    Columnar, in-memory log of simulated trades.  Each append stores whole
+    column arrays (one backtest's trades at a time); `write` concatenates
+    them and writes the run's results file in one go.
+    """
+    def __init__(self):
+        self._chunks = []
+
+    def append(self, symbol: str, signal, volume, entry_price, exit_price, profit,
+               timestamp=None):
+        """Add one or many trades; array arguments must share a length."""
+        profit = np.atleast_1d(np.asarray(profit, dtype=np.float64))
+        n      = len(profit)
+        self.extend({
+            "timestamp":   _column("NaT" if timestamp is None else timestamp, "datetime64[ns]", n),
+            "symbol":      _column(symbol, object, n),
+            "signal":      _column(signal, object, n),
+            "volume":      _column(volume, np.float64, n),
+            "entry_price": _column(entry_price, np.float64, n),
+            "exit_price":  _column(exit_price, np.float64, n),
+            "profit":      profit,
+        })
+
+    def extend(self, columns: dict):
+        """Add trades given as {column: array} (e.g. another buffer's columns())."""
+        if len(columns["profit"]):
+            self._chunks.append({k: columns[k] for k in HEADERS if k != "win"})
+
+    def __len__(self) -> int:
+        return sum(len(c["profit"]) for c in self._chunks)
+
+    def columns(self) -> dict:
+        cols = {k: np.concatenate([c[k] for c in self._chunks]) if self._chunks
+                   else np.empty(0, dtype=np.float64)
+                for k in HEADERS if k != "win"}
+        cols["win"] = (cols["profit"] > 0).astype(np.int8)
+        return cols
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns(), columns=HEADERS)
+
+    def write(self, path: Path | None = None) -> Path:
+        """Write every buffered trade to `path` (default: a new file in RESULTS_DIR)."""
+        return write_results(self.to_frame(), path)
+
+def write_results(trades: pd.DataFrame, path: Path | None = None, tag: str = "backtest",
+                  keep: int = KEEP_RESULTS) -> Path:
+    """
+    One bulk CSV write of a run's simulated trades.  Without a `path` the
+    file goes to RESULTS_DIR, which keeps only the newest `keep` per tag.
+    """
+    if path is None:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        stamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+        path  = RESULTS_DIR / f"{tag}_{stamp}_{os.getpid()}.csv"
+        trades.to_csv(path, index=False)
+        old = sorted(RESULTS_DIR.glob(f"{tag}_*.csv"), key=lambda p: p.stat().st_mtime)
+        for p in old[:-keep] if keep > 0 else []:
+            p.unlink(missing_ok=True)
+        return Path(path)
+    trades.to_csv(path, index=False)
+    return Path(path)
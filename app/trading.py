@@ -5,31 +5,81 @@ import time
 import os
 from datetime import datetime
 
-from config import get_today_symbols, SL_AMOUNT, TP_AMOUNT, USE_MOCK_MT5
+from config import get_today_symbols, SL_AMOUNT, TP_AMOUNT, USE_MOCK_MT5, \
+                   INFERENCE_ADDRESS, INFERENCE_MODEL
 from app.market_data import fetch_market_data
 from app.mt5_handler import initialize_mt5, shutdown_mt5, open_trade, close_trade
-from app.models.ai_model import MomentumModel as BasicModel
 from app.news import get_news_sentiment
 from app.telegram_bot import send_message, send_message_channel
 from app.state import increment_trade_count
 from app.risk_manager import RiskManager
 from app.id_manager import IDManager
+from app.inference_client import InferenceClient, InferenceError, call_predict
+from app.model_registry import LiveModel
 
 MOCK_TRADE_HOLD_SECONDS = int(os.getenv("MOCK_TRADE_HOLD_SECONDS", 120))
 PRE_SIGNAL_WAIT        = 30  # seconds
 
+HOLD = {"signal": "HOLD", "confidence": 0.0, "predicted_change": 0.0}
+
+# in-process model; reloaded only when a retrain publishes a new version
+_LIVE_MODEL = LiveModel("app.models.ai_model", "MomentumModel")
+
+class _RemoteModel:
+    """Routes .predict() to the inference server; HOLD if it is unavailable."""
+    def __init__(self, client: InferenceClient, name: str):
+        self.client = client
+        self.name   = name
+
+    def predict(self, df, news, symbol=None):
+        try:
+            return self.client.predict(self.name, df, news, symbol=symbol)
+        except InferenceError as e:
+            print(f"⚠️ Inference unavailable, holding: {e}")
+            return dict(HOLD)
+
+    def predict_batch(self, items: list) -> list:
+        """predict() for many (df, news, symbol) in one round trip; one by one if that fails."""
+        try:
+            return self.client.predict_batch(self.name, items)
+        except InferenceError as e:
+            print(f"⚠️ Batch inference failed, predicting per symbol: {e}")
+            return [self.predict(*item) for item in items]
+
+def _predict_all(model, items: list) -> list:
+    """One prediction per (df, news, symbol): a single request to the inference server."""
+    if isinstance(model, _RemoteModel):
+        return model.predict_batch(items)
+    return [call_predict(model, *item) for item in items]
+
+def _get_model():
+    """
+    Use the out-of-process inference server when INFERENCE_ADDRESS is set;
+    otherwise the in-process model of the published version (imported
+    lazily, so the scheduler itself starts without XGBoost).  Called once
+    per cycle, so a new version is picked up between cycles.
+    """
+    if INFERENCE_ADDRESS:
+        return _RemoteModel(InferenceClient(), INFERENCE_MODEL)
+    return _LIVE_MODEL.get()
+
 def trading_job():
     """Main trading execution: pre-signal, AI signal, execute trades."""
     symbols = get_today_symbols()
     print(f"[{datetime.utcnow()}] Trading cycle: {symbols}")
 
     mt5   = initialize_mt5()
-    model = BasicModel()
+    model = _get_model()
     rm    = RiskManager()
     idm   = IDManager()
 
-    for sym in symbols:
-        # 1) Pre-signal alert
+    # 1) Fetch data & live news sentiment, then AI predict (pass in news)
+    #    for the whole cycle in one go
+    items = [(fetch_market_data(sym), get_news_sentiment(sym), sym) for sym in symbols]
+    preds = _predict_all(model, items)
+
+    for (df, ns, sym), out in zip(items, preds):
+        # 2) Pre-signal alert
         pre = (
             "⚠️ Risk Alert:\n"
             "Market conditions indicate heightened risk.\n"
@@ -40,12 +90,7 @@ def trading_job():
         send_message_channel(pre)
         time.sleep(PRE_SIGNAL_WAIT)
 
-        # 2) Fetch data & live news sentiment
-        df  = fetch_market_data(sym)
-        ns  = get_news_sentiment(sym)
-
-        # 3) AI predict (pass in news)
-        out  = model.predict(df, ns)
+        # 3) Signal
         sig  = out.get("signal", "HOLD").upper()
         conf = out.get("confidence", 0.0)
         pc   = out.get("predicted_change", 0.0)
@@ -126,4 +171,11 @@ def trading_job():
         rm.adjust(win)
         print(f"🏁 {sym} {'WIN' if win else 'LOSS'} ({profit:.5f})")
 
+    if isinstance(model, _RemoteModel):
+        lat = model.client.latency_summary()
+        if lat["count"]:
+            print(f"🧠 Inference: {lat['count']} calls, p50={lat['p50_ms']:.1f}ms "
+                  f"p95={lat['p95_ms']:.1f}ms errors={lat['errors']}")
+        model.client.close()
+
     shutdown_mt5(mt5)
@@ -1,73 +1,190 @@
 # app/trainer.py
 
-import time, shutil, joblib
+import os, sys, time, shutil, joblib, importlib
+import multiprocessing as mp
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 from pathlib import Path
 
 from config            import FOREX_MAJORS, CRYPTO_ASSETS
 from app.market_data   import fetch_market_data
 from app.news          import get_news_sentiment
-from app.backtester    import backtest_symbol
-from app.models.rf_model   import RFModel
-from app.models.xgb_model  import MomentumModel as XGBModel
-from app.models.lstm_model import LSTMModel
-from app.models.cnn_model  import CNNModel
+from app.backtest_runner import MODEL_SPECS, run_backtests
+from app.models.artifacts import ArtifactError, save_bundle
+from app.profiler      import StageProfiler
 
 SYMBOLS = FOREX_MAJORS + CRYPTO_ASSETS
 MODEL_DIR = Path(__file__).parent / "models"
+# name → "module:Class"; each is trained in its own process
+CANDIDATES = {n: MODEL_SPECS[n] for n in ("RF", "XGB", "LSTM", "CNN")}
 
-def build_dataset():
+def build_dataset(prof: StageProfiler | None = None):
+    prof = prof or StageProfiler("build_dataset")
     dfs, news = [], []
     for sym in SYMBOLS:
-        df = fetch_market_data(sym)
-        try: s = get_news_sentiment(sym)
-        except: s = 0.0
+        with prof.stage("fetch", symbol=sym):
+            df = fetch_market_data(sym)
+        with prof.stage("news", symbol=sym):
+            try: s = get_news_sentiment(sym)
+            except: s = 0.0
         dfs.append(df.assign(symbol=sym))
         news.append(pd.Series(s, index=df.index))
-        time.sleep(1)
+        with prof.stage("throttle"):
+            time.sleep(1)
     big_df   = pd.concat(dfs)
     big_news = pd.concat(news).sort_index()
     return big_df, big_news
 
-def train_all_and_select_best() -> tuple[str, object]:
+def _max_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+def thread_budgets(names, cpus: int | None = None) -> dict:
+    """Split `cpus` (default all) over the candidates, at least one thread each."""
+    names = list(names)
+    cpus  = cpus or os.cpu_count() or 1
+    base, extra = divmod(cpus, len(names))
+    return {n: max(1, base + (i < extra)) for i, n in enumerate(names)}
+
+@contextmanager
+def _thread_env(threads: int):
     """
-    Trains RF, XGB, LSTM, CNN; backtests each; returns (best_name, best_model_instance).
-    Also persists each and a copy as best_model.*
+    os.environ capping OpenMP / BLAS / TensorFlow / joblib at `threads`,
+    for the processes spawned inside the block.  They read it when numpy
+    or TF first load — before any code of ours runs in the child — so it
+    has to be in place when the process starts.  joblib's CPU count
+    (LOKY_MAX_CPU_COUNT) is what n_jobs=-1 resolves to, so the models'
+    own n_jobs stay as they are — and are saved as they are.
+    """
+    caps  = {var: str(threads) for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+                                          "MKL_NUM_THREADS", "TF_NUM_INTRAOP_THREADS",
+                                          "LOKY_MAX_CPU_COUNT")}
+    caps["TF_NUM_INTEROP_THREADS"] = "1"
+    saved = {var: os.environ.get(var) for var in caps}
+    os.environ.update(caps)
+    try:
+        yield
+    finally:
+        for var, value in saved.items():
+            if value is None:
+                os.environ.pop(var, None)
+            else:
+                os.environ[var] = value
+
+def _train_candidate(name: str, spec: str, df, news, bars: dict, threads: int) -> dict:
     """
-    df, news = build_dataset()
-
-    # train
-    models = {
-        "RF":   RFModel(),
-        "XGB":  XGBModel(),
-        "LSTM": LSTMModel(),
-        "CNN":  CNNModel(),
+    One candidate, in its own process: fit on the full dataset, save it,
+    backtest it on every symbol.  Returns its P/L, timing and resource use.
+    """
+    t0, c0 = time.perf_counter(), time.process_time()
+    module, cls = spec.split(":")
+    m = getattr(importlib.import_module(module), cls)()
+    m.fit(df, news)
+
+    # save each under app/models/<name.lower()>_best.*
+    MODEL_DIR.mkdir(exist_ok=True)
+    if hasattr(m, "pipeline"):
+        joblib.dump(m.pipeline, MODEL_DIR / f"{name.lower()}_best.joblib")
+    else:
+        m.model.save(MODEL_DIR / f"{name.lower()}_best.keras")
+    fit_s, fit_cpu = time.perf_counter() - t0, time.process_time() - c0
+
+    # fit() saved the model to its default file, which the backtest reloads
+    summary, _, _ = run_backtests({name: spec}, list(bars), fee_per_trade=0.0,
+                                  min_confidence=0.6, data=bars, max_workers=1)
+    try:
+        save_bundle(m,
+                    training={"start": str(df.index.min()), "end": str(df.index.max()),
+                              "rows": len(df), "symbols": list(bars)},
+                    metrics={"backtest": summary.loc[name].to_dict(), "fit_s": fit_s,
+                             "min_confidence": 0.6})
+    except ArtifactError as e:
+        print(f"⚠️ No bundle for {name}: {e}")
+    return {
+        "model":       name,
+        "total":       float(summary.loc[name, "total"]),
+        "trades":      int(summary.loc[name, "n"]),
+        "threads":     threads,
+        "fit_s":       fit_s,
+        "fit_cpu_s":   fit_cpu,
+        "backtest_s":  time.perf_counter() - t0 - fit_s,
+        "seconds":     time.perf_counter() - t0,
+        "cpu_seconds": time.process_time() - c0,
+        "max_rss_mb":  _max_rss_mb(),
+        "pid":         os.getpid(),
     }
-    for name, m in models.items():
-        m.fit(df, news)
-        # save each under app/models/<name.lower()>_best.*
-        ext = "joblib" if hasattr(m, "pipeline") else "keras"
-        path = MODEL_DIR / f"{name.lower()}_best.{ext}"
-        MODEL_DIR.mkdir(exist_ok=True)
-        if hasattr(m, "pipeline"):
-            joblib.dump(m.pipeline, path)
-        else:
-            m.model.save(path)
-
-    # evaluate
-    results = {}
-    for name, m in models.items():
-        all_pl = []
-        for s in SYMBOLS:
-            all_pl += list(backtest_symbol(s, m, fee_per_trade=0.0, min_confidence=0.6))
-        results[name] = sum(all_pl)
-
-    best_name = max(results, key=results.get)
-    best_model = models[best_name]
+
+def train_candidates(df, news, names=None, cpus: int | None = None,
+                     prof: StageProfiler | None = None) -> pd.DataFrame:
+    """
+    Train and backtest the CANDIDATES in `names` concurrently, one spawned
+    process each with its share of `cpus` threads (see thread_budgets).
+    Returns one row per candidate with its P/L, timing and peak RSS; the
+    workers' fit / backtest timings are also added to `prof`, if given.
+    """
+    names   = list(names or CANDIDATES)
+    budgets = thread_budgets(names, cpus)
+    bars    = {s: g.drop(columns="symbol") for s, g in df.groupby("symbol", sort=False)}
+    # spawn: TensorFlow and OpenMP thread pools don't survive fork
+    ctx     = mp.get_context("spawn")
+    rows, pools, futures = [], [], {}
+    try:
+        # one single-worker pool per candidate: submit() starts its process,
+        # which inherits the candidate's thread caps from os.environ
+        for n in names:
+            with _thread_env(budgets[n]):
+                pools.append(ProcessPoolExecutor(max_workers=1, mp_context=ctx))
+                futures[pools[-1].submit(_train_candidate, n, CANDIDATES[n], df, news,
+                                         bars, budgets[n])] = n
+        for fut in as_completed(futures):
+            r = fut.result()
+            rows.append(r)
+            print(f"⏱️ {r['model']:<5} fit {r['fit_s']:7.1f}s  backtest {r['backtest_s']:6.1f}s  "
+                  f"cpu {r['cpu_seconds']:7.1f}s  threads {r['threads']}  "
+                  f"rss {r['max_rss_mb'] or 0:7.1f} MB  P/L {r['total']:+.5f}")
+            if prof is not None:
+                # measured in the worker; its peak RSS covers both stages
+                prof.add("fit", r["model"], seconds=r["fit_s"], cpu_seconds=r["fit_cpu_s"],
+                         peak_rss_mb=r["max_rss_mb"], threads=r["threads"], pid=r["pid"])
+                prof.add("backtest", r["model"], seconds=r["backtest_s"],
+                         cpu_seconds=r["cpu_seconds"] - r["fit_cpu_s"],
+                         peak_rss_mb=r["max_rss_mb"], threads=r["threads"], pid=r["pid"])
+    finally:
+        for pool in pools:
+            pool.shutdown(cancel_futures=True)
+    return pd.DataFrame(rows).set_index("model").loc[names]
+
+def train_all_and_select_best() -> tuple[str, object]:
+    """
+    Trains RF, XGB, LSTM, CNN in parallel; backtests each; returns
+    (best_name, best_model_instance).  Also persists each and a copy as
+    best_model.*
+    """
+    prof     = StageProfiler("select_best")
+    df, news = build_dataset(prof)
+
+    t0     = time.perf_counter()
+    with prof.stage("candidates"):
+        report = train_candidates(df, news, prof=prof)
+    print(f"🏁 Trained {len(report)} candidates in {time.perf_counter() - t0:.1f}s "
+          f"(slowest alone {report['seconds'].max():.1f}s)")
+    results = report["total"].to_dict()
+
+    best_name  = max(results, key=results.get)
+    module, cls = CANDIDATES[best_name].split(":")
+    best_model = getattr(importlib.import_module(module), cls)()
 
     # copy to best_model.*
     src = MODEL_DIR / f"{best_name.lower()}_best.{ 'joblib' if best_name in ('RF','XGB') else 'keras'}"
     dst = MODEL_DIR / f"best_model.{src.suffix.lstrip('.')}"
     shutil.copy(src, dst)
 
+    prof.write()
+    print(prof.summary())
     return best_name, best_model
@@ -0,0 +1,170 @@
+# app/tuning.py
+"""
+Optuna helpers shared by the tuning scripts: pruners, intermediate
+reports and warm starts from earlier searches.
+
+A trial reports its Keras epochs on steps [0, EPOCH_STEPS) and then one
+partial backtest score per validation symbol on EPOCH_STEPS + i, so the
+pruner only ever compares trials at the same stage of the same kind of
+evaluation.
+
+Every completed trial is appended to a JSONL history (TrialRecorder) with
+the fingerprint of the dataset it was scored on.  warm_start() gives a new
+study the most recent of those trials as finished "prior" trials, so TPE
+starts from a fitted model of the space, and enqueues the best configs
+scored on other data to be re-evaluated first.  Priors scored on other
+data never count as results or towards a trial budget (see best_trial,
+n_priors); priors from the same data do both.
+"""
+import json
+import time
+from pathlib import Path
+
+import optuna
+
+PRUNERS      = ("median", "percentile", "hyperband", "halving", "none")
+EPOCH_STEPS  = 100   # first step used for per-symbol reports
+HISTORY_DIR  = Path.home() / ".nekoai" / "trials"
+WARM_TOP_K   = 5     # best earlier configs re-evaluated first
+WARM_HISTORY = 200   # most recent earlier trials handed to the sampler
+
+def make_pruner(name: str = "median", warmup_steps: int = 3, startup_trials: int = 5):
+    """
+    Pruner by name.  `warmup_steps` epochs always run; a step is only
+    pruned against at least `startup_trials` trials that reported it.
+    Warm-start priors are complete but report nothing, so they would
+    satisfy n_startup_trials alone — n_min_trials is what holds.
+    """
+    if name == "median":
+        return optuna.pruners.MedianPruner(n_startup_trials=startup_trials,
+                                           n_warmup_steps=warmup_steps,
+                                           n_min_trials=startup_trials)
+    if name == "percentile":
+        # keep the best quarter
+        return optuna.pruners.PercentilePruner(25.0, n_startup_trials=startup_trials,
+                                               n_warmup_steps=warmup_steps,
+                                               n_min_trials=startup_trials)
+    if name == "hyperband":
+        return optuna.pruners.HyperbandPruner(min_resource=max(1, warmup_steps))
+    if name == "halving":
+        return optuna.pruners.SuccessiveHalvingPruner(min_resource=max(1, warmup_steps))
+    if name == "none":
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"unknown pruner {name!r}, expected one of {PRUNERS}")
+
+def report(trial, step: int, value: float, prune: bool = True):
+    """trial.report, then stop the trial if the pruner says so."""
+    trial.report(float(value), step)
+    if prune and trial.should_prune():
+        raise optuna.TrialPruned(f"pruned at step {step} with {value:.6f}")
+
+def keras_pruning_callback(trial, monitor: str = "val_loss", sign: float = 1.0):
+    """
+    Keras callback reporting `monitor` (times `sign`, so it points the
+    study's way) after every epoch and pruning the trial mid-training.
+    """
+    from tensorflow.keras.callbacks import Callback
+
+    class _Pruning(Callback):
+        def on_epoch_end(self, epoch, logs=None):
+            value = (logs or {}).get(monitor)
+            if value is not None:
+                report(trial, min(epoch, EPOCH_STEPS - 1), sign * value)
+
+    return _Pruning()
+
+# ── Warm starts ──────────────────────────────────────────────────────────────
+
+class TrialRecorder:
+    """Study callback appending each completed, non-prior trial to `path`."""
+    def __init__(self, path, fingerprint: str):
+        self.path        = Path(path)
+        self.fingerprint = fingerprint
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def __call__(self, study, trial):
+        if trial.state != optuna.trial.TrialState.COMPLETE or trial.user_attrs.get("prior"):
+            return
+        line = json.dumps({
+            "study":         study.study_name,
+            "number":        trial.number,
+            "time":          time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "fingerprint":   self.fingerprint,
+            "direction":     study.direction.name.lower(),
+            "value":         trial.value,
+            "params":        trial.params,
+            "distributions": {k: optuna.distributions.distribution_to_json(d)
+                              for k, d in trial.distributions.items()},
+            "user_attrs":    trial.user_attrs,
+        }, default=float)
+        # one write per line, so concurrent workers don't interleave
+        with open(self.path, "a") as f:
+            f.write(line + "\n")
+
+def load_history(path) -> list:
+    """The records TrialRecorder wrote to `path`, oldest first."""
+    try:
+        lines = Path(path).read_text().splitlines()
+    except OSError:
+        return []
+    out = []
+    for line in lines:
+        try:
+            out.append(json.loads(line))
+        except ValueError:
+            continue   # a line cut short by a killed run
+    return out
+
+def warm_start(study, history: list, fingerprint: str,
+               top_k: int = WARM_TOP_K, max_trials: int = WARM_HISTORY) -> int:
+    """
+    Seed an empty `study` from `history`: its last `max_trials` records in
+    the study's direction become finished prior trials, and the `top_k`
+    best configs scored on other data are enqueued.  Returns the number of
+    priors added.
+    """
+    direction = study.direction.name.lower()
+    records   = [r for r in history if r.get("direction") == direction][-max_trials:]
+    priors    = []
+    for r in records:
+        try:
+            dists = {k: optuna.distributions.json_to_distribution(d)
+                     for k, d in r["distributions"].items()}
+            priors.append(optuna.trial.create_trial(
+                params=r["params"], distributions=dists, value=r["value"],
+                user_attrs={**r.get("user_attrs", {}), "prior": True,
+                            "fingerprint": r["fingerprint"]}))
+        except (KeyError, ValueError, TypeError):
+            continue   # a record from an older search space
+    study.add_trials(priors)
+
+    other = sorted((p for p in priors if p.user_attrs["fingerprint"] != fingerprint),
+                   key=lambda t: t.value, reverse=direction == "maximize")
+    seen  = set()
+    for t in other:
+        key = json.dumps(t.params, sort_keys=True, default=str)
+        if key in seen:
+            continue
+        seen.add(key)
+        study.enqueue_trial(t.params, skip_if_exists=True)
+        if len(seen) == top_k:
+            break
+    return len(priors)
+
+def n_priors(study, fingerprint: str) -> int:
+    """Priors scored on other data than `fingerprint`'s — the ones that are no results here."""
+    return sum(1 for t in study.get_trials(deepcopy=False)
+               if t.user_attrs.get("prior") and t.user_attrs.get("fingerprint") != fingerprint)
+
+def best_trial(study, fingerprint: str):
+    """Best completed trial scored on `fingerprint`'s data (priors from the same data count)."""
+    valid = [t for t in study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+             if not t.user_attrs.get("prior") or t.user_attrs.get("fingerprint") == fingerprint]
+    if not valid:
+        raise ValueError("no completed trials on this dataset")
+    pick = max if study.direction == optuna.study.StudyDirection.MAXIMIZE else min
+    return pick(valid, key=lambda t: t.value)
+
+__all__ = ["PRUNERS", "EPOCH_STEPS", "HISTORY_DIR", "make_pruner", "report",
+           "keras_pruning_callback", "TrialRecorder", "load_history", "warm_start",
+           "n_priors", "best_trial"]
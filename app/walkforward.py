@@ -0,0 +1,173 @@
+# app/walkforward.py
+"""
+Walk-forward evaluation: train on `window_size` bars, trade the next
+`step` bars, slide by `step`, repeat.
+
+Everything that does not depend on the fold is done once per symbol —
+news sentiment, features and targets for the whole history — and each
+fold just slices those arrays.  Folds run in a pool of spawned
+processes, which get the arrays once each at start-up.  With
+warm_start, boosted trees continue from the previous fold's booster
+(adding `warm_rounds` trees instead of refitting from scratch), which
+makes a symbol's folds one sequential chain; the chains (one per symbol,
+or `chains` per symbol) still run in parallel.  Models without a booster
+are refit cold each fold, and then every fold is its own job.
+"""
+import os
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from app.models.feature_builder import build_features
+
+# per-process state, filled by _init_worker
+_WF = {"arrays": {}, "template": None}
+
+def _init_worker(arrays: dict, template):
+    _WF["arrays"]   = arrays
+    _WF["template"] = template
+
+def prepare_arrays(df: pd.DataFrame, news: pd.Series | float = 0.0) -> dict:
+    """
+    Features, next-bar-up targets and opens for a whole bar history, aligned
+    by position (rows without features are NaN and never used).  Features
+    are causal, so any fold can slice them.
+    """
+    df2 = df.reset_index(drop=True)
+    if isinstance(news, pd.Series):
+        vals = news.to_numpy(dtype=float)[: len(df2)]
+        news = pd.Series(np.pad(vals, (0, len(df2) - len(vals))), index=df2.index)
+    feats = build_features(df2, news)
+
+    X = np.full((len(df2), feats.shape[1]), np.nan)
+    X[feats.index.values] = feats.values
+    close = df2["close"].to_numpy(dtype=np.float64)
+    return {
+        "X":     X,
+        "ok":    ~np.isnan(X).any(axis=1),
+        "y":     np.append(close[1:] > close[:-1], False).astype(np.int8),
+        "opens": df2["open"].to_numpy(dtype=np.float64),
+        "index": df.index,
+    }
+
+def fold_starts(n_bars: int, window_size: int, step: int) -> list:
+    return list(range(0, n_bars - window_size, step))
+
+def _booster(clf):
+    return clf.get_booster() if hasattr(clf, "get_booster") else None
+
+def _fit_fold(template, Xtr, ytr, prev, warm_rounds: int, n_threads: int):
+    """Fit a (scaler, clf) pair for one fold, continuing from `prev` if given."""
+    from sklearn.base import clone
+    scaler, clf = (clone(s) for _, s in template.steps)
+    if "n_jobs" in clf.get_params():
+        clf.set_params(n_jobs=n_threads)
+    if prev is None:
+        clf.fit(scaler.fit_transform(Xtr), ytr)
+        return scaler, clf
+    # keep the first fold's scaling so the old trees' splits stay meaningful
+    scaler = prev[0]
+    clf.set_params(n_estimators=warm_rounds)
+    clf.fit(scaler.transform(Xtr), ytr, xgb_model=_booster(prev[1]))
+    return scaler, clf
+
+def _run_chain(symbol: str, starts: list, window_size: int, step: int,
+               warm_start: bool, warm_rounds: int, n_threads: int) -> list:
+    a, rows, prev = _WF["arrays"][symbol], [], None
+    for start in starts:
+        t0, c0 = time.perf_counter(), time.process_time()
+        # training rows need next bar's close inside the window
+        tr      = np.arange(start, start + window_size - 1)
+        tr      = tr[a["ok"][tr]]
+        model   = _fit_fold(_WF["template"], a["X"][tr], a["y"][tr],
+                            prev if warm_start else None, warm_rounds, n_threads)
+        fit_s   = time.perf_counter() - t0
+
+        # trade bar t at open[t+1] → open[t+2], both inside the test slice
+        end     = min(start + window_size + step, len(a["opens"]))
+        te      = np.arange(start + window_size, max(start + window_size, end - 2))
+        te      = te[a["ok"][te]]
+        scaler, clf = model
+        proba   = clf.predict_proba(scaler.transform(a["X"][te])) if len(te) else np.empty((0, 2))
+        up      = proba[:, 1] > proba[:, 0]
+        pl      = np.where(up, 1.0, -1.0) * (a["opens"][te + 2] - a["opens"][te + 1])
+
+        rows.append({
+            "symbol":      symbol,
+            "train_start": a["index"][start],
+            "test_start":  a["index"][start + window_size],
+            "n_train":     len(tr),
+            "n_trades":    len(pl),
+            "mean_pl":     float(pl.mean()) if len(pl) else 0.0,
+            "total_pl":    float(pl.sum()),
+            "win_rate":    float((pl > 0).mean() * 100) if len(pl) else 0.0,
+            "accuracy":    float((up == a["y"][te].astype(bool)).mean() * 100) if len(te) else 0.0,
+            "warm":        prev is not None and warm_start,
+            "fit_s":       fit_s,
+            "seconds":     time.perf_counter() - t0,
+            "cpu_seconds": time.process_time() - c0,
+            "pid":         os.getpid(),
+        })
+        prev = model
+    return rows
+
+def run_walkforward(symbols,
+                    template,
+                    data: dict,
+                    news: dict | None = None,
+                    window_size: int = 500,
+                    step: int = 100,
+                    warm_start: bool = True,
+                    warm_rounds: int = 50,
+                    chains: int = 1,
+                    max_workers: int | None = None) -> pd.DataFrame:
+    """
+    Walk-forward every symbol in `data` ({symbol: bars}).  `template` is an
+    unfitted (or fitted — it is cloned) scaler+classifier Pipeline, e.g.
+    MomentumModel().pipeline; `news` maps symbols to sentiment series.
+    `chains` > 1 splits each symbol's warm-started folds into that many
+    independent chains for more parallelism.  Returns one row per fold with
+    its metrics and timing.
+    """
+    symbols = list(symbols)
+    news    = news or {}
+    arrays  = {s: prepare_arrays(data[s], news.get(s, 0.0)) for s in symbols}
+    # boosted models continue each fold; asks the class, the template may be unfitted
+    warm    = warm_start and hasattr(template.steps[-1][1], "get_booster")
+
+    jobs = []
+    for s in symbols:
+        starts = fold_starts(len(arrays[s]["opens"]), window_size, step)
+        if not starts:
+            continue
+        parts  = np.array_split(starts, max(1, chains)) if warm else [[x] for x in starts]
+        jobs  += [(s, [int(x) for x in p]) for p in parts if len(p)]
+
+    workers   = max_workers or min(len(jobs), os.cpu_count() or 1) or 1
+    n_threads = max(1, (os.cpu_count() or 1) // workers)
+    args      = (window_size, step, warm, warm_rounds, n_threads)
+
+    rows = []
+    if workers <= 1:
+        _init_worker(arrays, template)
+        for s, starts in jobs:
+            rows += _run_chain(s, starts, *args)
+    else:
+        # spawn: the folds fit XGBoost, whose thread pools don't survive
+        # fork; the arrays reach each worker once, through the initializer
+        ctx = mp.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx,
+                                 initializer=_init_worker, initargs=(arrays, template)) as pool:
+            futures = [pool.submit(_run_chain, s, starts, *args) for s, starts in jobs]
+            for fut in as_completed(futures):
+                rows += fut.result()
+
+    folds = pd.DataFrame(rows)
+    if folds.empty:
+        return folds
+    return folds.sort_values(["symbol", "train_start"]).reset_index(drop=True)
+
+__all__ = ["prepare_arrays", "fold_starts", "run_walkforward"]
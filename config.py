@@ -37,9 +37,25 @@ OPENAI_API_KEY       = os.getenv("OPENAI_API_KEY")
 EXHAUSTIVE_SEARCH = os.getenv("EXHAUSTIVE_SEARCH", "false").lower() == "true"
 TESTING_MODE      = os.getenv("TESTING_MODE",      "false").lower() == "true"
 
+# Out-of-process inference (unset → models run inside the scheduler)
+INFERENCE_ADDRESS = os.getenv("INFERENCE_ADDRESS")            # "/tmp/nekoai.sock" or "127.0.0.1:6001"
+# shared secret of server and client; unset → a random per-install key,
+# created on first use in INFERENCE_KEY_FILE (mode 0600)
+INFERENCE_AUTHKEY  = os.getenv("INFERENCE_AUTHKEY")
+INFERENCE_KEY_FILE = os.path.expanduser(os.getenv("INFERENCE_KEY_FILE", "~/.nekoai/inference.key"))
+INFERENCE_SOCKET   = os.path.expanduser("~/.nekoai/inference.sock")  # server default address
+INFERENCE_MODEL   = os.getenv("INFERENCE_MODEL",   "ai")
+INFERENCE_TIMEOUT = _get_float("INFERENCE_TIMEOUT", 30.0)
+
 # Trading interval
 TRADING_INTERVAL_MINUTES = int(os.getenv("TRADING_INTERVAL_MINUTES", "5"))
 
+# Scheduled model refresh: "incremental" (scripts/update_models.py) or
+# "full" (scripts/train_models.py)
+RETRAIN_MODE = os.getenv("RETRAIN_MODE", "incremental").lower()
+# niceness of the retrain/backtest subprocesses, so they yield the CPU to trading
+RETRAIN_NICE = int(os.getenv("RETRAIN_NICE", "10"))
+
 # Position-sizing
 LOT_MIN            = _get_float("LOT_MIN",            0.01)
 LOT_MAX            = _get_float("LOT_MAX",            0.20)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+# scripts/bench_imports.py
+"""
+Startup-time benchmark: import each module in a fresh interpreter, report
+its import time, and fail if it pulled in a heavy framework.  Keeps the
+scheduler / trading path free of TensorFlow, stable-baselines3, NLTK, …
+
+    python scripts/bench_imports.py [--budget 1.0] [--repeat 3]
+"""
+import sys
+import json
+import argparse
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# frameworks that must only load when a model that needs them is created
+HEAVY = [
+    "tensorflow", "keras", "torch", "stable_baselines3", "gym", "gymnasium",
+    "nltk", "feedparser", "newsapi", "xgboost", "sklearn", "yfinance",
+]
+
+MODULES = [
+    "app.scheduler",
+    "app.trading",
+    "app.news",
+    "app.models",
+    "app.models.ai_model",
+    "app.models.xgb_model",
+    "app.models.rf_model",
+    "app.models.lstm_model",
+    "app.models.cnn_model",
+    "app.models.dense_nn_model",
+    "app.models.nn_models",
+    "app.models.rl_agent",
+    "app.models.ensemble",
+]
+
+PROBE = """
+import sys, time, json
+t0 = time.perf_counter()
+import {module}
+dt = time.perf_counter() - t0
+print(json.dumps({{"seconds": dt, "heavy": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+def measure(module: str, repeat: int) -> dict:
+    best, heavy = None, []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY)],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        if out.returncode != 0:
+            return {"module": module, "error": out.stderr.strip().splitlines()[-1]}
+        res   = json.loads(out.stdout.strip().splitlines()[-1])
+        best  = res["seconds"] if best is None else min(best, res["seconds"])
+        heavy = res["heavy"]
+    return {"module": module, "seconds": best, "heavy": heavy}
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--budget", type=float, default=1.0,
+                    help="max seconds allowed for any single module import")
+    ap.add_argument("--repeat", type=int, default=3,
+                    help="runs per module; the fastest is reported")
+    ap.add_argument("--json", help="also write results to this file")
+    args = ap.parse_args()
+
+    results, failed = [], False
+    for mod in MODULES:
+        r = measure(mod, args.repeat)
+        results.append(r)
+        if "error" in r:
+            print(f"❌ {mod:<28} {r['error']}")
+            failed = True
+            continue
+        bad = r["heavy"] or r["seconds"] > args.budget
+        failed |= bool(bad)
+        extra = f"  pulled in: {', '.join(r['heavy'])}" if r["heavy"] else ""
+        print(f"{'❌' if bad else '✅'} {mod:<28} {r['seconds']*1e3:8.1f} ms{extra}")
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2))
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# scripts/bench_rl_env.py
+"""
+TradingEnv throughput on synthetic bars: raw env steps per second in this
+process, and optionally through a SubprocVecEnv of N workers.
+
+    python scripts/bench_rl_env.py [--bars 100000] [--steps 200000] [--vec 4]
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.synthetic import make_ohlcv
+from app.models.rl_env import TradingEnv, split_frame, make_env_fns
+
+def bench_single(df, steps: int, seed: int = 0) -> float:
+    env     = TradingEnv(df)
+    actions = np.random.default_rng(seed).integers(0, 3, steps)
+    env.reset()
+    t0 = time.perf_counter()
+    for a in actions:
+        _, _, done, _ = env.step(a)
+        if done:
+            env.reset()
+    return steps / (time.perf_counter() - t0)
+
+def bench_vec(df, steps: int, n_envs: int, seed: int = 0) -> float:
+    from stable_baselines3.common.vec_env import SubprocVecEnv
+    env  = SubprocVecEnv(make_env_fns(split_frame(df, n_envs)))
+    rng  = np.random.default_rng(seed)
+    env.reset()
+    rounds = max(1, steps // n_envs)
+    t0 = time.perf_counter()
+    for _ in range(rounds):
+        env.step(rng.integers(0, 3, n_envs))
+    dt = time.perf_counter() - t0
+    env.close()
+    return rounds * n_envs / dt
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--bars",  type=int, default=100_000)
+    ap.add_argument("--steps", type=int, default=200_000)
+    ap.add_argument("--vec",   type=int, default=0, help="also benchmark N subprocess envs")
+    args = ap.parse_args()
+
+    df = make_ohlcv(args.bars)
+    print(f"TradingEnv single: {bench_single(df, args.steps):12,.0f} steps/s")
+    if args.vec > 1:
+        print(f"SubprocVecEnv x{args.vec}: {bench_vec(df, args.steps, args.vec):12,.0f} steps/s")
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+# scripts/benchmark.py
+"""
+Core pipeline benchmark on synthetic bars — no data providers, no network.
+
+Times build_features, MomentumModel.featurize, each model's fit / batch
+predict / single-bar predict, backtest_symbol (loop and vectorized) and
+TradingEnv stepping, with throughput (bars/s, preds/s, steps/s) and peak
+traced memory per stage.  Results go to a JSON file; pass --baseline to
+compare against an earlier run and exit 1 on regressions.
+
+    python scripts/benchmark.py [--bars 20000] [--models ai,xgb,rf,lstm,cnn]
+                                [--repeat 3] [--out FILE] [--baseline FILE]
+
+Models are created with their MODEL_FILE pointed at a temporary directory,
+so benchmarking never reads or overwrites the trained artifacts.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import tempfile
+import importlib
+import subprocess
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.synthetic import make_ohlcv
+
+BENCH_DIR = ROOT / "benchmarks"
+
+# name → (module, class); the module's MODEL_FILE is redirected while benchmarking
+MODELS = {
+    "ai":   ("app.models.ai_model",   "MomentumModel"),
+    "xgb":  ("app.models.xgb_model",  "MomentumModel"),
+    "rf":   ("app.models.rf_model",   "RFModel"),
+    "lstm": ("app.models.lstm_model", "LSTMModel"),
+    "cnn":  ("app.models.cnn_model",  "CNNModel"),
+}
+
+# ── Measurement ──────────────────────────────────────────────────────────────
+
+def measure(stage: str, fn, items: int, unit: str, repeat: int) -> dict:
+    """
+    Run `fn` once under tracemalloc (peak memory, also the warm-up), then
+    `repeat` more times untraced; the fastest run is reported.
+    """
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best, cpu = float("inf"), 0.0
+    for _ in range(max(1, repeat)):
+        t0, c0 = time.perf_counter(), time.process_time()
+        fn()
+        dt = time.perf_counter() - t0
+        if dt < best:
+            best, cpu = dt, time.process_time() - c0
+    return {
+        "stage":       stage,
+        "items":       items,
+        "unit":        unit,
+        "seconds":     best,
+        "cpu_seconds": cpu,
+        "throughput":  items / best if best > 0 else float("inf"),
+        "peak_mb":     peak / 1024 / 1024,
+    }
+
+def max_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on Linux, bytes on macOS
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+def environment(args) -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "commit":   commit,
+        "python":   platform.python_version(),
+        "numpy":    np.__version__,
+        "pandas":   pd.__version__,
+        "platform": platform.platform(),
+        "cpus":     os.cpu_count(),
+        "bars":     args.bars,
+        "seed":     args.seed,
+        "repeat":   args.repeat,
+        "created":  time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+
+# ── Stages ───────────────────────────────────────────────────────────────────
+
+def bench_features(df, repeat: int) -> list:
+    from app.models.feature_builder import build_features
+    from app.models.ai_model import MomentumModel
+    return [
+        measure("build_features", lambda: build_features(df, 0.0), len(df), "bars/s", repeat),
+        measure("MomentumModel.featurize", lambda: MomentumModel.featurize(df, 0.0),
+                len(df), "bars/s", repeat),
+    ]
+
+def load_model(name: str, model_dir: Path):
+    """Fresh instance of MODELS[name] whose MODEL_FILE lives in `model_dir`."""
+    mod_name, cls_name = MODELS[name]
+    mod = importlib.import_module(mod_name)
+    mod.MODEL_FILE = model_dir / f"{name}_{Path(mod.MODEL_FILE).name}"
+    return getattr(mod, cls_name)()
+
+def bench_model(name: str, df, model_dir: Path, repeat: int, single: int) -> list:
+    model = load_model(name, model_dir)
+    news  = pd.Series(0.0, index=range(len(df)))
+    # fitting dominates the run time, so it is timed once after the traced run
+    out   = [measure(f"{name}.fit", lambda: model.fit(df, news), len(df), "bars/s", 1)]
+
+    if hasattr(model, "predict_batch"):
+        out.append(measure(f"{name}.predict_batch", lambda: model.predict_batch(df, 0.0),
+                           len(df), "preds/s", repeat))
+
+    # live-style calls: one prediction on a short trailing window
+    window = df.iloc[-max(100, 3 * model.lookback):]
+    def single_predictions():
+        for _ in range(single):
+            model.predict(window, 0.0)
+    out.append(measure(f"{name}.predict", single_predictions, single, "preds/s", repeat))
+    return out
+
+def bench_backtest(df, model_dir: Path, repeat: int, loop_bars: int) -> list:
+    from app.backtester import backtest_symbol
+    model = load_model("xgb", model_dir)
+    model.fit(df, pd.Series(0.0, index=range(len(df))))
+    small = df.iloc[:loop_bars]
+    return [
+        measure("backtest_symbol", lambda: backtest_symbol("SYNTH", model, df=small),
+                len(small), "bars/s", 1),
+        measure("backtest_symbol.vectorized",
+                lambda: backtest_symbol("SYNTH", model, df=df, vectorized=True),
+                len(df), "bars/s", repeat),
+    ]
+
+def bench_env(df, repeat: int, steps: int, seed: int) -> list:
+    from app.models.rl_env import TradingEnv
+    env     = TradingEnv(df)
+    actions = np.random.default_rng(seed).integers(0, 3, steps)
+
+    def run():
+        env.reset()
+        for a in actions:
+            if env.step(a)[2]:
+                env.reset()
+    return [measure("TradingEnv.step", run, steps, "steps/s", repeat)]
+
+# ── Comparison ───────────────────────────────────────────────────────────────
+
+def compare(results: list, baseline: dict, tolerance: float) -> list:
+    """Stages whose throughput dropped by more than `tolerance` vs baseline."""
+    old = {r["stage"]: r for r in baseline.get("results", [])}
+    slower = []
+    for r in results:
+        b = old.get(r["stage"])
+        if not b or b.get("items") != r["items"]:
+            continue
+        ratio = r["throughput"] / b["throughput"]
+        r["vs_baseline"] = ratio
+        if ratio < 1 - tolerance:
+            slower.append(r["stage"])
+    return slower
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Benchmark the core pipeline on synthetic bars")
+    ap.add_argument("--bars",      type=int, default=20_000)
+    ap.add_argument("--seed",      type=int, default=42)
+    ap.add_argument("--models",    default="ai,xgb,rf,lstm,cnn",
+                    help=f"comma-separated subset of {','.join(MODELS)}")
+    ap.add_argument("--repeat",    type=int, default=3, help="timed runs per stage; the fastest counts")
+    ap.add_argument("--single",    type=int, default=50, help="single-bar predict calls per run")
+    ap.add_argument("--loop-bars", type=int, default=500, help="bars for the per-bar backtest loop")
+    ap.add_argument("--steps",     type=int, default=100_000, help="TradingEnv steps per run")
+    ap.add_argument("--out",       help=f"results file (default {BENCH_DIR.name}/bench_<time>.json)")
+    ap.add_argument("--baseline",  help="earlier results file to compare with")
+    ap.add_argument("--tolerance", type=float, default=0.2,
+                    help="allowed throughput drop vs baseline before failing")
+    args = ap.parse_args()
+
+    df      = make_ohlcv(args.bars, seed=args.seed)
+    results, skipped = [], {}
+
+    with tempfile.TemporaryDirectory(prefix="nekoai-bench-") as tmp:
+        model_dir = Path(tmp)
+        stages = [("features", lambda: bench_features(df, args.repeat))]
+        for name in [m.strip() for m in args.models.split(",") if m.strip()]:
+            if name not in MODELS:
+                sys.exit(f"unknown model {name!r}, expected one of {', '.join(MODELS)}")
+            stages.append((name, lambda n=name: bench_model(n, df, model_dir, args.repeat, args.single)))
+        stages.append(("backtest", lambda: bench_backtest(df, model_dir, args.repeat, args.loop_bars)))
+        stages.append(("env",      lambda: bench_env(df, args.repeat, args.steps, args.seed)))
+
+        for group, run in stages:
+            try:
+                rows = run()
+            except ImportError as e:
+                # e.g. TensorFlow or gym not installed in this environment
+                skipped[group] = str(e)
+                print(f"⏭️  {group:<28} skipped: {e}")
+                continue
+            for r in rows:
+                results.append(r)
+                print(f"⏱️  {r['stage']:<28} {r['seconds']:9.3f} s  "
+                      f"{r['throughput']:14,.0f} {r['unit']:<8} peak {r['peak_mb']:8.1f} MB")
+
+    report = {"env": environment(args), "max_rss_mb": max_rss_mb(),
+              "results": results, "skipped": skipped}
+
+    failed = []
+    if args.baseline:
+        failed = compare(results, json.loads(Path(args.baseline).read_text()), args.tolerance)
+        for r in results:
+            if "vs_baseline" in r:
+                mark = "❌" if r["stage"] in failed else "✅"
+                print(f"{mark} {r['stage']:<28} {r['vs_baseline']:6.2f}× baseline throughput")
+        report["regressions"] = failed
+
+    out = Path(args.out) if args.out else BENCH_DIR / f"bench_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2))
+    print(f"💾 Results written to {out}")
+    sys.exit(1 if failed else 0)
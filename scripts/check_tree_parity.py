@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+# scripts/check_tree_parity.py
+"""
+Fit small RF / XGB pipelines on synthetic bars, flatten them with
+`compile_pipeline`, and check the compact evaluator reproduces
+`predict_proba` exactly — then time single-row and batch inference.
+Exits non-zero on any mismatch.
+"""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sklearn.preprocessing import StandardScaler
+from sklearn.pipeline import Pipeline
+from sklearn.ensemble import RandomForestClassifier
+from xgboost import XGBClassifier
+
+from app.synthetic import make_ohlcv
+from app.models.feature_builder import build_features
+from app.models.tree_eval import compile_pipeline
+
+TOL = 1e-6
+
+def _dataset(n_bars: int, seed: int):
+    df = make_ohlcv(n_bars, seed=seed).reset_index(drop=True)
+    df["target"] = (df["close"].shift(-1) > df["close"]).astype(int)
+    X = build_features(df, 0.0)
+    return X.values, df.loc[X.index, "target"].values
+
+def _time(fn, repeat: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+def check(name: str, pipeline, X_train, y_train, X_test) -> bool:
+    pipeline.fit(X_train, y_train)
+    compact = compile_pipeline(pipeline)
+    if compact is None:
+        print(f"❌ {name}: pipeline could not be compiled")
+        return False
+
+    ref  = pipeline.predict_proba(X_test)
+    got  = compact.predict_proba(X_test)
+    diff = float(np.abs(ref - got).max())
+    ok   = diff <= TOL
+
+    row     = X_test[[-1]]
+    t_ref_1 = _time(lambda: pipeline.predict_proba(row), 20)
+    t_new_1 = _time(lambda: compact.predict_proba(row), 200)
+    t_ref_b = _time(lambda: pipeline.predict_proba(X_test), 3)
+    t_new_b = _time(lambda: compact.predict_proba(X_test), 3)
+
+    print(f"{'✅' if ok else '❌'} {name}: trees={compact.n_trees} "
+          f"depth={compact.depth} max|Δp|={diff:.2e}")
+    print(f"   1 row:   {t_ref_1*1e6:9.1f}µs → {t_new_1*1e6:9.1f}µs")
+    print(f"   {len(X_test)} rows: {t_ref_b*1e3:9.1f}ms → {t_new_b*1e3:9.1f}ms")
+    return ok
+
+if __name__ == "__main__":
+    X_train, y_train = _dataset(5_000, seed=1)
+    X_test,  _       = _dataset(20_000, seed=2)
+
+    # NaNs exercise the missing-value branches
+    X_test = X_test.copy()
+    X_test[::97, 3] = np.nan
+
+    rf = Pipeline([
+        ("scaler", StandardScaler()),
+        ("clf", RandomForestClassifier(n_estimators=200, max_depth=5,
+                                       random_state=42, n_jobs=-1)),
+    ])
+    xgb = Pipeline([
+        ("scaler", StandardScaler()),
+        ("clf", XGBClassifier(n_estimators=300, max_depth=6, learning_rate=0.05,
+                              subsample=0.8, colsample_bytree=0.8,
+                              random_state=42, eval_metric="logloss")),
+    ])
+
+    results = [
+        check("RF",  rf,  X_train, y_train, X_test),
+        check("XGB", xgb, X_train, y_train, X_test),
+    ]
+    sys.exit(0 if all(results) else 1)
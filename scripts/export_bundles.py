@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# scripts/export_bundles.py
+"""
+Export the trained models in app/models/models as versioned bundles (see
+app/models/artifacts.py) and report how much faster they load.
+
+    python scripts/export_bundles.py [--models ai,xgb,rf,lstm,cnn]
+
+Training and incremental updates export bundles themselves; this converts
+artifacts trained before bundles existed.
+"""
+import os
+import sys
+import argparse
+import importlib
+import warnings
+from pathlib import Path
+
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
+warnings.filterwarnings("ignore", ".*use_label_encoder.*")
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.incremental import MODELS
+from app.models.artifacts import ArtifactError, bundle_path, save_bundle
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Export trained models as bundles")
+    ap.add_argument("--models", default=",".join(MODELS),
+                    help=f"comma-separated subset of {','.join(MODELS)}")
+    args = ap.parse_args()
+
+    for name in [m.strip() for m in args.models.split(",") if m.strip()]:
+        if name not in MODELS:
+            sys.exit(f"unknown model {name!r}, expected one of {', '.join(MODELS)}")
+        module, cls = MODELS[name]
+        try:
+            mod = importlib.import_module(module)
+            if not Path(mod.MODEL_FILE).exists():
+                print(f"⏭️ {name:<5} not trained")
+                continue
+            manifest = save_bundle(getattr(mod, cls)())
+        except (ImportError, ArtifactError) as e:
+            print(f"⏭️ {name:<5} skipped: {e}")
+            continue
+        bench = manifest["load_benchmark"]
+        print(f"📦 {name:<5} → {bundle_path(module)}  load {bench['bundle_s'] * 1e3:7.1f} ms "
+              f"(was {bench['legacy_s'] * 1e3:7.1f} ms, {bench['legacy_s'] / bench['bundle_s']:.1f}×)")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# scripts/train_chunked.py
+"""
+Out-of-core training of the tree models (see app/models/out_of_core.py):
+the symbols' features are written to a chunk archive one symbol at a
+time, then XGB / RF are trained by streaming the chunks into XGBoost.
+
+    python scripts/train_chunked.py [--models xgb,rf] [--chunk-rows 250000]
+                                    [--archive DIR] [--reuse] [--in-memory]
+"""
+import sys
+import time
+import argparse
+import warnings
+from pathlib import Path
+
+warnings.filterwarnings("ignore", ".*use_label_encoder.*")
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+import pandas as pd
+
+from config                  import FOREX_MAJORS, CRYPTO_ASSETS
+from app.market_data         import fetch_market_data
+from app.news                import get_news_sentiment
+from app.models.out_of_core  import CHUNK_ROWS, chunk_paths, write_chunks
+from app.models.xgb_model    import MomentumModel
+from app.models.rf_model     import RFModel
+
+SYMBOLS     = FOREX_MAJORS + CRYPTO_ASSETS
+ARCHIVE_DIR = Path.home() / ".nekoai" / "chunks"
+MODELS      = {"xgb": MomentumModel, "rf": RFModel}
+
+def symbol_frames(symbols):
+    """(bars, news series) per symbol, fetched lazily so only one is held at a time."""
+    for sym in symbols:
+        df = fetch_market_data(sym)
+        try:
+            s = get_news_sentiment(sym)
+        except Exception:
+            s = 0.0
+        yield df, pd.Series(s, index=range(len(df)), dtype=float)
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Train the tree models from an on-disk chunk archive")
+    ap.add_argument("--models",     default="xgb,rf", help=f"comma-separated subset of {','.join(MODELS)}")
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="feature rows per chunk")
+    ap.add_argument("--archive",    default=str(ARCHIVE_DIR), help="chunk archive directory")
+    ap.add_argument("--reuse",      action="store_true", help="train on the existing archive")
+    ap.add_argument("--in-memory",  action="store_true",
+                    help="keep the binned matrix in RAM instead of a disk cache")
+    args = ap.parse_args()
+
+    names = [m.strip() for m in args.models.split(",") if m.strip()]
+    for name in names:
+        if name not in MODELS:
+            sys.exit(f"unknown model {name!r}, expected one of {', '.join(MODELS)}")
+
+    archive = Path(args.archive)
+    paths   = chunk_paths(archive) if args.reuse else []
+    if not paths:
+        t0    = time.perf_counter()
+        paths = write_chunks(symbol_frames(SYMBOLS), archive,
+                             MomentumModel.training_data, chunk_rows=args.chunk_rows)
+        print(f"📦 Wrote {len(paths)} chunks to {archive} in {time.perf_counter() - t0:.1f}s")
+
+    for name in names:
+        t0 = time.perf_counter()
+        MODELS[name]().fit_chunked(paths, external_memory=not args.in_memory)
+        print(f"✅ {name} trained on {len(paths)} chunks in {time.perf_counter() - t0:.1f}s")
@@ -30,12 +30,15 @@ if str(ROOT) not in sys.path:
 from config                import FOREX_MAJORS, CRYPTO_ASSETS
 from app.market_data       import fetch_market_data
 from app.news              import get_news_sentiment
-from app.backtester        import backtest_symbol
+from app.backtest_runner   import run_backtests
+from app.robustness        import robustness_summary
+from app.profiler          import StageProfiler
 from app.models.xgb_model  import MomentumModel as XGBModel
 from app.models.lstm_model import LSTMModel
 from app.models.cnn_model  import CNNModel
 
 SYMBOLS = FOREX_MAJORS + CRYPTO_ASSETS
+ROBUSTNESS_RESAMPLES = 5_000   # block-bootstrap resamples per fold
 
 # ──────────────────────────────────────────────────────────────────────────────
 # 1) FEATURE ENGINEERING
@@ -113,44 +116,52 @@ def time_series_cv(df, n_splits=3, train_size=0.6, test_size=0.2):
 # ──────────────────────────────────────────────────────────────────────────────
 # 3) TRAIN / BACKTEST
 # ──────────────────────────────────────────────────────────────────────────────
-def evaluate_model(name, model, df, feature_pipe, min_confidence, fee):
+def evaluate_model(name, model, df, feature_pipe, min_confidence, fee, prof=None):
+    prof    = prof or StageProfiler(name)
     records = []
     for fold, (tr_idx, te_idx) in enumerate(time_series_cv(df)):
         Xtr, Xte = df.loc[tr_idx], df.loc[te_idx]
-        # train features & model
-        Xt_tr = feature_pipe.fit_transform(Xtr)
+        # train features (the sentiment step fetches news per bar) & model
+        with prof.stage("features", model=name, fold=fold):
+            Xt_tr = feature_pipe.fit_transform(Xtr)
         model.lookback = 20
-        if hasattr(model, "pipeline"):
-            model.fit(Xtr, None)
-        else:
-            model.batch_size = 32
-            model.fit(Xtr, None)
-        # backtest
-        rets = []
-        for sym in Xte["symbol"].unique():
-            pf = backtest_symbol(
-                symbol         = sym,
-                model          = model,
+        with prof.stage("fit", model=name, fold=fold, rows=len(Xtr)):
+            if hasattr(model, "pipeline"):
+                model.fit(Xtr, None)
+            else:
+                model.batch_size = 32
+                model.fit(Xtr, None)
+        # backtest every test symbol in parallel (workers reload the
+        # weights fit() just saved)
+        with prof.stage("backtest", model=name, fold=fold):
+            _, _, pl = run_backtests(
+                {name: type(model)},
+                Xte["symbol"].unique(),
                 fee_per_trade  = fee,
-                min_confidence = min_confidence
+                min_confidence = min_confidence,
             )
-            rets.extend(pf.tolist())
-        rets = np.array(rets)
+        rets = pl[name]
         if len(rets) < 2:
             metrics = {"fold":fold, "n_trades":len(rets), "pl":rets.sum(),
-                       "sharpe":np.nan, "sortino":np.nan}
+                       "sharpe":np.nan, "sortino":np.nan, "p_loss":np.nan}
         else:
             sharpe  = rets.mean()/(rets.std(ddof=1)+1e-8)
             downs   = rets[rets<0]
             sortino = rets.mean()/(downs.std(ddof=1)+1e-8 if len(downs)>1 else 1e-8)
-            metrics = {"fold":fold, "n_trades":len(rets),
-                       "pl":rets.sum(), "sharpe":sharpe, "sortino":sortino}
+            with prof.stage("robustness", model=name, fold=fold):
+                metrics = {"fold":fold, "n_trades":len(rets),
+                           "pl":rets.sum(), "sharpe":sharpe, "sortino":sortino,
+                           # 95% CIs for P/L, Sharpe and max drawdown; p_loss =
+                           # share of resamples that lose money
+                           **robustness_summary(rets, n_resamples=ROBUSTNESS_RESAMPLES)}
         records.append(metrics)
     dfm = pd.DataFrame(records).assign(model=name)
     return dfm
 
 if __name__=="__main__":
-    df            = load_all_data()
+    prof          = StageProfiler("train_models")
+    with prof.stage("fetch", symbols=len(SYMBOLS)):
+        df        = load_all_data()
     feature_pipe  = build_feature_pipeline()
     results       = []
 
@@ -168,10 +179,12 @@ if __name__=="__main__":
             df=df,
             feature_pipe=feature_pipe,
             min_confidence=params["min_confidence"],
-            fee=params["fee"]
+            fee=params["fee"],
+            prof=prof,
         )
         results.append(dfm)
-        joblib.dump(model, ROOT/f"models/{name}_final.pkl")
+        with prof.stage("save", model=name):
+            joblib.dump(model, ROOT/f"models/{name}_final.pkl")
 
     # aggregate & report
     report  = pd.concat(results, ignore_index=True)
@@ -180,8 +193,14 @@ if __name__=="__main__":
                      .agg(trades=("n_trades","sum"),
                           avg_pl=("pl","mean"),
                           avg_sharpe=("sharpe","mean"),
-                          avg_sortino=("sortino","mean")))
+                          avg_sortino=("sortino","mean"),
+                          avg_p_loss=("p_loss","mean")))
     print("\n=== AGGREGATED RESULTS ===")
     print(summary)
     summary.to_csv(ROOT/"backtest_summary.csv")
     print("\nFull report written to backtest_report.csv and backtest_summary.csv")
+
+    # stage timings: full report under ~/.nekoai/profiles, compact summary last
+    # (the scheduler posts it to the channel on its own)
+    prof.write()
+    print(prof.summary())
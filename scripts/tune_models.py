@@ -33,6 +33,8 @@ def silent_fit(model, *args, **kwargs):
             raise
 
 # ── REGULAR IMPORTS ─────────────────────────────────────────────────────────
+import time, shutil, argparse, tempfile, importlib
+import multiprocessing as mp
 import optuna, numpy as np, pandas as pd
 from pathlib import Path
 ROOT = Path(__file__).resolve().parent.parent
@@ -42,24 +44,81 @@ if str(ROOT) not in sys.path:
 from config                import FOREX_MAJORS, CRYPTO_ASSETS
 from app.market_data       import fetch_market_data
 from app.news              import get_news_sentiment
-from app.backtester        import backtest_symbol
+from app.sweep             import cached_predictions, candidates, sweep, DEFAULT_THRESHOLDS
+from app.backtest_cache    import model_fingerprint, data_fingerprint
+from app.tuning            import (PRUNERS, EPOCH_STEPS, HISTORY_DIR, WARM_TOP_K, make_pruner,
+                                   report, keras_pruning_callback, TrialRecorder,
+                                   load_history, warm_start, n_priors, best_trial)
 from app.models.xgb_model  import MomentumModel as XGBModel
 from app.models.lstm_model import LSTMModel
 from app.models.cnn_model  import CNNModel
 
-SYMBOLS = FOREX_MAJORS + CRYPTO_ASSETS
+SYMBOLS   = FOREX_MAJORS + CRYPTO_ASSETS
+STUDY_DIR = Path.home() / ".nekoai" / "studies"
+HEARTBEAT = 60                    # s between trial heartbeats on RDB storages
+HISTORY   = HISTORY_DIR / "tune_models.jsonl"   # completed trials of every run
+N_TRIALS  = 100
+THREADS   = os.cpu_count() or 1   # per-process thread budget, set by run_worker
+MIN_SYMBOLS = 2                   # validation symbols scored before a trial can be pruned
+THRESHOLDS  = DEFAULT_THRESHOLDS[DEFAULT_THRESHOLDS <= 0.9]
+
+# model modules whose MODEL_FILE a trial would otherwise overwrite
+MODEL_MODULES = ["app.models.xgb_model", "app.models.lstm_model", "app.models.cnn_model"]
+
+# the prepared dataset, loaded once per process (see load_dataset)
+DATA = {}
 
 def build_dataset():
-    dfs, news = [], []
+    """All symbols' bars in time order, and each bar's news sentiment."""
+    dfs = []
     for sym in SYMBOLS:
         df = fetch_market_data(sym)
         try:
             s = get_news_sentiment(sym)
         except:
             s = 0.0
-        dfs.append(df.assign(symbol=sym))
-        news.append(pd.Series(s, index=df.index))
-    return pd.concat(dfs).sort_index(), pd.concat(news).sort_index()
+        dfs.append(df.assign(symbol=sym, news=s))
+    df = pd.concat(dfs).sort_index(kind="stable")
+    return df.drop(columns="news"), df["news"]
+
+def validation_sets(df, n_train: int) -> dict:
+    """
+    symbol → (its full bar history, index of its first validation bar):
+    the features of the validation bars need the bars before them.
+    """
+    train = df.iloc[:n_train]["symbol"].value_counts()
+    return {s: (g.drop(columns="symbol"), int(train.get(s, 0)))
+            for s, g in df.groupby("symbol", sort=False)}
+
+def prepare_dataset(path: Path):
+    """
+    Fetch, split and featurize once, and pickle the result to `path` for
+    every trial (and every worker process) to read.
+    """
+    df, news = build_dataset()
+    split = int(0.8*len(df))
+    tdf, tnews = df.iloc[:split], news.iloc[:split]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    pd.to_pickle({
+        "fingerprint": data_fingerprint(df),
+        "full":  (df, news),
+        "train": (tdf, tnews),
+        # XGB features do not depend on any tuned parameter
+        "xgb":   XGBModel.training_data(tdf, tnews),
+        "valid": validation_sets(df, split),
+    }, tmp)
+    os.replace(tmp, path)
+
+def load_dataset(path: Path):
+    DATA.clear()
+    DATA.update(pd.read_pickle(path))
+    # datasets prepared before fingerprints were stored
+    if "fingerprint" not in DATA:
+        DATA["fingerprint"] = data_fingerprint(DATA["full"][0])
+    # ... and before validation kept each symbol's history
+    if not isinstance(next(iter(DATA["valid"].values())), tuple):
+        DATA["valid"] = validation_sets(DATA["full"][0], len(DATA["train"][0]))
 
 def enrich_features(df):
     df = df.copy()
@@ -78,14 +137,10 @@ def enrich_features(df):
     return df.bfill().ffill()
 
 def objective(trial):
-    df, news = build_dataset()
-    split = int(0.8*len(df))
-    tdf, vdf = df.iloc[:split], df.iloc[split:]
-    tnews, vnews = news.iloc[:split], news.iloc[split:]
+    tdf, tnews = DATA["train"]
 
     # hyperparams
     lookback   = trial.suggest_int("lookback", 10, 50)
-    min_conf   = trial.suggest_float("min_confidence", 0.0, 0.9)
     batch_size = trial.suggest_categorical("batch_size", [16,32,64])
     model_type = trial.suggest_categorical("model", ["xgb","lstm","cnn"])
 
@@ -105,45 +160,195 @@ def objective(trial):
             clf__learning_rate=    params["learning_rate"],
             clf__subsample=        params["subsample"],
             clf__colsample_bytree= params["colsample_bytree"],
+            clf__n_jobs=           THREADS,
         )
         m.lookback = lookback
-        silent_fit(m, tdf, tnews)
+        # same as m.fit(tdf, tnews) on the features prepared once
+        m.pipeline.fit(*DATA["xgb"])
 
     elif model_type == "lstm":
         m = LSTMModel(lookback=lookback)
         m.batch_size = batch_size
-        silent_fit(m, tdf, tnews)
+        silent_fit(m, tdf, tnews, callbacks=[keras_pruning_callback(trial)])
 
     else:  # cnn
         m = CNNModel(lookback=lookback)
         m.batch_size = batch_size
-        silent_fit(m, tdf, tnews)
+        silent_fit(m, tdf, tnews, callbacks=[keras_pruning_callback(trial)])
 
-    # backtest & score
-    profits = []
-    for sym in pd.unique(vdf["symbol"]):
-        pf = backtest_symbol(sym, m, fee_per_trade=0.0, min_confidence=min_conf)
-        profits.extend(pf.tolist())
-    profits = np.array(profits)
+    # predict each symbol once and score every min_confidence on the pooled
+    # trades entered in its validation bars; a trial losing after
+    # MIN_SYMBOLS symbols is pruned
+    valid, model_fp = DATA["valid"], model_fingerprint(m)
+    confs, grosses  = [], []
+    for i, sym in enumerate(valid):
+        bars, start = valid[sym]
+        c, g = candidates(cached_predictions(sym, m, bars, model_fp=model_fp), m.lookback, start)
+        confs.append(c)
+        grosses.append(g)
+        value, min_conf, best = score(np.concatenate(confs), np.concatenate(grosses))
+        report(trial, EPOCH_STEPS + i, value, prune=i + 1 >= MIN_SYMBOLS)
+
+    trial.set_user_attr("min_confidence", min_conf)
+    if best["trades"] < 5:
+        print(f"Trial#{trial.number}: few trades ({int(best['trades'])}), P/L={best['total']:.4f}")
+    else:
+        print(f"Trial#{trial.number}: Sharpe={best['sharpe']:.4f} @ min_confidence={min_conf:.2f}")
+    return value
 
-    if len(profits) < 5:
-        pl = float(profits.sum()) if profits.size else 0.0
-        print(f"Trial#{trial.number}: few trades ({len(profits)}), P/L={pl:.4f}")
-        return -pl
+def score(conf, gross):
+    """
+    (objective, min_confidence, stats) of the best threshold: minus the
+    Sharpe over thresholds with at least 5 trades, else minus the P/L.
+    """
+    grid   = sweep(conf, gross, THRESHOLDS, fees=(0.0,)).xs(0.0, level="fee_per_trade")
+    enough = grid[grid["trades"] >= 5]
+    if enough.empty:
+        return -float(grid.iloc[0]["total"]), float(grid.index[0]), grid.iloc[0]
+    min_conf = float(enough["sharpe"].idxmax())
+    return -float(enough.loc[min_conf, "sharpe"]), min_conf, enough.loc[min_conf]
 
-    sharpe = profits.mean() / (profits.std(ddof=1) + 1e-8)
-    print(f"Trial#{trial.number}: Sharpe={sharpe:.4f}")
-    return -sharpe
+# ── STUDY STORAGE & WORKERS ─────────────────────────────────────────────────
+
+def open_storage(spec: str):
+    """
+    An RDB URL (e.g. sqlite:///tune.db), with trial heartbeats so trials of
+    a killed worker get failed; any other path is a journal file.
+    """
+    if "://" in spec:
+        return optuna.storages.RDBStorage(spec, heartbeat_interval=HEARTBEAT)
+    try:
+        from optuna.storages.journal import JournalFileBackend
+    except ImportError:   # optuna < 4
+        from optuna.storages import JournalFileStorage as JournalFileBackend
+    Path(spec).parent.mkdir(parents=True, exist_ok=True)
+    return optuna.storages.JournalStorage(JournalFileBackend(spec))
+
+def run_worker(storage: str, study_name: str, data_path: str, n_trials: int, threads: int,
+               pruning: dict):
+    """
+    One tuning process: load the dataset, then take trials from the shared
+    study until it holds n_trials finished ones (warm-start priors
+    included).  `pruning` holds make_pruner's arguments plus min_symbols.
+    """
+    global THREADS, MIN_SYMBOLS
+    pruning     = dict(pruning)
+    THREADS     = threads
+    MIN_SYMBOLS = pruning.pop("min_symbols", MIN_SYMBOLS)
+    tf.config.threading.set_intra_op_parallelism_threads(threads)
+    tf.config.threading.set_inter_op_parallelism_threads(1)
+    load_dataset(Path(data_path))
+
+    # trials must not overwrite (or load) the live model files
+    tmp, saved = tempfile.mkdtemp(prefix="nekoai-tune-"), {}
+    for name in MODEL_MODULES:
+        mod = importlib.import_module(name)
+        saved[mod] = mod.MODEL_FILE
+        mod.MODEL_FILE = Path(tmp) / Path(mod.MODEL_FILE).name
+    try:
+        # the pruner is not stored with the study, so each worker sets it
+        study = optuna.load_study(study_name=study_name, storage=open_storage(storage),
+                                  pruner=make_pruner(**pruning))
+        done  = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+        study.optimize(objective, show_progress_bar=False,
+                       callbacks=[optuna.study.MaxTrialsCallback(n_trials, states=done),
+                                  TrialRecorder(HISTORY, DATA["fingerprint"])])
+    finally:
+        for mod, path in saved.items():
+            mod.MODEL_FILE = path
+        shutil.rmtree(tmp, ignore_errors=True)
+
+def requeue_interrupted(study):
+    """
+    Trials left RUNNING by a killed run are queued again, once each.  The
+    stale RUNNING entries stay (failed by the heartbeat on RDB storages);
+    they never count as finished.
+    """
+    trials  = study.get_trials(deepcopy=False)
+    redone  = {t.user_attrs.get("requeued_from") for t in trials}
+    stale   = [t for t in trials
+               if t.state == optuna.trial.TrialState.RUNNING and t.number not in redone]
+    for t in stale:
+        study.enqueue_trial(t.params, user_attrs={"requeued_from": t.number})
+    return len(stale)
 
 if __name__=="__main__":
-    study = optuna.create_study(direction="minimize")
-    study.optimize(objective, n_trials=100, show_progress_bar=False)
+    ap = argparse.ArgumentParser(description="Tune XGB / LSTM / CNN hyper-parameters")
+    ap.add_argument("--trials",  type=int, default=N_TRIALS,
+                    help="finished trials the study should hold (resumed runs count earlier ones, "
+                         "as do warm-start trials on the same dataset)")
+    ap.add_argument("--jobs",    type=int, default=os.cpu_count() or 1, help="worker processes")
+    ap.add_argument("--study",   default="tune_models")
+    ap.add_argument("--storage", default=None,
+                    help="RDB URL (sqlite:///path.db) or journal file path "
+                         f"(default {STUDY_DIR}/<study>.journal)")
+    ap.add_argument("--refresh-data", action="store_true",
+                    help="refetch bars and news instead of reusing the study's dataset")
+    ap.add_argument("--pruner",  choices=PRUNERS, default="median")
+    ap.add_argument("--warmup-epochs", type=int, default=3,
+                    help="Keras epochs every trial trains before it can be pruned")
+    ap.add_argument("--min-symbols",   type=int, default=MIN_SYMBOLS,
+                    help="validation symbols scored before a trial can be pruned")
+    ap.add_argument("--top-k",   type=int, default=WARM_TOP_K,
+                    help="best configs of earlier runs a new study re-evaluates first")
+    ap.add_argument("--cold",    action="store_true", help="start a new study without earlier runs")
+    args = ap.parse_args()
+
+    storage   = args.storage or str(STUDY_DIR / f"{args.study}.journal")
+    data_path = STUDY_DIR / f"{args.study}.dataset.pkl"
+    study     = optuna.create_study(direction="minimize", study_name=args.study,
+                                    storage=open_storage(storage), load_if_exists=True)
+    new_study = not study.get_trials(deepcopy=False)
 
-    print("\nBest params:", study.best_params)
+    # a resumed study keeps scoring on the data it started with
+    if args.refresh_data or not data_path.exists():
+        print("Fetching and featurizing the dataset…")
+        prepare_dataset(data_path)
+    load_dataset(data_path)
+    fingerprint = DATA["fingerprint"]
+
+    if new_study and not args.cold:
+        seeded = warm_start(study, load_history(HISTORY), fingerprint, top_k=args.top_k)
+        queued = len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.WAITING,)))
+        print(f"Warm start: {seeded} earlier trials, {queued} configs queued")
+
+    priors    = n_priors(study, fingerprint)
+    finished  = len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,
+                                                             optuna.trial.TrialState.PRUNED))) - priors
+    print(f"Study {args.study!r}: {finished}/{args.trials} trials done "
+          f"({requeue_interrupted(study)} interrupted ones requeued)")
+
+    jobs    = max(0, min(args.jobs, args.trials - finished))
+    threads = max(1, (os.cpu_count() or 1) // max(1, jobs))
+    pruning = {"name": args.pruner, "warmup_steps": args.warmup_epochs,
+               "min_symbols": args.min_symbols}
+    t0      = time.perf_counter()
+    if jobs == 1:
+        run_worker(storage, args.study, str(data_path), args.trials + priors, threads, pruning)
+    elif jobs > 1:
+        # spawned, so no worker inherits an initialised TensorFlow runtime
+        ctx   = mp.get_context("spawn")
+        procs = [ctx.Process(target=run_worker,
+                             args=(storage, args.study, str(data_path), args.trials + priors,
+                                   threads, pruning))
+                 for _ in range(jobs)]
+        for p in procs:
+            p.start()
+        for p in procs:
+            p.join()
+    print(f"⏱️ {jobs} worker(s) × {threads} thread(s): {time.perf_counter() - t0:.1f}s")
+
+    study  = optuna.load_study(study_name=args.study, storage=open_storage(storage))
+    pruned = len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.PRUNED,)))
+    print(f"✂️ {pruned} of {len(study.trials)} trials pruned")
+    best_t = best_trial(study, fingerprint)
+    print("\nBest params:", best_t.params)
+    print("Best min_confidence:", best_t.user_attrs.get("min_confidence"))
     print("Retraining on full dataset…")
 
-    df, news = build_dataset()
-    best = study.best_params
+    load_dataset(data_path)
+    df, news = DATA["full"]
+    best = best_t.params
 
     if best["model"] == "xgb":
         final = XGBModel(); final.lookback = best["lookback"]
@@ -2,6 +2,9 @@
 # scripts/tune_xgb.py
 
 import sys
+import hashlib
+import argparse
+from functools import partial
 from pathlib import Path
 import optuna
 
@@ -11,11 +14,25 @@ if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
 from config import FOREX_MAJORS, CRYPTO_ASSETS
-from app.backtester import backtest_symbol
+from app.market_data import fetch_market_data
+from app.backtest_cache import BacktestCache, cached_backtest, data_fingerprint
+from app.tuning import (PRUNERS, HISTORY_DIR, WARM_TOP_K, make_pruner, report,
+                        TrialRecorder, load_history, warm_start, best_trial)
 from app.models.xgb_model import MomentumModel
 import numpy as np
 
-def objective(trial):
+SYMS  = FOREX_MAJORS[:2]  # just two for speed; expand as needed
+MIN_SYMBOLS = 1           # symbols backtested before a trial can be pruned
+HISTORY = HISTORY_DIR / "tune_xgb.jsonl"
+
+def validation_data(symbols=SYMS):
+    """(bars, per-symbol fingerprints, combined fingerprint), fetched and hashed once for all trials."""
+    data = {s: fetch_market_data(s) for s in symbols}
+    fps  = {s: data_fingerprint(df) for s, df in data.items()}
+    fp   = hashlib.sha256("".join(fps[s] for s in symbols).encode()).hexdigest()
+    return data, fps, fp
+
+def objective(trial, data: dict, fps: dict, cache: BacktestCache):
     # sample hyper-parameters
     params = {
         "n_estimators": trial.suggest_int("n_estimators", 100, 500),
@@ -29,20 +46,42 @@ def objective(trial):
     model = MomentumModel()
     model.pipeline.named_steps["clf"].set_params(**params)
 
-    # backtest over a small validation set
-    syms = FOREX_MAJORS[:2]  # just two for speed; expand as needed
+    # backtest over a small validation set, reporting the running profit
+    # per trade after each symbol so losing trials stop early
     pl_total = 0.0
     ntrades  = 0
-    for s in syms:
-        pl = backtest_symbol(s, model, fee_per_trade=0.0)
+    for i, s in enumerate(data):
+        pl, _ = cached_backtest(s, model, fee_per_trade=0.0, df=data[s],
+                                cache=cache, data_fp=fps[s])
         pl_total += np.nansum(pl)
         ntrades  += len(pl)
+        report(trial, i, pl_total / max(1, ntrades), prune=i + 1 >= MIN_SYMBOLS)
 
     # objective: maximize profit per trade
     return pl_total / max(1, ntrades)
 
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--trials", type=int, default=20)
+    ap.add_argument("--pruner", choices=PRUNERS, default="median")
+    ap.add_argument("--top-k",  type=int, default=WARM_TOP_K,
+                    help="best earlier configs to re-evaluate first")
+    ap.add_argument("--cold",   action="store_true", help="ignore earlier runs")
+    args = ap.parse_args()
+
+    data, fps, fp = validation_data()
+    cache = BacktestCache()
+    study = optuna.create_study(direction="maximize",
+                                pruner=make_pruner(args.pruner, warmup_steps=0))
+    if not args.cold:
+        seeded = warm_start(study, load_history(HISTORY), fp, top_k=args.top_k)
+        queued = len(study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.WAITING,)))
+        print(f"Warm start: {seeded} earlier trials, {queued} configs queued")
+    study.optimize(partial(objective, data=data, fps=fps, cache=cache),
+                   n_trials=args.trials, callbacks=[TrialRecorder(HISTORY, fp)])
+    best = best_trial(study, fp)
+    print("Best params:", best.params)
+    print("Best value:", best.value)
+
 if __name__ == "__main__":
-    study = optuna.create_study(direction="maximize")
-    study.optimize(objective, n_trials=20)
-    print("Best params:", study.best_params)
-    print("Best value:", study.best_value)
+    main()
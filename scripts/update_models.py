@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+# scripts/update_models.py
+"""
+Incremental refresh of the trained models on the bars since their last
+update (see app/incremental.py); each updated model replaces the saved one
+only if it does at least as well on the held-out newest bars.
+
+    python scripts/update_models.py [--models ai,rf,lstm,cnn] [--holdout 0.2] [--dry-run]
+
+Stage timings are written to ~/.nekoai/profiles (see app/profiler.py).
+"""
+import os
+import sys
+import argparse
+import warnings
+from pathlib import Path
+
+os.environ["TF_CPP_MIN_LOG_LEVEL"] = "3"
+warnings.filterwarnings("ignore", ".*use_label_encoder.*")
+
+ROOT = Path(__file__).resolve().parent.parent
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from config import FOREX_MAJORS, CRYPTO_ASSETS
+from app.incremental import MODELS, HOLDOUT_FRACTION, run_updates
+from app.profiler    import StageProfiler
+
+SYMBOLS = FOREX_MAJORS + CRYPTO_ASSETS
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Update the trained models on new bars")
+    # ai and xgb share one model file, so only ai is updated by default
+    ap.add_argument("--models",  default="ai,rf,lstm,cnn",
+                    help=f"comma-separated subset of {','.join(MODELS)}")
+    ap.add_argument("--holdout", type=float, default=HOLDOUT_FRACTION,
+                    help="share of each symbol's new bars held out for validation")
+    ap.add_argument("--dry-run", action="store_true", help="validate only, never save")
+    args = ap.parse_args()
+
+    names = [m.strip() for m in args.models.split(",") if m.strip()]
+    for name in names:
+        if name not in MODELS:
+            sys.exit(f"unknown model {name!r}, expected one of {', '.join(MODELS)}")
+
+    prof    = StageProfiler("update_models", meta={"models": names, "dry_run": args.dry_run})
+    results = run_updates(names, SYMBOLS, holdout=args.holdout, promote=not args.dry_run,
+                          profiler=prof)
+    icons   = {"promoted": "✅", "validated": "☑️", "rejected": "↩️"}
+    for r in results.itertuples():
+        print(f"{icons.get(r.status, '⏭️')} {r.model:<5} {r.status:<11} "
+              f"symbols={r.symbols:<3} samples={r.samples:<6} "
+              f"holdout P/L {r.before:+.5f} → {r.after:+.5f} "
+              f"({r.holdout_trades} trades, {r.seconds:.1f}s)")
+
+    # full report on disk, compact one last (the scheduler posts it on its own)
+    prof.write()
+    print(prof.summary())
@@ -1,8 +1,7 @@
 #!/usr/bin/env python3
 import sys
+import time
 from pathlib import Path
-import pandas as pd
-import numpy as np
 
 # project root → allow “app” imports
 ROOT = Path(__file__).resolve().parent.parent
@@ -12,40 +11,26 @@ if str(ROOT) not in sys.path:
 from config import FOREX_MAJORS, CRYPTO_ASSETS
 from app.market_data import fetch_twelvedata
 from app.news           import get_news_series
-from app.models.xgb_model import XGBModel
-from app.backtester      import backtest_symbol
+from app.models.xgb_model import MomentumModel as XGBModel
+from app.walkforward    import run_walkforward
 
-def walkforward(symbol, model, window_size=500, step=100):
-    df = fetch_twelvedata(symbol)
-    dates = df.index
-    results = []
-    for start in range(0, len(df) - window_size, step):
-        train_df = df.iloc[start : start + window_size]
-        test_df  = df.iloc[start + window_size : start + window_size + step]
-
-        news_train = get_news_series(symbol, train_df.index)
-        model.fit(train_df, news_train)
-
-        # backtest on test_df slice
-        pl = []
-        for t in range(model.lookback, len(test_df) - 2):
-            window = test_df.iloc[: t+1]
-            out = model.predict(window, news=0.0)
-            if out["signal"] == "HOLD":
-                continue
-            entry   = test_df["open"].iloc[t+1]
-            exit_   = test_df["open"].iloc[t+2]
-            direction = 1 if out["signal"] == "BUY" else -1
-            pl.append(direction * (exit_ - entry))
-        results.append(np.mean(pl) if pl else 0.0)
-
-    idx = [dates[i] for i in range(0, len(df) - window_size, step)]
-    return pd.Series(results, index=idx)
+def walkforward(symbols, window_size=500, step=100):
+    """
+    Per-fold walk-forward results for `symbols`: bars and news are fetched
+    once per symbol, folds are fitted in parallel (warm-started XGB).
+    """
+    data = {s: fetch_twelvedata(s) for s in symbols}
+    news = {s: get_news_series(s, df.index) for s, df in data.items()}
+    return run_walkforward(symbols, XGBModel().pipeline, data, news,
+                           window_size=window_size, step=step)
 
 if __name__ == "__main__":
     symbols = FOREX_MAJORS + CRYPTO_ASSETS
-    for sym in symbols:
+    t0    = time.perf_counter()
+    folds = walkforward(symbols)
+    for sym, wf in folds.groupby("symbol", sort=False):
         print(f"\n▶ Walk-forward {sym}")
-        model = XGBModel()
-        wf = walkforward(sym, model)
-        print(wf.describe())
+        print(wf.set_index("test_start")["mean_pl"].describe())
+        print(f"  accuracy={wf['accuracy'].mean():.1f}%  fit={wf['fit_s'].sum():.1f}s  "
+              f"total={wf['seconds'].sum():.1f}s")
+    print(f"\n⏱ {len(folds)} folds in {time.perf_counter() - t0:.1f}s")
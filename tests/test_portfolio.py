@@ -0,0 +1,61 @@
+# tests/test_portfolio.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.event_backtester import SymbolSpec
+from app.portfolio import simulate_portfolio
+
+def _bars(prices, start="2024-01-01"):
+    idx = pd.date_range(start, periods=len(prices), freq="h")
+    px  = np.asarray(prices, dtype=float)
+    return pd.DataFrame({"open": px, "high": px, "low": px, "close": px}, index=idx)
+
+def _mixed():
+    bars = {"EURUSD": _bars([1.10, 1.10, 1.11, 1.12]),
+            "USDJPY": _bars([150.0, 150.0, 151.0, 152.0])}
+    t = bars["EURUSD"].index
+    trades = pd.DataFrame({
+        "symbol":      ["EURUSD", "USDJPY"],
+        "side":        [1, 1],
+        "entry_time":  [t[1], t[1]],
+        "exit_time":   [t[3], t[3]],
+        "entry_price": [1.10, 150.0],
+        "exit_price":  [1.12, 152.0],
+    })
+    return trades, bars
+
+def test_mixed_portfolio_in_account_currency():
+    trades, bars = _mixed()
+    out, curve, stats = simulate_portfolio(trades, bars, start_lot=0.1, lot_min=0.1,
+                                           lot_max=0.1, leverage=100.0)
+    eur, jpy = out.set_index("symbol").loc["EURUSD"], out.set_index("symbol").loc["USDJPY"]
+    assert out["taken"].all()
+
+    # EURUSD: quoted in dollars
+    assert eur["margin"] == pytest.approx(0.1 * 100_000 * 1.10 / 100)
+    assert eur["profit"] == pytest.approx(0.02 * 0.1 * 100_000)
+    # USDJPY: dollar margin is lots × contract, yen P/L converts at the exit price
+    assert jpy["margin"] == pytest.approx(0.1 * 100_000 / 100)
+    assert jpy["profit"] == pytest.approx(2.0 * 0.1 * 100_000 / 152.0)
+
+    assert stats["final_balance"] == pytest.approx(10_000 + eur["profit"] + jpy["profit"])
+    # marked to market at 151 while both are open
+    t = bars["EURUSD"].index
+    assert curve.loc[t[2], "equity"] == pytest.approx(10_000 + 0.01 * 10_000 + 1.0 * 10_000 / 151.0)
+    assert curve.loc[t[2], "margin"] == pytest.approx(eur["margin"] + jpy["margin"])
+
+def test_usd_base_margin_does_not_block_entries():
+    trades, bars = _mixed()
+    # room for both only if the USDJPY margin is counted in dollars
+    _, _, stats = simulate_portfolio(trades, bars, initial_balance=2_200.0, start_lot=0.1,
+                                     lot_min=0.1, lot_max=0.1, leverage=100.0)
+    assert stats["trades"] == 2
+
+def test_cross_pair_is_refused():
+    trades, bars = _mixed()
+    trades.loc[1, "symbol"] = "EURJPY"
+    bars["EURJPY"] = bars.pop("USDJPY")
+    specs = {"EURJPY": SymbolSpec(digits=3, point=0.001, currency_base="EUR", currency_profit="JPY")}
+    with pytest.raises(ValueError, match="EURJPY"):
+        simulate_portfolio(trades, bars, specs)